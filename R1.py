@@ -1,12 +1,13 @@
-import networkx as nx
 import glob
+import json
 import math
-from collections import Counter
-import matplotlib.pyplot as plt
-import seaborn as sns
+import os
 import pandas as pd
-import joypy
-import matplotlib.cm as cm
+import numpy as np
+from armazem_metricas import metricas_armazenadas
+from conectividade import CHAVES_CONECTIVIDADE
+from distribuicao_graus import densidades_por_ano, histogramas_graus
+from instrumentacao import etapa, instrumentar_pipeline
 
 # ===================================================================
 # FUNÇÃO: coletar_arquivos_gexf
@@ -34,39 +35,17 @@ def coletar_arquivos_gexf(pasta: str):
     
     return arquivos, anos
 
-# ===================================================================
-# FUNÇÃO: calcular_metricas_grafo
-# Descrição: Lê um arquivo GEXF, calcula as métricas do grafo (densidade,
-#            número de nós, número de arestas, grau médio e distribuição dos graus)
-# ===================================================================
-def calcular_metricas_grafo(arquivo: str):
-    try:
-        grafo = nx.read_gexf(arquivo)
-        densidade = nx.density(grafo)
-        num_nos = grafo.number_of_nodes()
-        num_arestas = grafo.number_of_edges()
-        grau_medio = sum(dict(grafo.degree()).values()) / num_nos # Média de conexões por nó
-        
-        # Conta a distribuição dos graus usando Counter
-        distribuicao_graus = Counter(dict(grafo.degree()).values())
-        
-        return {
-            'densidade': densidade,
-            'num_nos': num_nos,
-            'num_arestas': num_arestas,
-            'grau_medio': grau_medio,
-            'distribuicao': distribuicao_graus
-        }
-    except Exception as e:
-        print(f"Erro ao processar {arquivo}: {e}")
-        return None
-
 # ===================================================================
 # FUNÇÃO: processar_metricas
 # Descrição: Itera sobre os arquivos, calcula as métricas individuais e 
-#            imprime um resumo.
+#            imprime um resumo. As métricas vêm do armazém persistente
+#            (armazem_metricas): só arquivos novos ou alterados são
+#            recalculados, com workers > 1 em um pool de processos
+#            (padrão: variável REDES_WORKERS). A conectividade de cada ano
+#            (componentes, caminho médio, diâmetro efetivo) é retornada
+#            como uma lista de dicionários.
 # ===================================================================
-def processar_metricas(arquivos: list):
+def processar_metricas(arquivos: list, workers=None):
     metricas_por_ano = []
     # Listas para armazenar as métricas de cada arquivo
     densidades = []
@@ -74,64 +53,61 @@ def processar_metricas(arquivos: list):
     arestas = []
     graus_medios = []
     distribuicoes = []
+    conectividade = []
     
-    for arquivo in arquivos:
-        metrica = calcular_metricas_grafo(arquivo)
+    for metrica in metricas_armazenadas(arquivos, workers):
         if metrica:
             densidades.append(metrica['densidade'])
             nos.append(metrica['num_nos'])
             arestas.append(metrica['num_arestas'])
             graus_medios.append(metrica['grau_medio'])
             distribuicoes.append(metrica['distribuicao'])
+            conectividade.append({chave: metrica[chave] for chave in CHAVES_CONECTIVIDADE})
             metricas_por_ano.append(metrica)
     
     # Exibe um resumo das métricas
     print("Resumo das métricas:")
-    for d, n, a, gm, dist in zip(densidades, nos, arestas, graus_medios, distribuicoes):
+    for d, n, a, gm, dist, c in zip(densidades, nos, arestas, graus_medios, distribuicoes, conectividade):
         print(f"  Densidade: {d:.4f}")
         print(f"  Número de nós: {n}")
         print(f"  Número de arestas: {a}")
         print(f"  Grau médio: {gm:.2f}")
         print(f"  Distribuição dos graus: {dist}")
+        print(f"  Componentes: {c['componentes']} (gigante com {c['fracao_gigante']:.1%} dos nós)")
+        print(f"  Caminho médio: {c['caminho_medio']:.3f}")
+        print(f"  Diâmetro efetivo: {c['diametro_efetivo']:.2f}")
         print("-" * 40)
     
-    return densidades, nos, arestas, graus_medios, distribuicoes
+    return densidades, nos, arestas, graus_medios, distribuicoes, conectividade
 
 # ===================================================================
 # FUNÇÃO: criar_dataframe_graus
-# Descrição: Cria um DataFrame com os graus de cada nó, associando-os ao ano
-#            correspondente e armazenando também o número total de nós e arestas.
+# Descrição: Cria o histograma dos graus de cada ano, um DataFrame compacto
+#            com colunas inteiras (ano, grau, contagem): uma linha por grau
+#            distinto em vez de uma por nó. O número de nós de cada ano é a
+#            soma das contagens. Lê a distribuição de graus gravada no
+#            armazém por processar_metricas.
 # ===================================================================
-def criar_dataframe_graus(arquivos: list, anos: list):
-    registros_graus = []
-    for arquivo, ano in zip(arquivos, anos):
-        try:
-            grafo = nx.read_gexf(arquivo)
-            # Lista com os graus de cada nó
-            lista_graus = list(dict(grafo.degree()).values())
-            num_nos = grafo.number_of_nodes()
-            num_arestas = grafo.number_of_edges()
-            for grau in lista_graus:
-                registros_graus.append({
-                    'ano': ano,
-                    'degree': grau,
-                    'num_nos': num_nos,
-                    'num_arestas': num_arestas
-                })
-        except Exception as e:
-            print(f"Erro ao processar {arquivo}: {e}")
-            
-    df = pd.DataFrame(registros_graus)
-    df = df.sort_values(by='ano')
-    return df
+def criar_dataframe_graus(arquivos: list, anos: list, workers=None):
+    distribuicoes = [None if metricas is None else metricas['distribuicao']
+                     for metricas in metricas_armazenadas(arquivos, workers)]
+    return histogramas_graus(distribuicoes, anos)
 
 # ===================================================================
 # FUNÇÃO: plotar_metricas_temporais
 # Descrição: Plota as métricas calculadas (densidade, número de nós, número de arestas,
 #            grau médio) ao longo dos anos, incluindo marcações de anos de avaliação.
+#            Com `conectividade` (lista de processar_metricas), um segundo painel
+#            mostra componentes, caminho médio, diâmetro efetivo e a fração de
+#            nós na componente gigante (eixo da direita).
 # ===================================================================
-def plotar_metricas_temporais(anos: list, densidades: list, nos: list, arestas: list, graus_medios: list):
-    fig = plt.figure(figsize=(10, 6))
+def plotar_metricas_temporais(anos: list, densidades: list, nos: list, arestas: list, graus_medios: list,
+                              conectividade=None):
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(10, 10 if conectividade else 6))
+    if conectividade:
+        plt.subplot(2, 1, 1)
     plt.plot(anos, densidades, marker='o', label='Densidade')
     plt.plot(anos, nos, marker='o', label='Número de Nós')
     plt.plot(anos, arestas, marker='o', label='Número de Arestas')
@@ -139,70 +115,133 @@ def plotar_metricas_temporais(anos: list, densidades: list, nos: list, arestas:
     
     # Define marcos importantes referentes à avaliação do PPgEEC
     marcos = [2012, 2016, 2020, 2024]
-    for i, marco in enumerate(marcos):
-        plt.axvline(x=marco, color='gray', linestyle='--', linewidth=1,
-                    label=f'PPgEEC' if i == 0 else "")
-        # Adiciona anotação do marco no topo do gráfico
-        plt.text(marco, plt.ylim()[1]*0.46, f'{marco}', verticalalignment='top', color='gray')
+    def marcar_avaliacoes():
+        for i, marco in enumerate(marcos):
+            plt.axvline(x=marco, color='gray', linestyle='--', linewidth=1,
+                        label=f'PPgEEC' if i == 0 else "")
+            # Adiciona anotação do marco no topo do gráfico
+            plt.text(marco, plt.ylim()[1]*0.46, f'{marco}', verticalalignment='top', color='gray')
+    marcar_avaliacoes()
     
     plt.xticks(list(range(2010, 2025)))
     plt.xlabel('Ano')
     plt.ylabel('Valor')
     plt.title('Métricas dos Grafos ao Longo dos anos')
     plt.legend()
+
+    if conectividade:
+        ax = plt.subplot(2, 1, 2)
+        plt.plot(anos, [c['componentes'] for c in conectividade], marker='o', label='Componentes')
+        plt.plot(anos, [c['caminho_medio'] for c in conectividade], marker='o', label='Caminho Médio')
+        plt.plot(anos, [c['diametro_efetivo'] for c in conectividade], marker='o', label='Diâmetro Efetivo (90%)')
+        marcar_avaliacoes()
+        plt.xticks(list(range(2010, 2025)))
+        plt.xlabel('Ano')
+        plt.ylabel('Valor')
+        plt.title('Conectividade dos Grafos ao Longo dos anos')
+        # Fração da componente gigante em escala própria (0 a 1)
+        eixo_fracao = ax.twinx()
+        eixo_fracao.plot(anos, [c['fracao_gigante'] for c in conectividade], marker='s', color='black',
+                         linestyle=':', label='Fração na Componente Gigante')
+        eixo_fracao.set_ylim(0, 1.05)
+        eixo_fracao.set_ylabel('Fração de nós')
+        linhas, rotulos = ax.get_legend_handles_labels()
+        linhas_fracao, rotulos_fracao = eixo_fracao.get_legend_handles_labels()
+        ax.legend(linhas + linhas_fracao, rotulos + rotulos_fracao, loc='lower left', fontsize='small')
     plt.tight_layout()
     return fig
 
 # ===================================================================
 # FUNÇÃO: plotar_ridgeline
-# Descrição: Plota um gráfico ridgeline utilizando joypy para visualizar a distribuição
-#            dos graus dos nós por ano.
+# Descrição: Plota um gráfico ridgeline da distribuição dos graus dos nós
+#            por ano. As curvas são estimadas a partir do histograma
+#            (KDE binned, ou metodo="histograma") e coloridas pelo número
+#            de vértices de cada ano.
 # ===================================================================
-def plotar_ridgeline(df_degrees: pd.DataFrame):
-    fig, axes = joypy.joyplot(
-        data=df_degrees,
-        by="ano",
-        column="degree",
-        figsize=(12, 8),
-        kind="kde",
-        overlap=1,
-        colormap=cm.viridis,
-        linecolor="black"
-    )
-    plt.xlabel("Grau (Número de Vizinhos)")
-    plt.title("Ridgeline Chart da Distribuição dos Graus por Ano\n(Coloração baseada no Número de Vértices)", y=0.90)
+def plotar_ridgeline(df_hist: pd.DataFrame, metodo="kde", sobreposicao=1.0):
+    import matplotlib.cm as cm
+    import matplotlib.pyplot as plt
+
+    grade, anos, densidades = densidades_por_ano(df_hist, metodo=metodo)
+    num_nos = df_hist.groupby('ano', sort=True)['contagem'].sum().to_numpy()
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+    # Cada curva ocupa uma faixa de altura 1; a maior densidade sobe
+    # (1 + sobreposicao) faixas, invadindo a faixa de cima
+    escala = (1 + sobreposicao) / densidades.max() if densidades.size and densidades.max() > 0 else 1.0
+    cores = cm.viridis(plt.Normalize(num_nos.min(), num_nos.max())(num_nos)) if len(anos) else []
+    for i, (ano, densidade, cor) in enumerate(zip(anos, densidades, cores)):
+        # O primeiro ano fica no topo
+        base = len(anos) - 1 - i
+        ax.fill_between(grade, base, base + densidade * escala, color=cor, zorder=2 * i)
+        ax.plot(grade, base + densidade * escala, color="black", linewidth=1, zorder=2 * i + 1)
+
+    ax.set_yticks(np.arange(len(anos))[::-1])
+    ax.set_yticklabels([str(ano) for ano in anos])
+    ax.set_xlim(grade[0], grade[-1])
+    ax.spines[['top', 'right', 'left']].set_visible(False)
+    ax.set_xlabel("Grau (Número de Vizinhos)")
+    ax.set_title("Ridgeline Chart da Distribuição dos Graus por Ano\n(Coloração baseada no Número de Vértices)")
     return fig
 
+# ===================================================================
+# FUNÇÃO: salvar_metricas
+# Descrição: Grava as métricas de cada ano em JSON (metricas_temporais.json)
+#            e o histograma dos graus em CSV (distribuicao_graus.csv), no
+#            lugar dos gráficos (modo sem gráficos).
+# ===================================================================
+def salvar_metricas(pasta_saida: str, anos: list, densidades: list, nos: list, arestas: list,
+                    graus_medios: list, df_hist: pd.DataFrame, conectividade=None):
+    registros = [{'ano': int(ano), 'densidade': float(d), 'num_nos': int(n),
+                  'num_arestas': int(a), 'grau_medio': float(gm)}
+                 for ano, d, n, a, gm in zip(anos, densidades, nos, arestas, graus_medios)]
+    for registro, c in zip(registros, conectividade or []):
+        registro.update(c)
+    with open(os.path.join(pasta_saida, "metricas_temporais.json"), "w", encoding="utf-8") as f:
+        json.dump(registros, f, ensure_ascii=False, indent=2)
+    df_hist.to_csv(os.path.join(pasta_saida, "distribuicao_graus.csv"), index=False)
+
 # ===================================================================
 # MAIN: Execução do script
+# Com graficos=False nenhuma biblioteca de gráficos é importada: as
+# métricas são gravadas em JSON/CSV (ver salvar_metricas).
 # ===================================================================
-def main():
+@instrumentar_pipeline("R1.main")
+def main(pasta_arquivos="./basedados/anos", graficos=True, pasta_saida=".", mostrar=False):
     # Etapa 1: Coleta de arquivos e definição dos anos
-    pasta_arquivos = "./basedados/anos"
-    arquivos, anos = coletar_arquivos_gexf(pasta_arquivos)
+    with etapa("coleta") as info:
+        arquivos, anos = coletar_arquivos_gexf(pasta_arquivos)
+        info['arquivos'] = len(arquivos)
+    os.makedirs(pasta_saida, exist_ok=True)
     
     # Etapa 2: Processamento das métricas dos grafos
-    densidades, nos, arestas, graus_medios, distribuicoes = processar_metricas(arquivos)
+    with etapa("processar_metricas"):
+        densidades, nos, arestas, graus_medios, distribuicoes, conectividade = processar_metricas(arquivos)
     
     # Etapa 3: Criação do DataFrame com graus dos nós por ano
-    df_degrees = criar_dataframe_graus(arquivos, anos)
-    
-    # Etapa 4: Plotagem dos gráficos
-    fig1 = plotar_metricas_temporais(anos, densidades, nos, arestas, graus_medios)
-    fig2 = plotar_ridgeline(df_degrees)
-    
-    # Exibe os gráficos
-    #plt.show()
+    with etapa("criar_dataframe_graus") as info:
+        df_hist = criar_dataframe_graus(arquivos, anos)
+        info['linhas'] = len(df_hist)
+
+    if not graficos:
+        with etapa("salvar_metricas"):
+            salvar_metricas(pasta_saida, anos, densidades, nos, arestas, graus_medios, df_hist, conectividade)
+        print(f"Métricas salvas em {os.path.join(pasta_saida, 'metricas_temporais.json')}")
+        return
     
-    # Fecha as figuras para evitar reabertura desnecessária
-    #plt.close(fig1)
-    #plt.close(fig2)
-
-    fig1.savefig("metricas_temporais.png")
-    fig2.savefig("ridgeline.png")
-    plt.close(fig1)
-    plt.close(fig2)
-    print("Gráficos salvos com sucesso!")
+    # Etapa 4: Plotagem dos gráficos, desenhados em paralelo e só quando
+    # os dados de cada um mudaram (ver exportacao.py); os gráficos só são
+    # gravados, e abertos em janelas apenas com mostrar=True
+    from exportacao import exportar_figuras, tarefa_figura
+    tarefas = [
+        tarefa_figura("metricas_temporais.png", plotar_metricas_temporais, anos=anos,
+                      densidades=densidades, nos=nos, arestas=arestas, graus_medios=graus_medios,
+                      conectividade=conectividade),
+        tarefa_figura("ridgeline.png", plotar_ridgeline, df_hist=df_hist),
+    ]
+    exportacao = exportar_figuras(tarefas, pasta_saida, mostrar=mostrar)
+    if not exportacao['erros']:
+        print("Gráficos salvos com sucesso!")
 
 
 # Executa a função main se o script for executado diretamente
@@ -1,91 +1,173 @@
-import networkx as nx
-import matplotlib.pyplot as plt
+import json
 import os
+import networkx as nx
+import numpy as np
+from cache_gexf import ler_gexf
+from centralidade import mais_centrais
+from instrumentacao import etapa, instrumentar_pipeline, tamanho_grafo
+from layouts import calcular_layout
+from rede_temporal import construir_rede_temporal, grafo_janela
 
+# Períodos de avaliação do PPgEEC. Qualquer janela "inicio-fim" pode ser
+# usada: a rede do período é consultada no armazenamento temporal montado
+# a partir dos arquivos anuais.
 periodos = ["2010-2012", "2013-2016", "2017-2020", "2021-2024"]
-caminho_arquivos = "./basedados/avaliacao_geral"
+caminho_arquivos = "./basedados/anos"
+
+# Desenha a rede de um período a partir dos arrays montados por
+# tarefa_rede_periodo e devolve a figura (executada nos workers de
+# exportacao.py). As bibliotecas de gráficos só são importadas quando uma
+# figura é de fato pedida.
+def desenhar_rede_periodo(xy, origem, destino, cores_arestas, larguras_arestas, tamanhos,
+                          eh_top5, top5, rotulos, titulo):
+    import matplotlib.pyplot as plt
+    from renderizacao import desenhar_arestas, desenhar_nos, desenhar_rotulos
+
+    # Plotagem
+    fig, ax = plt.subplots(figsize=(12, 9))
+
+    # Arestas
+    desenhar_arestas(ax, xy, origem, destino,
+                     cores=cores_arestas,
+                     larguras=larguras_arestas,
+                     alpha=0.7)
+
+    # Nós comuns (não estão no top5)
+    desenhar_nos(ax, xy, tamanhos,
+                 cor="#1C8394",
+                 mascara=~eh_top5,
+                 cor_borda='#1C8394',
+                 largura_borda=0.8,
+                 alpha=0.6)
+
+    # Top 5 nós (com outra cor)
+    desenhar_nos(ax, xy, tamanhos,
+                 cor="#390D02",    # <<< Aqui define a cor dos top 5
+                 mascara=eh_top5,
+                 cor_borda='#A52502',
+                 largura_borda=1.0,
+                 alpha=1.0)
+
+    # Top 5 nós
+    desenhar_rotulos(ax, xy, top5, rotulos,
+                     color="yellow",
+                     fontsize=9,
+                     fontweight='bold')
+
+    ax.set_title(titulo, fontsize=12)
+    ax.axis("off")
+    fig.tight_layout()
+    return fig
 
-def visualizar_rede_por_periodo(arquivo_gexf, periodo):
-    try:
-        G = nx.read_gexf(arquivo_gexf)
-    except Exception as e:
-        print(f"Erro ao carregar {arquivo_gexf}: {e}")
-        return
+
+# Monta a tarefa de exportação da figura do período: layout, tamanhos,
+# cores e destaques calculados aqui, o desenho fica para os workers.
+# Aceita o grafo do período já montado ou o caminho de um arquivo GEXF.
+# Os 5 autores destacados são os de maior `centralidade` (grau, pagerank,
+# autovetor, intermediacao ou harmonica; ver centralidade.py).
+def tarefa_rede_periodo(arquivo_gexf, periodo, centralidade="grau"):
+    from exportacao import tarefa_figura
+    from renderizacao import arrays_da_rede, cores_arestas_permanentes
+
+    if isinstance(arquivo_gexf, nx.Graph):
+        G = arquivo_gexf
+    else:
+        try:
+            G = ler_gexf(arquivo_gexf)
+        except Exception as e:
+            print(f"Erro ao carregar {arquivo_gexf}: {e}")
+            return None
 
     if G.number_of_nodes() == 0:
         print(f"Sem nós para o período {periodo}.")
-        return
+        return None
 
-    graus = dict(G.degree())
-    top5_nos = sorted(graus, key=graus.get, reverse=True)[:5]
+    # Layout em cache e aquecido a partir das posições do período anterior
+    with etapa("calcular_layout", periodo=periodo):
+        pos = calcular_layout(G, semente=42, k=0.15, aquecimento="periodos")
+    dados = arrays_da_rede(G, pos)
 
-    tamanhos = [graus[n] * 10 for n in G.nodes()]  # nó menor
-    pos = nx.spring_layout(G, seed=42, k=0.15)
+    graus = np.array([G.degree(n) for n in dados['nos']])
+    top5 = np.array([dados['indice'][n] for n, _ in mais_centrais(G, centralidade, k=5)], dtype=np.int64)
+    eh_top5 = np.zeros(len(graus), dtype=bool)
+    eh_top5[top5] = True
 
-    # Arestas
-    cores_arestas = []
-    larguras_arestas = []
-    for u, v, dados in G.edges(data=True):
-        u_perm = G.nodes[u].get("is_permanent", False)
-        v_perm = G.nodes[v].get("is_permanent", False)
-        cor = "red" if u_perm and v_perm else "black"
-        cores_arestas.append(cor)
+    # Arestas: vermelhas entre permanentes, largura proporcional às citações
+    cores_arestas = cores_arestas_permanentes(dados)
 
-        citacoes = dados.get("citation_num", 1)
-        larguras_arestas.append(float(citacoes)/10)
+    titulo = f"Rede do Período {periodo}"
+    if centralidade != "grau":
+        titulo += f" (destaque: {centralidade})"
+    return tarefa_figura(f"rede_{periodo}.png", desenhar_rede_periodo, opcoes={'format': 'png'},
+                         xy=dados['xy'], origem=dados['origem'], destino=dados['destino'],
+                         cores_arestas=cores_arestas, larguras_arestas=dados['citation_num'] / 10,
+                         tamanhos=graus * 10,  # nó menor
+                         eh_top5=eh_top5, top5=top5,
+                         rotulos=[str(dados['nos'][i]) for i in top5], titulo=titulo)
 
-    # Plotagem
-    plt.figure(figsize=(12, 9))
 
-    # Arestas
-    nx.draw_networkx_edges(G, pos,
-                        edge_color=cores_arestas,
-                        width=larguras_arestas,
-                        alpha=0.7)
-    
-        # Nós comuns (não estão no top5)
-    nos_comuns = [n for n in G.nodes() if n not in top5_nos]
-    nx.draw_networkx_nodes(G, pos,
-                        nodelist=nos_comuns,
-                        node_color="#1C8394",
-                        edgecolors='#1C8394',
-                        linewidths=0.8,
-                        node_size=[tamanhos[i] for i, n in enumerate(G.nodes()) if n in nos_comuns],
-                        alpha=0.6)
+def visualizar_rede_por_periodo(arquivo_gexf, periodo, centralidade="grau", pasta_saida="."):
+    from exportacao import exportar_figuras
 
-    # Top 5 nós (com outra cor)
-    nx.draw_networkx_nodes(G, pos,
-                        nodelist=top5_nos,
-                        node_color="#390D02",    # <<< Aqui define a cor dos top 5
-                        edgecolors='#A52502',
-                        linewidths=1.0,
-                        node_size=[tamanhos[i] for i, n in enumerate(G.nodes()) if n in top5_nos],
-                        alpha=1.0)
+    tarefa = tarefa_rede_periodo(arquivo_gexf, periodo, centralidade)
+    if tarefa is not None:
+        exportar_figuras([tarefa], pasta_saida)
 
-    # Top 5 nós
-    nx.draw_networkx_labels(G, pos,
-                            labels={n: str(n) for n in top5_nos},
-                            font_color="yellow",
-                            font_size=9,
-                            font_weight='bold')
-
-    plt.title(f"Rede do Período {periodo}", fontsize=12)
-    plt.axis("off")
-    plt.tight_layout()
-    
-    # Salvar imagem
-    plt.savefig(f"rede_{periodo}.png", format="png")
-    plt.show()
-
-
-def main():
+
+# Resumo numérico do período (modo sem gráficos): tamanho, densidade e os
+# 5 autores de maior `centralidade` com seus valores.
+def resumo_periodo(G, periodo, centralidade="grau"):
+    return {
+        'periodo': periodo,
+        'num_nos': G.number_of_nodes(),
+        'num_arestas': G.number_of_edges(),
+        'densidade': nx.density(G),
+        'centralidade': centralidade,
+        'destaques': [{'autor': str(n), 'valor': float(v)}
+                      for n, v in (mais_centrais(G, centralidade, k=5) if len(G) else [])],
+    }
+
+
+# Com graficos=False as redes não são desenhadas: o resumo de cada período
+# é gravado em periodos.json em `pasta_saida`.
+@instrumentar_pipeline("R2.main")
+def main(periodos=periodos, centralidade="grau", pasta_arquivos=caminho_arquivos,
+         graficos=True, pasta_saida="."):
+    try:
+        with etapa("construir_rede_temporal") as info:
+            rede = construir_rede_temporal(pasta_arquivos)
+            info['arestas'] = len(rede['aresta_origem'])
+    except Exception as e:
+        print(f"Erro ao carregar {pasta_arquivos}: {e}")
+        return
+    os.makedirs(pasta_saida, exist_ok=True)
+
+    resumos = []
+    tarefas = []
     for periodo in periodos:
-        arquivo = os.path.join(caminho_arquivos, f"{periodo}.gexf")
-        if os.path.exists(arquivo):
-            print(f"Visualizando período: {periodo}")
-            visualizar_rede_por_periodo(arquivo, periodo)
+        inicio, fim = (int(ano) for ano in periodo.split("-"))
+        print(f"Visualizando período: {periodo}")
+        with etapa("grafo_janela", periodo=periodo) as info:
+            G = grafo_janela(rede, inicio, fim)
+            info.update(tamanho_grafo(G))
+        if graficos:
+            with etapa("tarefa_rede_periodo", periodo=periodo):
+                tarefa = tarefa_rede_periodo(G, periodo, centralidade)
+            if tarefa is not None:
+                tarefas.append(tarefa)
         else:
-            print(f"Arquivo não encontrado para o período: {periodo}")
+            with etapa("resumo_periodo", periodo=periodo):
+                resumos.append(resumo_periodo(G, periodo, centralidade))
+
+    if graficos:
+        # As figuras dos períodos são independentes: desenhadas em paralelo
+        from exportacao import exportar_figuras
+        exportar_figuras(tarefas, pasta_saida)
+    else:
+        caminho = os.path.join(pasta_saida, "periodos.json")
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(resumos, f, ensure_ascii=False, indent=2)
+        print(f"Resumo dos períodos salvo em {caminho}")
 
 if __name__ == "__main__":
     main()
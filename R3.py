@@ -1,8 +1,19 @@
 import networkx as nx
 import glob
-import matplotlib.pyplot as plt
+import json
 import numpy as np
 import os
+import grafo_compacto
+from cache_gexf import ler_gexf, preparar_snapshot
+from centralidade import mais_centrais
+from ego_lote import metricas_ego, metricas_ego_anos
+from instrumentacao import etapa, instrumentar_pipeline, tamanho_grafo
+from layouts import calcular_layout
+from metricas_esparsas import adjacencia_de_grafo, limite_percentil
+from nucleos import analisar_limiares
+from paralelo import mapear_arquivos, numero_workers
+from rede_temporal import compacto_janela, construir_rede_temporal
+from uniao import unir_grafos
 
 # =============================================================================
 # FUNÇÃO: coletar_arquivos_gexf
@@ -27,13 +38,21 @@ def coletar_arquivos_gexf(pasta: str):
 
 # =============================================================================
 # FUNÇÃO: ler_grafos
-# Descrição: Lê cada arquivo GEXF e retorna a lista de grafos
+# Descrição: Lê cada arquivo GEXF e retorna a lista de grafos. Com workers > 1
+#            a conversão dos arquivos para snapshots é feita em um pool de
+#            processos e o processo principal só abre os snapshots prontos.
 # =============================================================================
-def ler_grafos(arquivos: list):
+def ler_grafos(arquivos: list, workers=None):
+    if numero_workers(workers) > 1:
+        preparados = mapear_arquivos(preparar_snapshot, arquivos, workers)
+        arquivos = [a for a, p in zip(arquivos, preparados) if p is not None]
+
     grafos = []
     for arquivo in arquivos:
         try:
-            G = nx.read_gexf(arquivo)
+            with etapa("ler_gexf", arquivo=arquivo) as info:
+                G = ler_gexf(arquivo)
+                info.update(tamanho_grafo(G))
             grafos.append(G)
         except Exception as e:
             print(f"Erro ao processar {arquivo}: {e}")
@@ -45,61 +64,91 @@ def ler_grafos(arquivos: list):
 
 # =============================================================================
 # PASSO 1: Gerar a rede geral (união dos grafos de 2010 a 2025)
+# A união é feita em uma única passada (uniao.unir_grafos). Atributos
+# repetidos são combinados pelos redutores: por padrão num_paper e
+# citation_num são somados entre os anos, e cada aresta guarda em
+# `mascara_anos` os anos em que aparece.
 # =============================================================================
-def gerar_rede_geral(grafos: list):
+def gerar_rede_geral(grafos: list, anos=None, redutores_no=None, redutores_aresta=None):
     if not grafos:
         raise ValueError("Lista de grafos vazia.")
     
-    # Inicia com o primeiro grafo da lista
-    rede_geral = grafos[0].copy()  # Criamos uma cópia para não modificar o original
-    
-    # Une os demais grafos (a operação compose garante a união dos nós e arestas)
-    for g in grafos[1:]:
-        rede_geral = nx.compose(rede_geral, g)
-    
-    return rede_geral
+    return unir_grafos(grafos, rotulos=anos,
+                       redutores_no=redutores_no,
+                       redutores_aresta=redutores_aresta)
 
 # =============================================================================
 # PASSO 2: Definir X (número mínimo de vizinhos)
 # Metodologia: Utilizamos o percentil 80 da distribuição dos graus dos nós
 # da rede geral. Dessa forma, focamos em nós com alta conectividade.
+# Aceita o nx.Graph ou o grafo compacto (grafo_compacto.py).
 # =============================================================================
+def graus_da_rede(G):
+    # Grau de cada nó, na ordem dos nós (laços contam 2). No nx.Graph os
+    # graus são lidos direto, sem montar a matriz de adjacência
+    if grafo_compacto.eh_compacto(G):
+        return grafo_compacto.grau(G)
+    return np.fromiter((d for _, d in G.degree()), dtype=np.int64, count=G.number_of_nodes())
+
 def definir_limite_minimo(rede_geral: nx.Graph, percentil=80):
-    if rede_geral.number_of_nodes() == 0:
+    graus = graus_da_rede(rede_geral)
+    if len(graus) == 0:
         raise ValueError("Rede vazia. Não é possível calcular o limite mínimo.")
     
-    graus = [d for n, d in rede_geral.degree()]
-    X = np.percentile(graus, percentil)
     # Como o grau é inteiro, arredondamos para o inteiro superior
-    X = int(np.ceil(X))
+    X = limite_percentil(graus, percentil)
     print(f"Definido X = {X} (Percentil {percentil} da distribuição dos graus)")
     return X
 
+# =============================================================================
+# FUNÇÃO: subgrafo_ordenado
+# Descrição: Cópia do sub-grafo induzido por `nos`, com nós e arestas na
+#            ordem de `nos` e da rede original. G.subgraph(nos).copy() segue
+#            a ordem de um set, que muda entre execuções (e mudaria o hash
+#            das figuras em exportacao.py).
+# =============================================================================
+def subgrafo_ordenado(G: nx.Graph, nos: list):
+    conjunto = set(nos)
+    subgrafo = G.__class__()
+    subgrafo.graph.update(G.graph)
+    subgrafo.add_nodes_from((n, dict(G.nodes[n])) for n in nos)
+    subgrafo.add_edges_from((u, v, dict(d)) for u, v, d in G.edges(nos, data=True) if v in conjunto)
+    return subgrafo
+
 # =============================================================================
 # PASSO 3: Gerar o sub-grafo com nós com grau >= X
+# O sub-grafo é do mesmo tipo da rede geral (nx.Graph ou grafo compacto).
 # =============================================================================
 def gerar_subgrafo(rede_geral: nx.Graph, X: int):
-    # Filtra os nós que possuem grau >= X
-    nos_filtrados = [n for n, d in rede_geral.degree() if d >= X]
+    # Filtra os nós que possuem grau >= X (máscara vetorizada sobre os graus)
+    mascara = graus_da_rede(rede_geral) >= X
     
-    if not nos_filtrados:
+    if not mascara.any():
         print(f"Aviso: Nenhum nó com grau >= {X} encontrado.")
+    if grafo_compacto.eh_compacto(rede_geral):
+        # Filtra os arrays direto, sem montar um nx.Graph
+        return grafo_compacto.subgrafo(rede_geral, mascara)
+    if not mascara.any():
         return nx.Graph()
     
-    subgrafo = rede_geral.subgraph(nos_filtrados).copy()
+    nos = list(rede_geral)
+    subgrafo = subgrafo_ordenado(rede_geral, [nos[i] for i in np.flatnonzero(mascara)])
     return subgrafo
 
 # =============================================================================
 # PASSO 4: Calcular e comparar a densidade dos grafos
 # =============================================================================
+def _densidade(G):
+    return grafo_compacto.densidade(G) if grafo_compacto.eh_compacto(G) else nx.density(G)
+
 def comparar_densidade(rede_geral: nx.Graph, subgrafo: nx.Graph):
-    densidade_geral = nx.density(rede_geral)
+    densidade_geral = _densidade(rede_geral)
     
-    if subgrafo.number_of_nodes() <= 1:
+    if tamanho_grafo(subgrafo)['nos'] <= 1:
         densidade_subgrafo = 0
         print("Aviso: Subgrafo possui 1 ou 0 nós, densidade definida como 0.")
     else:
-        densidade_subgrafo = nx.density(subgrafo)
+        densidade_subgrafo = _densidade(subgrafo)
     
     print(f"Densidade da rede geral: {densidade_geral:.6f}")
     print(f"Densidade do sub-grafo: {densidade_subgrafo:.6f}")
@@ -113,171 +162,380 @@ def comparar_densidade(rede_geral: nx.Graph, subgrafo: nx.Graph):
 
 # =============================================================================
 # PASSO 5: Visualizar a rede geral e o sub-grafo
+# desenhar_comparacao_grafos recebe só os arrays (é executada nos workers de
+# exportacao.py); tarefa_comparacao_grafos calcula o layout e monta os
+# arrays. Com `destaque` (nome de uma centralidade), os k autores mais
+# centrais da rede geral são destacados em laranja nos dois painéis. O
+# layout e o desenho usam o nx.Graph: grafos compactos são convertidos.
 # =============================================================================
-def visualizar_grafos(rede_geral: nx.Graph, subgrafo: nx.Graph):
-    if rede_geral.number_of_nodes() == 0:
-        print("Aviso: Rede geral vazia. Visualização cancelada.")
-        return
-    
-    # Utiliza o mesmo layout para facilitar comparação
-    pos = nx.spring_layout(rede_geral, seed=42)  # fixa o seed para consistência
-    plt.figure(figsize=(14, 6))
+def desenhar_comparacao_grafos(geral, sub, titulo_geral, titulo_sub):
+    import matplotlib.pyplot as plt
+    from renderizacao import desenhar_arestas, desenhar_nos
+
+    fig, (ax_geral, ax_sub) = plt.subplots(1, 2, figsize=(14, 6))
     
     # Plotando a rede geral
-    plt.subplot(1, 2, 1)
     # Arestas
-    nx.draw_networkx_edges(rede_geral, pos=pos,
-                        edge_color='black',
-                        width=0.5,
-                        alpha=0.5)
+    desenhar_arestas(ax_geral, geral['xy'], geral['origem'], geral['destino'],
+                     cores='black',
+                     larguras=0.5,
+                     alpha=0.5)
     # Nós
-    nx.draw_networkx_nodes(rede_geral, pos=pos,
-                        node_color="#1C8394",
-                        node_size=20,
-                        alpha=0.6,
-                        edgecolors='#1C8394',
-                        linewidths=0.5)
-    
-    plt.title(f"Rede Geral (2010-2025)\n{rede_geral.number_of_nodes()} nós, {rede_geral.number_of_edges()} arestas", fontsize=12)
-    plt.axis('off')
+    desenhar_nos(ax_geral, geral['xy'], 20,
+                 cor="#1C8394",
+                 alpha=0.6,
+                 cor_borda='#1C8394',
+                 largura_borda=0.5)
+    if geral['central'].any():
+        desenhar_nos(ax_geral, geral['xy'], 80, cor="#FFA500", mascara=geral['central'],
+                     cor_borda='black', largura_borda=1.0)
     
-    # Plotando o sub-grafo
-    plt.subplot(1, 2, 2)
+    ax_geral.set_title(titulo_geral, fontsize=12)
+    ax_geral.axis('off')
     
-    if subgrafo.number_of_nodes() > 0:
+    # Plotando o sub-grafo (mesmas posições da rede geral)
+    if sub is not None:
         # Arestas
-        nx.draw_networkx_edges(subgrafo, pos={node: pos[node] for node in subgrafo.nodes() if node in pos},
-                            edge_color='black',
-                            width=0.8,
-                            alpha=0.7)
+        desenhar_arestas(ax_sub, sub['xy'], sub['origem'], sub['destino'],
+                         cores='black',
+                         larguras=0.8,
+                         alpha=0.7)
         # Nós
-        nx.draw_networkx_nodes(subgrafo, pos={node: pos[node] for node in subgrafo.nodes() if node in pos},
-                            node_color="#390D02",
-                            node_size=40,
-                            alpha=0.9, 
-                            edgecolors='#A52502',
-                            linewidths=0.8)
-        
-        plt.title(f"Sub-Grafo (vértices com grau >= X)\n{subgrafo.number_of_nodes()} nós, {subgrafo.number_of_edges()} arestas", fontsize=12)
+        desenhar_nos(ax_sub, sub['xy'], 40,
+                     cor="#390D02",
+                     alpha=0.9,
+                     cor_borda='#A52502',
+                     largura_borda=0.8)
+        if sub['central'].any():
+            desenhar_nos(ax_sub, sub['xy'], 80, cor="#FFA500", mascara=sub['central'],
+                         cor_borda='black', largura_borda=1.0)
+    else:
+        ax_sub.text(0.5, 0.5, "Subgrafo vazio", fontsize=14, ha='center')
+    
+    ax_sub.set_title(titulo_sub, fontsize=12)
+    ax_sub.axis('off')
+    fig.tight_layout()
+    return fig
+
+def tarefa_comparacao_grafos(rede_geral: nx.Graph, subgrafo: nx.Graph, destaque=None, k=10):
+    from exportacao import tarefa_figura
+    from renderizacao import arrays_da_rede
+
+    if grafo_compacto.eh_compacto(rede_geral):
+        rede_geral = grafo_compacto.para_networkx(rede_geral)
+    if grafo_compacto.eh_compacto(subgrafo):
+        subgrafo = grafo_compacto.para_networkx(subgrafo)
+    if rede_geral.number_of_nodes() == 0:
+        print("Aviso: Rede geral vazia. Visualização cancelada.")
+        return None
+    
+    # Utiliza o mesmo layout para facilitar comparação
+    # Layout multinível (mais rápido na rede geral), guardado em cache
+    # Fixa o seed para consistência
+    pos = calcular_layout(rede_geral, metodo="multinivel", semente=42, aquecimento="geral")
+    centrais = set() if destaque is None else {n for n, _ in mais_centrais(rede_geral, destaque, k=k)}
+
+    def _arrays(G):
+        dados = arrays_da_rede(G, pos)
+        return {'xy': dados['xy'], 'origem': dados['origem'], 'destino': dados['destino'],
+                'central': np.array([n in centrais for n in dados['nos']], dtype=bool)}
+
+    titulo_sub = "Sub-Grafo (vértices com grau >= X)"
+    if subgrafo.number_of_nodes() > 0:
+        titulo_sub += f"\n{subgrafo.number_of_nodes()} nós, {subgrafo.number_of_edges()} arestas"
+    return tarefa_figura(
+        "comparacao_grafos.png", desenhar_comparacao_grafos, opcoes={'dpi': 300, 'bbox_inches': 'tight'},
+        geral=_arrays(rede_geral),
+        sub=_arrays(subgrafo) if subgrafo.number_of_nodes() > 0 else None,
+        titulo_geral=f"Rede Geral (2010-2025)\n{rede_geral.number_of_nodes()} nós, {rede_geral.number_of_edges()} arestas",
+        titulo_sub=titulo_sub)
+
+# Com `figuras` (lista), a tarefa é acrescentada para ser exportada junto
+# com as demais; sem ela, a figura é exportada na hora.
+def visualizar_grafos(rede_geral: nx.Graph, subgrafo: nx.Graph, destaque=None, k=10, pasta_saida=".",
+                      figuras=None):
+    from exportacao import exportar_figuras
+
+    tarefa = tarefa_comparacao_grafos(rede_geral, subgrafo, destaque, k)
+    if tarefa is None:
+        return
+    if figuras is not None:
+        figuras.append(tarefa)
     else:
-        plt.text(0.5, 0.5, "Subgrafo vazio", fontsize=14, ha='center')
-        plt.title("Sub-Grafo (vértices com grau >= X)", fontsize=12)
+        exportar_figuras([tarefa], pasta_saida)
+
+# Desenha a rede ego a partir dos arrays montados em analisar_rede_ego
+# (executada nos workers de exportacao.py).
+def desenhar_rede_ego(xy, origem, destino, cores_nos, tamanhos_nos, titulo):
+    import matplotlib.pyplot as plt
+    from renderizacao import desenhar_arestas, desenhar_nos
+
+    # Desenha as arestas e nós
+    fig, ax = plt.subplots(figsize=(10, 10))
+    desenhar_arestas(ax, xy, origem, destino,
+                     cores='black', larguras=1.0, alpha=0.7)
+    desenhar_nos(ax, xy, tamanhos_nos,
+                 cor=cores_nos,
+                 alpha=0.8,
+                 cor_borda='black',
+                 largura_borda=1.5)
     
-    plt.axis('off')
-    plt.tight_layout()
-    plt.savefig("comparacao_grafos.png", dpi=300, bbox_inches='tight')
-    plt.show()
+    ax.set_title(titulo, fontsize=16)
+    ax.axis('off')
+    return fig
 
 # =============================================================================
 # PASSO 6: Analisar a rede ego de um vértice escolhido
+# Sem vértice escolhido, usa o de maior `centralidade` (ver centralidade.py).
+# Com graficos=False só as métricas são calculadas, sem desenhar a rede.
+# Com `figuras` (lista), a figura é acrescentada como tarefa em vez de ser
+# exportada na hora (ver visualizar_grafos).
+# A rede ego é calculada sobre o grafo compacto (um nx.Graph é convertido)
+# e retornada nesse formato; só o desenho usa o nx.Graph.
 # =============================================================================
-def analisar_rede_ego(rede_geral: nx.Graph, no_escolhido=None, raio=1):
-    if rede_geral.number_of_nodes() == 0:
+def analisar_rede_ego(rede_geral: nx.Graph, no_escolhido=None, raio=1, centralidade="grau",
+                      graficos=True, pasta_saida=".", figuras=None):
+    if not grafo_compacto.eh_compacto(rede_geral):
+        rede_geral = grafo_compacto.de_networkx(rede_geral)
+    if grafo_compacto.num_nos(rede_geral) == 0:
         print("Aviso: Rede vazia. Impossível analisar rede ego.")
         return None
     
-    # Se nenhum nó for escolhido, seleciona o de maior grau
-    if no_escolhido is None or no_escolhido not in rede_geral.nodes():
-        if rede_geral.number_of_nodes() > 0:
-            no_escolhido = max(rede_geral.degree, key=lambda x: x[1])[0]
-            print(f"Nó escolhido automaticamente: {no_escolhido} (maior grau)")
-        else:
-            print("Erro: Rede não possui nós.")
-            return None
+    # Se nenhum nó for escolhido, seleciona o de maior centralidade
+    if no_escolhido is None or not grafo_compacto.contem(rede_geral, no_escolhido):
+        no_escolhido = mais_centrais(rede_geral, centralidade, k=1)[0][0]
+        print(f"Nó escolhido automaticamente: {no_escolhido} (maior {centralidade})")
     
     # Gera a rede ego com o raio especificado
-    ego = nx.ego_graph(rede_geral, no_escolhido, radius=raio)
+    ego = grafo_compacto.grafo_ego(rede_geral, no_escolhido, raio)
     
     print(f"Análise da rede ego do vértice {no_escolhido}:")
-    print(f"- Número de vizinhos (1º nível): {len(list(rede_geral.neighbors(no_escolhido)))}")
-    print(f"- Tamanho total da rede ego (raio {raio}): {ego.number_of_nodes()} nós")
-    print(f"- Densidade da rede ego: {nx.density(ego):.6f}")
+    print(f"- Número de vizinhos (1º nível): {len(grafo_compacto.vizinhos(rede_geral, no_escolhido))}")
+    print(f"- Tamanho total da rede ego (raio {raio}): {grafo_compacto.num_nos(ego)} nós")
+    print(f"- Densidade da rede ego: {grafo_compacto.densidade(ego):.6f}")
     
     # Coeficiente de clustering
     try:
-        clustering = nx.clustering(ego, no_escolhido)
+        clustering = grafo_compacto.clustering(ego, no_escolhido)
         print(f"- Coeficiente de clustering: {clustering:.6f}")
     except:
         print("- Não foi possível calcular o coeficiente de clustering")
     
+    if not graficos:
+        return ego
+    
     # Visualização
-    pos = nx.spring_layout(ego, seed=42)
-    
-    # Define cores e tamanhos
-    node_colors = []
-    node_sizes = []
-    for node in ego.nodes():
-        if node == no_escolhido:
-            node_colors.append('#FFA500')  # Laranja para o nó central
-            node_sizes.append(600)
-        else:
-            node_colors.append('#1C8394')  # Azul para os vizinhos
-            grau = ego.degree[node]
-            node_sizes.append(100 + grau * 10)  # Tamanho proporcional ao grau
+    from exportacao import exportar_figuras, tarefa_figura
+    from renderizacao import arrays_da_rede
     
-    # Desenha as arestas e nós
-    plt.figure(figsize=(10, 10))
-    nx.draw_networkx_edges(ego, pos, edge_color='black', width=1.0, alpha=0.7)
-    nx.draw_networkx_nodes(ego, pos, 
-                          node_color=node_colors,
-                          alpha=0.8,
-                          node_size=node_sizes,
-                          edgecolors='black',
-                          linewidths=1.5)
-    
-    plt.title(f"Rede Ego do Vértice: {no_escolhido} (raio={raio})", fontsize=16)
-    plt.axis('off')
-    plt.savefig(f"rede_ego_{no_escolhido}.png", dpi=300, bbox_inches='tight')
-    plt.show()
+    # Parte das posições dos autores na rede geral, se já calculadas, sem
+    # gravar as coordenadas da rede ego no aquecimento da rede geral
+    ego_nx = grafo_compacto.para_networkx(ego)
+    pos = calcular_layout(ego_nx, semente=42, aquecimento="geral", atualizar_aquecimento=False)
+    
+    dados = arrays_da_rede(ego_nx, pos)
+    
+    # Define cores e tamanhos: laranja para o nó central, azul para os
+    # vizinhos, com tamanho proporcional ao grau
+    central = np.array([n == str(no_escolhido) for n in dados['nos']])
+    graus = np.array([ego_nx.degree[n] for n in dados['nos']])
+    node_colors = np.where(central, '#FFA500', '#1C8394').tolist()
+    node_sizes = np.where(central, 600, 100 + graus * 10)
+    
+    tarefa = tarefa_figura(f"rede_ego_{no_escolhido}.png", desenhar_rede_ego,
+                           opcoes={'dpi': 300, 'bbox_inches': 'tight'},
+                           xy=dados['xy'], origem=dados['origem'], destino=dados['destino'],
+                           cores_nos=node_colors, tamanhos_nos=node_sizes,
+                           titulo=f"Rede Ego do Vértice: {no_escolhido} (raio={raio})")
+    if figuras is not None:
+        figuras.append(tarefa)
+    else:
+        exportar_figuras([tarefa], pasta_saida)
     
     return ego
 
 # =============================================================================
-# MAIN: Execução do script expandido
+# FUNÇÃO: salvar_json
+# Descrição: Grava um resumo numérico em `pasta_saida` (modo sem gráficos).
+# =============================================================================
+def salvar_json(pasta_saida: str, nome: str, dados):
+    caminho = os.path.join(pasta_saida, nome)
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False, indent=2)
+    print(f"Resumo salvo em {caminho}")
+
 # =============================================================================
-def main_expanded():
-    # Caminho para os arquivos GEXF
-    pasta_arquivos = "./avaliacao_total"
+# FUNÇÃO: carregar_rede_geral
+# Descrição: Monta a rede geral, como grafo compacto (grafo_compacto.py), a
+#            partir dos arquivos anuais de `pasta_arquivos`: todos os anos
+#            ou só a `janela` (ano inicial, ano final), consultados no
+#            armazenamento temporal desses arquivos. Se os arquivos não
+#            couberem no armazenamento (nomes sem o ano, atributos fora do
+#            snapshot), a rede geral é montada pela união dos grafos.
+# =============================================================================
+def carregar_rede_geral(pasta_arquivos: str, janela=None):
+    if janela is not None:
+        inicio, fim = janela
+        print(f"Consultando janela {inicio}-{fim} em: {pasta_arquivos}")
+        with etapa("compacto_janela", janela=f"{inicio}-{fim}") as info:
+            rede_geral = compacto_janela(construir_rede_temporal(pasta_arquivos), inicio, fim)
+            info.update(tamanho_grafo(rede_geral))
+        return rede_geral
+
     print(f"Buscando arquivos em: {pasta_arquivos}")
-    
     try:
-        # Coleta e leitura dos grafos
+        with etapa("construir_rede_temporal") as info:
+            rede = construir_rede_temporal(pasta_arquivos)
+            info['arquivos'] = len(rede['anos'])
+        print(f"Encontrados {len(rede['anos'])} arquivos GEXF")
+        with etapa("compacto_janela") as info:
+            rede_geral = compacto_janela(rede, rede['anos'][0], rede['anos'][-1])
+            info.update(tamanho_grafo(rede_geral))
+        return rede_geral
+    except ValueError as e:
+        print(f"Armazenamento temporal indisponível ({e}). Unindo os grafos.")
+    
+    # Coleta e leitura dos grafos
+    with etapa("coleta") as info:
         arquivos, anos = coletar_arquivos_gexf(pasta_arquivos)
-        print(f"Encontrados {len(arquivos)} arquivos GEXF")
-        
-        if not arquivos:
-            print("Nenhum arquivo GEXF encontrado. Verifique o caminho.")
-            return
-        
+        info['arquivos'] = len(arquivos)
+    print(f"Encontrados {len(arquivos)} arquivos GEXF")
+    
+    if not arquivos:
+        print("Nenhum arquivo GEXF encontrado. Verifique o caminho.")
+        return None
+    
+    with etapa("ler_grafos"):
         grafos = ler_grafos(arquivos)
-        print(f"Carregados {len(grafos)} grafos")
-        
-        # Gerar a rede geral unindo os grafos
-        rede_geral = gerar_rede_geral(grafos)
-        print(f"Rede geral: {rede_geral.number_of_nodes()} nós, {rede_geral.number_of_edges()} arestas")
-        
-        # Definir valor de X com base no percentil 80 da distribuição de graus
-        X = definir_limite_minimo(rede_geral, percentil=80)
-        
-        # Gerar sub-grafo com nós que possuem pelo menos X vizinhos
-        subgrafo = gerar_subgrafo(rede_geral, X)
-        print(f"Sub-grafo: {subgrafo.number_of_nodes()} nós, {subgrafo.number_of_edges()} arestas")
-        
-        # Comparar densidades
-        densidade_geral, densidade_subgrafo = comparar_densidade(rede_geral, subgrafo)
+    print(f"Carregados {len(grafos)} grafos")
+    
+    # Gerar a rede geral unindo os grafos
+    # Os anos só identificam as arestas se todos os arquivos foram lidos
+    with etapa("gerar_rede_geral") as info:
+        rede_geral = gerar_rede_geral(grafos, anos=anos if len(grafos) == len(anos) else None)
+        info.update(tamanho_grafo(rede_geral))
+    return grafo_compacto.de_networkx(rede_geral)
+
+# =============================================================================
+# MAIN: Execução do script expandido
+# `etapas` escolhe as análises: "uniao" (rede geral x sub-grafo de grau >= X)
+# e "ego" (rede ego do vértice escolhido e métricas ego de todos os
+# autores). Com graficos=False nada é desenhado e nenhuma biblioteca de
+# gráficos é importada: os resumos vão para uniao_subgrafo.json e
+# rede_ego.json em `pasta_saida`. Com por_ano=True a etapa "ego" também
+# grava as métricas ego de cada ano (metricas_ego_anos.csv, na janela se
+# houver); com apenas_permanentes=True as tabelas de métricas ego só têm
+# os docentes permanentes.
+# =============================================================================
+@instrumentar_pipeline("R3.main_expanded")
+def main_expanded(janela=None, vertice_escolhido="57214422700", centralidade=None,
+                  pasta_arquivos="./basedados/anos", graficos=True, pasta_saida=".",
+                  etapas=("uniao", "ego"), por_ano=False, apenas_permanentes=False):
+    try:
+        rede_geral = carregar_rede_geral(pasta_arquivos, janela)
+        if rede_geral is None:
+            return
+        print(f"Rede geral: {grafo_compacto.num_nos(rede_geral)} nós, {grafo_compacto.num_arestas(rede_geral)} arestas")
+        os.makedirs(pasta_saida, exist_ok=True)
+        # Figuras das duas etapas, exportadas juntas no final
+        figuras = []
         
-        # Visualizar as redes
-        visualizar_grafos(rede_geral, subgrafo)
+        if "uniao" in etapas:
+            # Definir valor de X com base no percentil 80 da distribuição de graus
+            with etapa("definir_limite_minimo") as info:
+                X = definir_limite_minimo(rede_geral, percentil=80)
+                info['limite'] = int(X)
+            
+            # Gerar sub-grafo com nós que possuem pelo menos X vizinhos
+            with etapa("gerar_subgrafo") as info:
+                subgrafo = gerar_subgrafo(rede_geral, X)
+                info.update(tamanho_grafo(subgrafo))
+            print(f"Sub-grafo: {grafo_compacto.num_nos(subgrafo)} nós, {grafo_compacto.num_arestas(subgrafo)} arestas")
+            
+            # Comparar densidades
+            with etapa("comparar_densidade"):
+                densidade_geral, densidade_subgrafo = comparar_densidade(rede_geral, subgrafo)
+            
+            # Tamanho e densidade para todos os limites X, k-cores e rich-club
+            with etapa("analisar_limiares") as info:
+                limiares = analisar_limiares(adjacencia_de_grafo(rede_geral)[1])
+                info['limites'] = len(limiares)
+            limiares.to_csv(os.path.join(pasta_saida, "limiares_rede_geral.csv"), index=False)
+            degeneracao = int(limiares.loc[limiares['nucleo_nos'] > 0, 'limite'].max())
+            print(f"Núcleo máximo: k={degeneracao} "
+                  f"({int(limiares['nucleo_nos'][degeneracao])} nós); curvas salvas em limiares_rede_geral.csv")
+            
+            # Visualizar as redes
+            if graficos:
+                with etapa("visualizar_grafos"):
+                    visualizar_grafos(rede_geral, subgrafo, destaque=centralidade, pasta_saida=pasta_saida,
+                                      figuras=figuras)
+            else:
+                salvar_json(pasta_saida, "uniao_subgrafo.json", {
+                    'limite_minimo': int(X),
+                    'rede_geral': {'num_nos': grafo_compacto.num_nos(rede_geral),
+                                   'num_arestas': grafo_compacto.num_arestas(rede_geral),
+                                   'densidade': float(densidade_geral)},
+                    'subgrafo': {'num_nos': grafo_compacto.num_nos(subgrafo),
+                                 'num_arestas': grafo_compacto.num_arestas(subgrafo),
+                                 'densidade': float(densidade_subgrafo)},
+                    'nucleo_maximo': {'k': degeneracao,
+                                      'num_nos': int(limiares['nucleo_nos'][degeneracao]),
+                                      'densidade': float(limiares['nucleo_densidade'][degeneracao])},
+                })
         
-        # Configurar o ID do vértice para analisar a rede ego
-        # Mantemos o vértice escolhido pelo usuário, mas com verificação de existência
-        vertice_escolhido = "57214422700"
-        if vertice_escolhido not in rede_geral.nodes():
-            print(f"Vértice {vertice_escolhido} não encontrado. Usando o de maior grau.")
-            vertice_escolhido = None
+        if "ego" in etapas:
+            # ID do vértice para analisar a rede ego
+            # Mantemos o vértice escolhido pelo usuário, mas com verificação de existência
+            if not grafo_compacto.contem(rede_geral, vertice_escolhido):
+                print(f"Vértice {vertice_escolhido} não encontrado. Usando o de maior {centralidade or 'grau'}.")
+                vertice_escolhido = None
+            
+            # Analisar a rede ego do vértice escolhido
+            with etapa("analisar_rede_ego") as info:
+                ego = analisar_rede_ego(rede_geral, no_escolhido=vertice_escolhido, raio=1,
+                                        centralidade=centralidade or "grau",
+                                        graficos=graficos, pasta_saida=pasta_saida, figuras=figuras)
+                if ego is not None:
+                    info.update(tamanho_grafo(ego))
+            
+            # Métricas ego de todos os autores, calculadas em lote e salvas em tabela
+            with etapa("metricas_ego") as info:
+                df_ego = metricas_ego(rede_geral, raio=1)
+                if apenas_permanentes:
+                    df_ego = df_ego[df_ego['is_permanent']]
+                info['linhas'] = len(df_ego)
+            df_ego.to_csv(os.path.join(pasta_saida, "metricas_ego.csv"), index=False)
+            print(f"Métricas ego de {len(df_ego)} autores salvas em metricas_ego.csv")
+            
+            # Métricas ego de cada ano, direto dos snapshots anuais
+            if por_ano:
+                with etapa("metricas_ego_anos") as info:
+                    arquivos, anos = coletar_arquivos_gexf(pasta_arquivos)
+                    if janela is not None:
+                        selecionados = [i for i, ano in enumerate(anos) if janela[0] <= ano <= janela[1]]
+                        arquivos = [arquivos[i] for i in selecionados]
+                        anos = [anos[i] for i in selecionados]
+                    df_anos = metricas_ego_anos(arquivos, anos, raio=1, apenas_permanentes=apenas_permanentes)
+                    info['linhas'] = len(df_anos)
+                df_anos.to_csv(os.path.join(pasta_saida, "metricas_ego_anos.csv"), index=False)
+                print(f"Métricas ego por ano ({len(df_anos)} linhas) salvas em metricas_ego_anos.csv")
+            
+            if not graficos and ego is not None:
+                central = vertice_escolhido or mais_centrais(rede_geral, centralidade or "grau", k=1)[0][0]
+                salvar_json(pasta_saida, "rede_ego.json", {
+                    'vertice': str(central),
+                    'raio': 1,
+                    'vizinhos': len(grafo_compacto.vizinhos(rede_geral, central)),
+                    'num_nos': grafo_compacto.num_nos(ego),
+                    'num_arestas': grafo_compacto.num_arestas(ego),
+                    'densidade': grafo_compacto.densidade(ego),
+                    'clustering': grafo_compacto.clustering(ego, central),
+                })
         
-        # Analisar a rede ego do vértice escolhido
-        ego = analisar_rede_ego(rede_geral, no_escolhido=vertice_escolhido, raio=1)
+        if figuras:
+            from exportacao import exportar_figuras
+            exportar_figuras(figuras, pasta_saida)
         
         print("\nAnálise de rede concluída com sucesso!")
     
@@ -287,4 +545,4 @@ def main_expanded():
         print(traceback.format_exc())
 
 if __name__ == "__main__":
-    main_expanded()
\ No newline at end of file
+    main_expanded()
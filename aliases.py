@@ -0,0 +1,86 @@
+import csv
+import hashlib
+import os
+
+# ===================================================================
+# Mapa de aliases de autores
+# O mesmo autor pode aparecer com vários ids Scopus. A deduplicação
+# (deduplicacao.py) grava, na pasta dos arquivos GEXF, o arquivo
+# aliases.csv com uma linha por id duplicado:
+#   alias, canonico, nome_alias, nome_canonico, similaridade
+# Os carregadores (cache_gexf.carregar_snapshot / ler_gexf e
+# metricas_stream) trocam cada alias pelo id canônico ao montar os
+# grafos. O arquivo pode ser revisado à mão: apagar uma linha desfaz a
+# fusão daquele id. Sem o arquivo, os grafos são lidos como estão.
+# ===================================================================
+
+ARQUIVO_ALIASES = "aliases.csv"
+COLUNAS = ['alias', 'canonico', 'nome_alias', 'nome_canonico', 'similaridade']
+
+# Mapas já lidos, indexados por (caminho, mtime, tamanho)
+_memoria = {}
+
+def caminho_aliases(pasta: str):
+    return os.path.join(pasta, ARQUIVO_ALIASES)
+
+def _chave(caminho: str):
+    try:
+        info = os.stat(caminho)
+    except OSError:
+        return None
+    return os.path.abspath(caminho), info.st_mtime_ns, info.st_size
+
+# ===================================================================
+# FUNÇÃO: ler_aliases
+# Descrição: Dicionário alias -> id canônico da pasta ({} se não houver
+#            mapa). Cadeias (a -> b -> c) são resolvidas até o fim.
+# ===================================================================
+def ler_aliases(pasta: str):
+    caminho = caminho_aliases(pasta)
+    chave = _chave(caminho)
+    if chave is None:
+        return {}
+    if chave not in _memoria:
+        with open(caminho, newline='', encoding='utf-8') as f:
+            mapa = {linha['alias']: linha['canonico'] for linha in csv.DictReader(f)
+                    if linha.get('alias') and linha.get('canonico') and linha['alias'] != linha['canonico']}
+        for alias in mapa:
+            destino, vistos = mapa[alias], {alias}
+            while destino in mapa and destino not in vistos:
+                vistos.add(destino)
+                destino = mapa[destino]
+            mapa[alias] = destino
+        _memoria.clear()
+        _memoria[chave] = mapa
+    return _memoria[chave]
+
+def aliases_do_arquivo(arquivo: str):
+    return ler_aliases(os.path.dirname(os.path.abspath(arquivo)))
+
+# ===================================================================
+# FUNÇÃO: impressao_aliases
+# Descrição: Hash curto do mapa de aliases que vale para o arquivo ("" sem
+#            mapa), usado nas chaves dos caches de métricas.
+# ===================================================================
+def impressao_aliases(arquivo: str):
+    mapa = aliases_do_arquivo(arquivo)
+    if not mapa:
+        return ""
+    sha = hashlib.sha256()
+    for alias in sorted(mapa):
+        sha.update(f"{alias}>{mapa[alias]};".encode())
+    return sha.hexdigest()[:16]
+
+# ===================================================================
+# FUNÇÃO: gravar_aliases
+# Descrição: Grava o mapa (lista de dicionários com as COLUNAS) na pasta.
+# ===================================================================
+def gravar_aliases(pasta: str, linhas: list):
+    caminho = caminho_aliases(pasta)
+    temporario = caminho + ".tmp"
+    with open(temporario, 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.DictWriter(f, fieldnames=COLUNAS)
+        escritor.writeheader()
+        escritor.writerows(linhas)
+    os.replace(temporario, caminho)
+    return caminho
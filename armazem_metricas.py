@@ -0,0 +1,172 @@
+import os
+import sqlite3
+from collections import Counter
+import numpy as np
+from aliases import impressao_aliases
+from cache_gexf import impressao_digital
+from conectividade import numero_amostras
+from metricas_stream import metricas_gexf_lote
+
+# ===================================================================
+# Armazém persistente de métricas (SQLite)
+# As métricas de cada arquivo anual (as de metricas_stream.metricas_gexf:
+# densidade, tamanho, graus, distribuição e conectividade) são gravadas
+# indexadas pelo hash SHA-256 do arquivo. Em uma nova execução só os
+# arquivos novos ou alterados são processados; os demais vêm do armazém.
+# A tabela `arquivos` guarda o último mtime/tamanho visto de cada
+# caminho, para que arquivos que não mudaram nem precisem ter o hash
+# recalculado. Com um mapa de aliases de
+# autores na pasta (aliases.py), a chave é o hash seguido do hash do
+# mapa, pois as métricas mudam com as fusões.
+# ===================================================================
+
+CAMINHO_ARMAZEM = os.path.join(".", ".cache", "metricas.sqlite")
+
+# Incrementar quando a definição das métricas mudar: os registros de
+# versões anteriores são recalculados
+# 2: métricas de conectividade (componentes, caminho médio, diâmetro)
+VERSAO_METRICAS = 2
+
+# Colunas acrescentadas depois da criação do esquema: bancos antigos
+# ganham as colunas ao serem abertos (os valores vêm do recálculo)
+COLUNAS_CONECTIVIDADE = [
+    ('componentes', 'INTEGER'),
+    ('maior_componente', 'INTEGER'),
+    ('fracao_gigante', 'REAL'),
+    ('caminho_medio', 'REAL'),
+    ('diametro_efetivo', 'REAL'),
+    ('diametro', 'INTEGER'),
+    ('amostras_caminhos', 'INTEGER'),
+]
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS arquivos (
+    caminho TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    tamanho INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metricas (
+    sha256 TEXT PRIMARY KEY,
+    versao INTEGER NOT NULL,
+    densidade REAL NOT NULL,
+    num_nos INTEGER NOT NULL,
+    num_arestas INTEGER NOT NULL,
+    grau_medio REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS distribuicao (
+    sha256 TEXT NOT NULL,
+    posicao INTEGER NOT NULL,
+    grau INTEGER NOT NULL,
+    contagem INTEGER NOT NULL,
+    PRIMARY KEY (sha256, posicao)
+);
+"""
+
+# ===================================================================
+# FUNÇÃO: abrir_armazem
+# Descrição: Abre (criando se necessário) o banco SQLite do armazém.
+# ===================================================================
+def abrir_armazem(caminho=CAMINHO_ARMAZEM):
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    conexao = sqlite3.connect(caminho)
+    conexao.executescript(ESQUEMA)
+    existentes = {linha[1] for linha in conexao.execute("PRAGMA table_info(metricas)")}
+    for coluna, tipo in COLUNAS_CONECTIVIDADE + [('amostras_solicitadas', 'INTEGER')]:
+        if coluna not in existentes:
+            conexao.execute(f"ALTER TABLE metricas ADD COLUMN {coluna} {tipo}")
+    return conexao
+
+# ===================================================================
+# FUNÇÃO: _hash_arquivo
+# Descrição: Retorna o SHA-256 do arquivo, reaproveitando o valor gravado
+#            se o mtime e o tamanho não mudaram.
+# ===================================================================
+def _hash_arquivo(conexao, arquivo: str):
+    caminho = os.path.abspath(arquivo)
+    rapida = impressao_digital(arquivo, calcular_hash=False)
+    linha = conexao.execute("SELECT mtime_ns, tamanho, sha256 FROM arquivos WHERE caminho = ?",
+                            (caminho,)).fetchone()
+    if linha and linha[0] == rapida['mtime_ns'] and linha[1] == rapida['tamanho']:
+        return linha[2]
+
+    digital = impressao_digital(arquivo)
+    conexao.execute("INSERT OR REPLACE INTO arquivos VALUES (?, ?, ?, ?)",
+                    (caminho, digital['mtime_ns'], digital['tamanho'], digital['sha256']))
+    return digital['sha256']
+
+# Registros da versão atual e com o mesmo número de fontes na BFS
+# amostrada (REDES_AMOSTRAS), já que o valor das distâncias depende dele
+def _ler_metricas(conexao, sha256: str):
+    colunas = ", ".join(coluna for coluna, _ in COLUNAS_CONECTIVIDADE)
+    linha = conexao.execute(
+        f"SELECT densidade, num_nos, num_arestas, grau_medio, {colunas}, amostras_solicitadas FROM metricas "
+        "WHERE sha256 = ? AND versao = ?", (sha256, VERSAO_METRICAS)).fetchone()
+    if linha is None or linha[-1] != numero_amostras():
+        return None
+
+    distribuicao = Counter()
+    for grau, contagem in conexao.execute(
+            "SELECT grau, contagem FROM distribuicao WHERE sha256 = ? ORDER BY posicao", (sha256,)):
+        distribuicao[grau] = contagem
+    metricas = {
+        'densidade': linha[0],
+        'num_nos': linha[1],
+        'num_arestas': linha[2],
+        'grau_medio': linha[3],
+        'distribuicao': distribuicao,
+        # A ordem dos nós não é guardada, só a quantidade de cada grau
+        'graus': np.repeat(np.array(list(distribuicao), dtype=np.int64),
+                           np.array(list(distribuicao.values()), dtype=np.int64)),
+    }
+    metricas.update(zip((coluna for coluna, _ in COLUNAS_CONECTIVIDADE), linha[4:-1]))
+    return metricas
+
+def _gravar_metricas(conexao, sha256: str, metricas: dict):
+    colunas = ["sha256", "versao", "densidade", "num_nos", "num_arestas", "grau_medio"]
+    colunas += [coluna for coluna, _ in COLUNAS_CONECTIVIDADE] + ["amostras_solicitadas"]
+    valores = [sha256, VERSAO_METRICAS, metricas['densidade'], metricas['num_nos'],
+               metricas['num_arestas'], metricas['grau_medio']]
+    valores += [metricas[coluna] for coluna, _ in COLUNAS_CONECTIVIDADE] + [numero_amostras()]
+    conexao.execute(f"INSERT OR REPLACE INTO metricas ({', '.join(colunas)}) "
+                    f"VALUES ({', '.join('?' * len(colunas))})", valores)
+    conexao.execute("DELETE FROM distribuicao WHERE sha256 = ?", (sha256,))
+    conexao.executemany("INSERT INTO distribuicao VALUES (?, ?, ?, ?)",
+                        [(sha256, i, grau, contagem)
+                         for i, (grau, contagem) in enumerate(metricas['distribuicao'].items())])
+
+# ===================================================================
+# FUNÇÃO: metricas_armazenadas
+# Descrição: Retorna as métricas de cada arquivo (mesmo formato de
+#            metricas_stream.metricas_gexf), calculando apenas os arquivos
+#            que ainda não estão no armazém. Arquivos com erro resultam em
+#            None. A ordem dos arquivos é preservada.
+# ===================================================================
+def metricas_armazenadas(arquivos: list, workers=None, caminho=CAMINHO_ARMAZEM):
+    conexao = abrir_armazem(caminho)
+    try:
+        hashes = []
+        resultados = []
+        for arquivo in arquivos:
+            try:
+                sha256 = _hash_arquivo(conexao, arquivo)
+                mapa = impressao_aliases(arquivo)
+                if mapa:
+                    sha256 = f"{sha256}:{mapa}"
+            except OSError:
+                # Deixa o erro ser reportado pelo cálculo, como nos demais casos
+                sha256 = None
+            hashes.append(sha256)
+            resultados.append(None if sha256 is None else _ler_metricas(conexao, sha256))
+
+        pendentes = [i for i, r in enumerate(resultados) if r is None]
+        calculadas = metricas_gexf_lote([arquivos[i] for i in pendentes], workers)
+        for i, metricas in zip(pendentes, calculadas):
+            if metricas is not None and hashes[i] is not None:
+                _gravar_metricas(conexao, hashes[i], metricas)
+            resultados[i] = metricas
+
+        conexao.commit()
+        return resultados
+    finally:
+        conexao.close()
@@ -0,0 +1,291 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Os scripts do projeto ficam na raiz do repositório
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.environ.setdefault("REDES_LOTE", "1")
+
+import networkx as nx
+import numpy as np
+import grafo_compacto
+import metricas_stream
+import R1
+import R3
+from cache_gexf import ler_gexf
+from ego_lote import metricas_ego
+from layouts import calcular_layout
+from rede_temporal import compacto_janela, construir_rede_temporal
+from gerador_sintetico import gerar_rede_sintetica
+
+# ===================================================================
+# Suíte de benchmarks do pipeline
+# Para cada tamanho de população gera uma rede temporal sintética
+# (gerador_sintetico) e mede cada etapa do pipeline de R1/R3:
+#   coleta -> leitura -> processar_metricas -> criar_dataframe_graus ->
+#   gerar_rede_geral -> definir_limite_minimo/gerar_subgrafo ->
+#   analisar_rede_ego (sem figuras) -> layout
+# A rede geral, o sub-grafo e a rede ego também são medidos com o grafo
+# compacto (grafo_compacto.py), o formato usado por R3.
+# Para cada etapa são registrados o tempo de relógio, o tempo de CPU, o
+# pico de memória alocada (tracemalloc, em uma segunda execução, para não
+# distorcer os tempos), o RSS máximo do processo e o tamanho dos grafos.
+# Os resultados vão para um arquivo JSON, que pode ser comparado com o de
+# uma execução anterior (--comparar) para detectar regressões.
+#
+# Uso:  python benchmarks/executar_benchmarks.py --tamanhos 1000 10000
+# ===================================================================
+
+VERSAO_RESULTADOS = 1
+
+# Acima deste número de nós o layout da rede geral não é medido
+# (a repulsão do Fruchterman-Reingold é quadrática)
+LIMITE_NOS_LAYOUT = 20000
+
+# ===================================================================
+# FUNÇÃO: limpar_caches
+# Descrição: Remove os caches em disco (snapshots, armazém de métricas,
+#            layouts) e a memória do metricas_stream, para medir a etapa
+#            a frio.
+# ===================================================================
+def limpar_caches(pasta_base: str, pasta_anos: str):
+    for pasta in (os.path.join(pasta_base, ".cache"), os.path.join(pasta_anos, ".cache")):
+        shutil.rmtree(pasta, ignore_errors=True)
+    metricas_stream._memoria.clear()
+
+def _rss_max_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KiB, macOS em bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def _tamanho_grafo(G):
+    if grafo_compacto.eh_compacto(G):
+        return {'nos': grafo_compacto.num_nos(G), 'arestas': grafo_compacto.num_arestas(G)}
+    return {'nos': G.number_of_nodes(), 'arestas': G.number_of_edges()}
+
+def _tamanho_grafos(grafos):
+    return {'nos': sum(G.number_of_nodes() for G in grafos),
+            'arestas': sum(G.number_of_edges() for G in grafos)}
+
+# ===================================================================
+# FUNÇÃO: medir
+# Descrição: Executa `funcao` (sem saída no terminal) e retorna o
+#            resultado e as medidas. Com memoria=True a função é executada
+#            uma segunda vez sob tracemalloc; `preparar` é chamada antes
+#            de cada execução (ex.: limpar os caches).
+# ===================================================================
+def medir(funcao, preparar=None, memoria=True):
+    if preparar:
+        preparar()
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio_cpu = time.process_time()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempo = time.perf_counter() - inicio
+        cpu = time.process_time() - inicio_cpu
+
+    medidas = {'tempo_s': tempo, 'cpu_s': cpu, 'pico_memoria_mb': None}
+    if memoria:
+        if preparar:
+            preparar()
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                funcao()
+            medidas['pico_memoria_mb'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+    medidas['rss_max_mb'] = _rss_max_mb()
+    return resultado, medidas
+
+# ===================================================================
+# FUNÇÃO: executar_tamanho
+# Descrição: Gera a rede de `num_autores` autores e mede todas as etapas.
+#            Retorna a lista de registros (um por etapa).
+# ===================================================================
+def executar_tamanho(num_autores: int, pasta: str, num_anos=16, semente=42,
+                     workers=None, memoria=True, reutilizar=False):
+    pasta_base = os.path.join(pasta, str(num_autores))
+    pasta_anos = os.path.join(pasta_base, "anos")
+    registros = []
+
+    def registrar(etapa, medidas, **tamanhos):
+        registro = {'autores': num_autores, 'etapa': etapa, **medidas, **tamanhos}
+        registros.append(registro)
+        print(f"  {etapa:<28} {medidas['tempo_s']:9.3f} s"
+              + (f" {medidas['pico_memoria_mb']:10.1f} MB" if medidas['pico_memoria_mb'] is not None else ""))
+
+    print(f"\n=== {num_autores} autores ===")
+    if not (reutilizar and os.path.isdir(pasta_anos)):
+        shutil.rmtree(pasta_base, ignore_errors=True)
+        _, medidas = medir(lambda: gerar_rede_sintetica(pasta_anos, num_autores, num_anos, semente),
+                           memoria=False)
+        registrar("geracao", medidas)
+
+    diretorio_original = os.getcwd()
+    # Os caches relativos (armazém, layouts) ficam dentro da pasta do tamanho
+    os.chdir(pasta_base)
+    limpar = lambda: limpar_caches(pasta_base, pasta_anos)
+    try:
+        (arquivos, anos), medidas = medir(lambda: R1.coletar_arquivos_gexf(pasta_anos), memoria=memoria)
+        registrar("coleta", medidas, arquivos=len(arquivos))
+
+        grafos, medidas = medir(lambda: [nx.read_gexf(a) for a in arquivos], memoria=memoria)
+        registrar("leitura_networkx", medidas, **_tamanho_grafos(grafos))
+        del grafos
+
+        grafos, medidas = medir(lambda: [ler_gexf(a) for a in arquivos], preparar=limpar, memoria=memoria)
+        registrar("leitura_snapshot_frio", medidas, **_tamanho_grafos(grafos))
+
+        grafos, medidas = medir(lambda: [ler_gexf(a) for a in arquivos], memoria=memoria)
+        registrar("leitura_snapshot_quente", medidas, **_tamanho_grafos(grafos))
+
+        def _processar():
+            # Limpa só o armazém e a memória: os snapshots não são usados aqui
+            shutil.rmtree(os.path.join(pasta_base, ".cache"), ignore_errors=True)
+            metricas_stream._memoria.clear()
+        _, medidas = medir(lambda: R1.processar_metricas(arquivos, workers),
+                           preparar=_processar, memoria=memoria)
+        registrar("processar_metricas", medidas, arquivos=len(arquivos))
+
+        df, medidas = medir(lambda: R1.criar_dataframe_graus(arquivos, anos, workers), memoria=memoria)
+        registrar("criar_dataframe_graus", medidas, linhas=len(df))
+        del df
+
+        # Os valores entram como argumentos padrão: os nomes são apagados
+        # com del logo depois de cada medida
+        rede_geral, medidas = medir(lambda lista=grafos: R3.gerar_rede_geral(lista, anos=anos),
+                                    memoria=memoria)
+        registrar("gerar_rede_geral", medidas, **_tamanho_grafo(rede_geral))
+        del grafos
+
+        X, medidas = medir(lambda: R3.definir_limite_minimo(rede_geral), memoria=memoria)
+        registrar("definir_limite_minimo", medidas, limite=int(X))
+
+        subgrafo, medidas = medir(lambda: R3.gerar_subgrafo(rede_geral, X), memoria=memoria)
+        registrar("gerar_subgrafo", medidas, **_tamanho_grafo(subgrafo))
+        del subgrafo
+
+        # Rede ego de R3 (sem figuras), a partir do nx.Graph da rede geral
+        central = max(rede_geral.degree, key=lambda x: x[1])[0]
+        ego, medidas = medir(lambda: R3.analisar_rede_ego(rede_geral, central, graficos=False),
+                             memoria=memoria)
+        registrar("ego_individual", medidas, **_tamanho_grafo(ego))
+
+        # Mesmas etapas sobre o grafo compacto
+        def _rede_compacta():
+            rede = construir_rede_temporal(pasta_anos)
+            return compacto_janela(rede, rede['anos'][0], rede['anos'][-1])
+        rede_compacta, medidas = medir(_rede_compacta, memoria=memoria)
+        registrar("gerar_rede_compacta", medidas, **_tamanho_grafo(rede_compacta),
+                  bytes=grafo_compacto.memoria(rede_compacta))
+
+        subgrafo, medidas = medir(lambda rede=rede_compacta: R3.gerar_subgrafo(rede, X), memoria=memoria)
+        registrar("gerar_subgrafo_compacto", medidas, **_tamanho_grafo(subgrafo))
+        del subgrafo
+
+        ego, medidas = medir(lambda rede=rede_compacta: R3.analisar_rede_ego(rede, central, graficos=False),
+                             memoria=memoria)
+        registrar("ego_individual_compacto", medidas, **_tamanho_grafo(ego))
+        del rede_compacta
+
+        df_ego, medidas = medir(lambda: metricas_ego(rede_geral, raio=1), memoria=memoria)
+        registrar("ego_lote", medidas, linhas=len(df_ego))
+        del df_ego
+
+        if rede_geral.number_of_nodes() <= LIMITE_NOS_LAYOUT:
+            limpar_layouts = lambda: shutil.rmtree(os.path.join(pasta_base, ".cache", "layouts"),
+                                                   ignore_errors=True)
+            _, medidas = medir(lambda: calcular_layout(rede_geral, metodo="multinivel"),
+                               preparar=limpar_layouts, memoria=memoria)
+            registrar("layout_multinivel", medidas, **_tamanho_grafo(rede_geral))
+        else:
+            print(f"  {'layout_multinivel':<28} ignorado (> {LIMITE_NOS_LAYOUT} nós)")
+    finally:
+        os.chdir(diretorio_original)
+    return registros
+
+# ===================================================================
+# FUNÇÃO: comparar_resultados
+# Descrição: Imprime a razão de tempo (atual / anterior) de cada etapa
+#            em relação a um JSON de uma execução anterior, marcando as
+#            que ficaram mais lentas que `tolerancia`.
+# ===================================================================
+def comparar_resultados(atuais: list, caminho_anterior: str, tolerancia=1.2):
+    with open(caminho_anterior, encoding="utf-8") as f:
+        anteriores = {(r['autores'], r['etapa']): r for r in json.load(f)['resultados']}
+
+    print(f"\nComparação com {caminho_anterior}:")
+    regressoes = 0
+    for registro in atuais:
+        anterior = anteriores.get((registro['autores'], registro['etapa']))
+        if anterior is None or anterior['tempo_s'] <= 0:
+            continue
+        razao = registro['tempo_s'] / anterior['tempo_s']
+        marca = "  <-- regressão" if razao > tolerancia else ""
+        regressoes += razao > tolerancia
+        print(f"  {registro['autores']:>8} {registro['etapa']:<28} {razao:6.2f}x{marca}")
+    return regressoes
+
+def _ambiente(workers):
+    return {
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'processadores': os.cpu_count(),
+        'workers': workers,
+        'networkx': nx.__version__,
+        'numpy': np.__version__,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline de redes de coautoria.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1000, 10000],
+                        help="Populações de autores a medir (ex.: 1000 10000 100000 1000000)")
+    parser.add_argument("--anos", type=int, default=16)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Workers de processar_metricas (padrão: REDES_WORKERS)")
+    parser.add_argument("--pasta", default=os.path.join(tempfile.gettempdir(), "redes_benchmark"),
+                        help="Pasta onde os dados sintéticos são gerados")
+    parser.add_argument("--reutilizar", action="store_true",
+                        help="Reutiliza os dados já gerados na pasta")
+    parser.add_argument("--sem-memoria", action="store_true",
+                        help="Não mede o pico de memória (tracemalloc)")
+    parser.add_argument("--saida", default="resultados_benchmark.json")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    args = parser.parse_args()
+
+    resultados = []
+    for num_autores in args.tamanhos:
+        resultados.extend(executar_tamanho(num_autores, args.pasta, args.anos, args.semente,
+                                           args.workers, not args.sem_memoria, args.reutilizar))
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump({
+            'versao': VERSAO_RESULTADOS,
+            'data': datetime.now().isoformat(timespec="seconds"),
+            'ambiente': _ambiente(args.workers),
+            'parametros': {'anos': args.anos, 'semente': args.semente},
+            'resultados': resultados,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados salvos em {args.saida}")
+
+    if args.comparar and comparar_resultados(resultados, args.comparar):
+        sys.exit(1)
@@ -0,0 +1,197 @@
+import argparse
+import os
+from xml.sax.saxutils import quoteattr
+import numpy as np
+
+# ===================================================================
+# Gerador sintético de redes temporais de coautoria
+# Gera arquivos <ano>_authors_network.gexf com os mesmos atributos dos
+# arquivos reais de basedados/anos (complete_name, h_index,
+# is_permanent nos nós; num_paper, citation_num nas arestas), para
+# populações de 10³ a 10⁶ autores.
+#
+# Modelo (todo vetorizado em NumPy):
+#   - cada autor pertence a um grupo de pesquisa, liderado por docentes
+#     permanentes, e fica ativo por um intervalo de anos;
+#   - a cada ano são gerados artigos; o primeiro autor é sorteado entre
+#     os ativos com peso maior para permanentes e h_index alto, e os
+#     coautores vêm, na maior parte, do mesmo grupo;
+#   - cada artigo forma uma clique entre seus autores; num_paper conta os
+#     artigos do par no ano e citation_num soma as citações deles.
+# ===================================================================
+
+ANO_INICIAL = 2010
+FRACAO_PERMANENTES = 0.03
+AUTORES_POR_GRUPO = 40
+ARTIGOS_POR_AUTOR_ATIVO = 1.5
+PROB_MESMO_GRUPO = 0.8
+TAMANHO_MAXIMO_EQUIPE = 8
+
+NOMES = ["Ana", "Bruno", "Carla", "Daniel", "Eduardo", "Fernanda", "Gabriel", "Helena",
+         "Igor", "Joana", "Lucas", "Marina", "Nelson", "Olga", "Paulo", "Rafaela",
+         "Sergio", "Tatiana", "Ulisses", "Vanessa", "Wagner", "Yasmin"]
+SOBRENOMES = ["Silva", "Souza", "Oliveira", "Santos", "Lima", "Pereira", "Costa", "Ferreira",
+              "Rodrigues", "Almeida", "Nascimento", "Carvalho", "Araujo", "Ribeiro", "Gomes",
+              "Martins", "Barbosa", "Rocha", "Dias", "Teixeira", "Medeiros", "Fernandes"]
+
+# ===================================================================
+# FUNÇÃO: gerar_autores
+# Descrição: Sorteia a população de autores: ids no formato Scopus,
+#            nomes, h_index, is_permanent, grupo e período de atividade.
+# ===================================================================
+def gerar_autores(num_autores: int, num_anos: int, rng):
+    # Ids crescentes com saltos aleatórios (únicos), depois embaralhados
+    ids = 7000000000 + np.cumsum(rng.integers(1, 20000, num_autores))
+    ids = rng.permutation(ids)
+
+    permanente = rng.random(num_autores) < FRACAO_PERMANENTES
+    h_index = rng.geometric(0.4, num_autores)
+    h_index[permanente] += rng.integers(5, 30, permanente.sum())
+
+    num_grupos = max(1, num_autores // AUTORES_POR_GRUPO)
+    grupo = rng.integers(0, num_grupos, num_autores)
+
+    # Permanentes ficam ativos o período todo; os demais por alguns anos
+    inicio = rng.integers(0, num_anos, num_autores)
+    duracao = rng.geometric(0.3, num_autores)
+    inicio[permanente] = 0
+    duracao[permanente] = num_anos
+
+    nome = rng.integers(0, len(NOMES), num_autores)
+    sobrenome = rng.integers(0, len(SOBRENOMES), (num_autores, 2))
+    nomes = [f"{NOMES[a]} {SOBRENOMES[b]} {SOBRENOMES[c]}" for a, (b, c) in zip(nome, sobrenome)]
+
+    return {
+        'ids': ids,
+        'nomes': nomes,
+        'h_index': h_index.astype(np.int64),
+        'permanente': permanente,
+        'grupo': grupo,
+        'inicio': inicio,
+        'fim': inicio + duracao,
+    }
+
+# ===================================================================
+# FUNÇÃO: gerar_ano
+# Descrição: Gera as arestas agregadas de um ano: (origem, destino) em
+#            índices de autores, num_paper e citation_num.
+# ===================================================================
+def gerar_ano(autores: dict, ano: int, rng):
+    ativos = np.flatnonzero((autores['inicio'] <= ano) & (ano < autores['fim']))
+    if len(ativos) < 2:
+        vazio = np.array([], dtype=np.int64)
+        return vazio, vazio, vazio, vazio
+
+    num_artigos = max(1, int(len(ativos) * ARTIGOS_POR_AUTOR_ATIVO / 3))
+
+    # Primeiro autor: peso maior para permanentes e h_index alto
+    peso = autores['h_index'][ativos] * np.where(autores['permanente'][ativos], 10.0, 1.0)
+    lider = rng.choice(ativos, size=num_artigos, p=peso / peso.sum())
+
+    # Ativos ordenados por grupo, para sortear coautores do mesmo grupo
+    ordem = ativos[np.argsort(autores['grupo'][ativos], kind='stable')]
+    grupos_ordenados = autores['grupo'][ordem]
+    inicio_grupo = np.searchsorted(grupos_ordenados, autores['grupo'][lider], side='left')
+    fim_grupo = np.searchsorted(grupos_ordenados, autores['grupo'][lider], side='right')
+
+    tamanho = np.minimum(2 + rng.poisson(2.5, num_artigos), TAMANHO_MAXIMO_EQUIPE)
+    equipe = np.full((num_artigos, TAMANHO_MAXIMO_EQUIPE), -1, dtype=np.int64)
+    equipe[:, 0] = lider
+    for j in range(1, TAMANHO_MAXIMO_EQUIPE):
+        do_grupo = ordem[inicio_grupo + (rng.random(num_artigos) * (fim_grupo - inicio_grupo)).astype(np.int64)]
+        qualquer = ativos[rng.integers(0, len(ativos), num_artigos)]
+        escolhido = np.where(rng.random(num_artigos) < PROB_MESMO_GRUPO, do_grupo, qualquer)
+        equipe[:, j] = np.where(j < tamanho, escolhido, -1)
+
+    citacoes = rng.poisson(rng.lognormal(1.5, 1.0, num_artigos)).astype(np.int64)
+
+    # Clique entre os autores de cada artigo
+    a, b = np.triu_indices(TAMANHO_MAXIMO_EQUIPE, k=1)
+    u = equipe[:, a].ravel()
+    v = equipe[:, b].ravel()
+    cit = np.repeat(citacoes, len(a))
+    valida = (u >= 0) & (v >= 0) & (u != v)
+    u, v, cit = np.minimum(u[valida], v[valida]), np.maximum(u[valida], v[valida]), cit[valida]
+
+    # Agrega artigos repetidos do mesmo par
+    chave = u * len(autores['ids']) + v
+    unicas, inverso = np.unique(chave, return_inverse=True)
+    num_paper = np.bincount(inverso).astype(np.int64)
+    citation_num = np.bincount(inverso, weights=cit).astype(np.int64)
+    return unicas // len(autores['ids']), unicas % len(autores['ids']), num_paper, citation_num
+
+# ===================================================================
+# FUNÇÃO: escrever_gexf
+# Descrição: Grava o GEXF no mesmo formato produzido pelo NetworkX para os
+#            arquivos reais, escrevendo elemento a elemento.
+# ===================================================================
+def escrever_gexf(caminho: str, autores: dict, origem, destino, num_paper, citation_num):
+    nos = np.unique(np.concatenate([origem, destino]))
+    ids = autores['ids']
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write("<?xml version='1.0' encoding='utf-8'?>\n"
+                '<gexf xmlns="http://www.gexf.net/1.2draft" '
+                'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+                'xsi:schemaLocation="http://www.gexf.net/1.2draft http://www.gexf.net/1.2draft/gexf.xsd" '
+                'version="1.2">\n'
+                '  <meta lastmodifieddate="2025-01-01">\n'
+                '    <creator>gerador_sintetico</creator>\n'
+                '  </meta>\n'
+                '  <graph defaultedgetype="undirected" mode="static" name="">\n'
+                '    <attributes mode="static" class="edge">\n'
+                '      <attribute id="3" title="num_paper" type="long" />\n'
+                '      <attribute id="4" title="citation_num" type="long" />\n'
+                '    </attributes>\n'
+                '    <attributes mode="static" class="node">\n'
+                '      <attribute id="0" title="complete_name" type="string" />\n'
+                '      <attribute id="1" title="h_index" type="long" />\n'
+                '      <attribute id="2" title="is_permanent" type="boolean" />\n'
+                '    </attributes>\n'
+                '    <nodes>\n')
+        for i in nos.tolist():
+            f.write(f'      <node id="{ids[i]}" label="{ids[i]}">\n'
+                    '        <attvalues>\n'
+                    f'          <attvalue for="0" value={quoteattr(autores["nomes"][i])} />\n'
+                    f'          <attvalue for="1" value="{autores["h_index"][i]}" />\n'
+                    f'          <attvalue for="2" value="{"true" if autores["permanente"][i] else "false"}" />\n'
+                    '        </attvalues>\n'
+                    '      </node>\n')
+        f.write('    </nodes>\n    <edges>\n')
+        for k, (u, v, p, c) in enumerate(zip(origem.tolist(), destino.tolist(),
+                                             num_paper.tolist(), citation_num.tolist())):
+            f.write(f'      <edge source="{ids[u]}" target="{ids[v]}" id="{k}">\n'
+                    '        <attvalues>\n'
+                    f'          <attvalue for="3" value="{p}" />\n'
+                    f'          <attvalue for="4" value="{c}" />\n'
+                    '        </attvalues>\n'
+                    '      </edge>\n')
+        f.write('    </edges>\n  </graph>\n</gexf>\n')
+
+# ===================================================================
+# FUNÇÃO: gerar_rede_sintetica
+# Descrição: Gera `num_anos` arquivos anuais em `pasta` e retorna a lista
+#            de caminhos.
+# ===================================================================
+def gerar_rede_sintetica(pasta: str, num_autores: int, num_anos=16, semente=42):
+    rng = np.random.default_rng(semente)
+    os.makedirs(pasta, exist_ok=True)
+    autores = gerar_autores(num_autores, num_anos, rng)
+
+    arquivos = []
+    for k in range(num_anos):
+        origem, destino, num_paper, citation_num = gerar_ano(autores, k, rng)
+        caminho = os.path.join(pasta, f"{ANO_INICIAL + k}_authors_network.gexf")
+        escrever_gexf(caminho, autores, origem, destino, num_paper, citation_num)
+        arquivos.append(caminho)
+    return arquivos
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera redes temporais de coautoria sintéticas.")
+    parser.add_argument("pasta", help="Pasta de saída dos arquivos .gexf")
+    parser.add_argument("--autores", type=int, default=1000, help="Tamanho da população de autores")
+    parser.add_argument("--anos", type=int, default=16, help="Número de anos (a partir de 2010)")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    for caminho in gerar_rede_sintetica(args.pasta, args.autores, args.anos, args.semente):
+        print(caminho)
@@ -0,0 +1,386 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import networkx as nx
+import numpy as np
+from aliases import aliases_do_arquivo
+
+# ===================================================================
+# Cache binário dos arquivos GEXF
+# Cada arquivo .gexf é convertido uma única vez para um "snapshot" em
+# disco (pasta .cache ao lado do arquivo), composto por arrays NumPy:
+#   - adjacência em formato CSR (indptr/indices) e lista de arestas;
+#   - colunas dos atributos dos nós e das arestas.
+# Nas execuções seguintes os arrays são abertos com memory-map, sem
+# precisar analisar o XML novamente. O snapshot é invalidado quando o
+# mtime/tamanho do arquivo muda e o hash SHA-256 não confere mais.
+#
+# O snapshot guarda o arquivo como está; o mapa de aliases de autores
+# (aliases.py), se existir na pasta, é aplicado ao carregar.
+# ===================================================================
+
+VERSAO_SNAPSHOT = 1
+NOME_PASTA_CACHE = ".cache"
+
+# Atributos suportados pelo snapshot e o tipo de cada coluna
+ATRIBUTOS_NO = {
+    "label": str,
+    "complete_name": str,
+    "h_index": np.int64,
+    "is_permanent": np.bool_,
+}
+ATRIBUTOS_ARESTA = {
+    "id": str,
+    "num_paper": np.int64,
+    "citation_num": np.int64,
+}
+
+# ===================================================================
+# FUNÇÃO: impressao_digital
+# Descrição: Retorna mtime, tamanho e (opcionalmente) o hash SHA-256 do
+#            arquivo, usados para validar o snapshot.
+# ===================================================================
+def impressao_digital(arquivo: str, calcular_hash=True):
+    info = os.stat(arquivo)
+    digital = {'mtime_ns': info.st_mtime_ns, 'tamanho': info.st_size}
+    if calcular_hash:
+        sha = hashlib.sha256()
+        with open(arquivo, 'rb') as f:
+            for bloco in iter(lambda: f.read(1 << 20), b''):
+                sha.update(bloco)
+        digital['sha256'] = sha.hexdigest()
+    return digital
+
+def _pasta_snapshot(arquivo: str):
+    pasta, nome = os.path.split(os.path.abspath(arquivo))
+    return os.path.join(pasta, NOME_PASTA_CACHE, os.path.splitext(nome)[0])
+
+# ===================================================================
+# FUNÇÃO: _snapshot_valido
+# Descrição: Verifica se o snapshot corresponde ao arquivo atual. Se só o
+#            mtime mudou mas o conteúdo é o mesmo (hash igual), atualiza
+#            os metadados e reaproveita o snapshot.
+# ===================================================================
+def _snapshot_valido(arquivo: str, pasta: str):
+    caminho_meta = os.path.join(pasta, "meta.json")
+    try:
+        with open(caminho_meta, encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    if meta.get('versao') != VERSAO_SNAPSHOT:
+        return False
+
+    atual = impressao_digital(arquivo, calcular_hash=False)
+    if atual['mtime_ns'] == meta['mtime_ns'] and atual['tamanho'] == meta['tamanho']:
+        return True
+
+    atual = impressao_digital(arquivo)
+    if atual['sha256'] != meta['sha256']:
+        return False
+
+    meta.update(atual)
+    with open(caminho_meta, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    return True
+
+# ===================================================================
+# FUNÇÃO: construir_csr
+# Descrição: Monta a adjacência CSR a partir da lista de arestas. Para
+#            cada entrada guarda também o índice da aresta de origem, de
+#            forma que as colunas das arestas possam ser consultadas pela
+#            adjacência. Laços (u == u) aparecem uma única vez na linha.
+# ===================================================================
+def construir_csr(origem: np.ndarray, destino: np.ndarray, num_nos: int):
+    laco = origem == destino
+    linhas = np.concatenate([origem, destino[~laco]])
+    colunas = np.concatenate([destino, origem[~laco]])
+    arestas = np.concatenate([np.arange(len(origem)), np.flatnonzero(~laco)])
+    ordem = np.lexsort((colunas, linhas))
+
+    indptr = np.zeros(num_nos + 1, dtype=np.int64)
+    np.cumsum(np.bincount(linhas, minlength=num_nos), out=indptr[1:])
+    return indptr, colunas[ordem].astype(np.int32), arestas[ordem].astype(np.int64)
+
+def _coluna(valores: list, tipo):
+    # Valores ausentes viram o valor "vazio" do tipo e são marcados na máscara
+    presente = np.array([v is not None for v in valores], dtype=np.bool_)
+    if tipo is str:
+        coluna = np.array(["" if v is None else str(v) for v in valores], dtype=str)
+    else:
+        coluna = np.array([0 if v is None else v for v in valores], dtype=tipo)
+    return coluna, presente
+
+# ===================================================================
+# FUNÇÃO: snapshot_de_grafo
+# Descrição: Converte um nx.Graph para o dicionário de arrays do snapshot.
+#            Retorna None se o grafo tiver atributos não suportados.
+# ===================================================================
+def snapshot_de_grafo(grafo: nx.Graph):
+    if grafo.is_directed() or grafo.is_multigraph():
+        return None
+
+    ids = list(grafo.nodes())
+    indice = {n: i for i, n in enumerate(ids)}
+
+    dados_nos = [d for _, d in grafo.nodes(data=True)]
+    dados_arestas = [d for _, _, d in grafo.edges(data=True)]
+    if any(set(d) - set(ATRIBUTOS_NO) for d in dados_nos):
+        return None
+    if any(set(d) - set(ATRIBUTOS_ARESTA) for d in dados_arestas):
+        return None
+
+    snapshot = {'ids': np.array([str(n) for n in ids], dtype=str)}
+    origem = np.fromiter((indice[u] for u, _ in grafo.edges()), dtype=np.int32, count=grafo.number_of_edges())
+    destino = np.fromiter((indice[v] for _, v in grafo.edges()), dtype=np.int32, count=grafo.number_of_edges())
+    snapshot['origem'] = origem
+    snapshot['destino'] = destino
+    snapshot['indptr'], snapshot['indices'], snapshot['aresta'] = construir_csr(origem, destino, len(ids))
+
+    for atributo, tipo in ATRIBUTOS_NO.items():
+        coluna, presente = _coluna([d.get(atributo) for d in dados_nos], tipo)
+        snapshot[f'no_{atributo}'] = coluna
+        snapshot[f'no_{atributo}_presente'] = presente
+    for atributo, tipo in ATRIBUTOS_ARESTA.items():
+        coluna, presente = _coluna([d.get(atributo) for d in dados_arestas], tipo)
+        snapshot[f'aresta_{atributo}'] = coluna
+        snapshot[f'aresta_{atributo}_presente'] = presente
+    return snapshot
+
+# ===================================================================
+# FUNÇÃO: gerar_snapshot
+# Descrição: Lê o GEXF com o NetworkX e grava o snapshot em disco. A
+#            escrita é feita numa pasta temporária e depois renomeada,
+#            para que leitores concorrentes nunca vejam um snapshot parcial.
+# ===================================================================
+def gerar_snapshot(arquivo: str):
+    digital = impressao_digital(arquivo)
+    grafo = nx.read_gexf(arquivo)
+    snapshot = snapshot_de_grafo(grafo)
+    if snapshot is None:
+        return grafo, None
+
+    pasta = _pasta_snapshot(arquivo)
+    os.makedirs(os.path.dirname(pasta), exist_ok=True)
+    temporaria = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(pasta))
+    try:
+        for nome, array in snapshot.items():
+            np.save(os.path.join(temporaria, f"{nome}.npy"), array)
+        meta = dict(digital, versao=VERSAO_SNAPSHOT,
+                    num_nos=len(snapshot['ids']), num_arestas=len(snapshot['origem']))
+        with open(os.path.join(temporaria, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+        shutil.rmtree(pasta, ignore_errors=True)
+        os.replace(temporaria, pasta)
+    except OSError:
+        # Outro processo pode ter gravado o mesmo snapshot ao mesmo tempo
+        shutil.rmtree(temporaria, ignore_errors=True)
+    return grafo, snapshot
+
+# ===================================================================
+# FUNÇÃO: aplicar_aliases
+# Descrição: Troca os ids do snapshot pelos canônicos do mapa e funde os
+#            nós e arestas repetidos. Nos nós fundidos, h_index e
+#            is_permanent ficam com o máximo e os textos com o valor do
+#            nó canônico (ou do primeiro que tiver o atributo); o label
+#            passa a ser o id canônico. Arestas repetidas somam num_paper
+#            e citation_num. Sem aliases no arquivo, retorna o snapshot
+#            original.
+# ===================================================================
+def aplicar_aliases(snapshot: dict, aliases: dict):
+    ids_antigos = snapshot['ids'].tolist()
+    ids_mapeados = [aliases.get(n, n) for n in ids_antigos]
+    if ids_mapeados == ids_antigos:
+        return snapshot
+
+    indice = {}
+    grupo = np.array([indice.setdefault(n, len(indice)) for n in ids_mapeados], dtype=np.int64)
+    num_nos = len(indice)
+    # Representante de cada nó novo: a linha do id canônico, se presente,
+    # senão a primeira linha do grupo
+    representante = np.full(num_nos, -1, dtype=np.int64)
+    for linha, (antigo, novo) in enumerate(zip(ids_antigos, ids_mapeados)):
+        if representante[grupo[linha]] < 0 or antigo == novo:
+            representante[grupo[linha]] = linha
+
+    resultado = {'ids': np.array(list(indice), dtype=str)}
+    fundidos = np.flatnonzero(np.bincount(grupo, minlength=num_nos) > 1)
+    for atributo, tipo in ATRIBUTOS_NO.items():
+        coluna = np.array(snapshot[f'no_{atributo}'])
+        presente = np.array(snapshot[f'no_{atributo}_presente'])
+        novo, novo_presente = coluna[representante], presente[representante]
+        for g in fundidos.tolist():
+            linhas = np.flatnonzero((grupo == g) & presente)
+            if len(linhas) == 0:
+                continue
+            if tipo is str:
+                if not novo_presente[g]:
+                    novo[g] = coluna[linhas[0]]
+            else:
+                novo[g] = coluna[linhas].max()
+            novo_presente[g] = True
+        resultado[f'no_{atributo}'] = novo
+        resultado[f'no_{atributo}_presente'] = novo_presente
+    resultado['no_label'] = resultado['ids'].copy()
+    resultado['no_label_presente'] = np.ones(num_nos, dtype=np.bool_)
+
+    # Arestas: pares (u, v) sem ordem, repetições agrupadas
+    u = grupo[np.asarray(snapshot['origem'])]
+    v = grupo[np.asarray(snapshot['destino'])]
+    chaves = np.minimum(u, v) * num_nos + np.maximum(u, v)
+    _, primeira, inverso = np.unique(chaves, return_index=True, return_inverse=True)
+    inverso = inverso.ravel()
+    ordem = np.argsort(primeira, kind='stable')
+    posicao = np.empty_like(ordem)
+    posicao[ordem] = np.arange(len(ordem))
+    inverso = posicao[inverso]
+    primeira = primeira[ordem]
+
+    resultado['origem'] = u[primeira].astype(np.int32)
+    resultado['destino'] = v[primeira].astype(np.int32)
+    for atributo, tipo in ATRIBUTOS_ARESTA.items():
+        coluna = np.asarray(snapshot[f'aresta_{atributo}'])
+        presente = np.asarray(snapshot[f'aresta_{atributo}_presente'])
+        if tipo is str:
+            resultado[f'aresta_{atributo}'] = coluna[primeira]
+            resultado[f'aresta_{atributo}_presente'] = presente[primeira]
+        else:
+            resultado[f'aresta_{atributo}'] = np.bincount(
+                inverso, weights=np.where(presente, coluna, 0), minlength=len(primeira)).astype(tipo)
+            resultado[f'aresta_{atributo}_presente'] = np.bincount(
+                inverso, weights=presente, minlength=len(primeira)) > 0
+    resultado['indptr'], resultado['indices'], resultado['aresta'] = construir_csr(
+        resultado['origem'], resultado['destino'], num_nos)
+    return resultado
+
+def _numerico(valor):
+    return isinstance(valor, (int, float, np.integer, np.floating)) and not isinstance(valor, (bool, np.bool_))
+
+# ===================================================================
+# FUNÇÃO: aplicar_aliases_grafo
+# Descrição: O mesmo que aplicar_aliases, sobre um nx.Graph (arquivos com
+#            atributos que o snapshot não representa). Nos nós fundidos,
+#            atributos numéricos e booleanos ficam com o máximo e os
+#            demais com o valor do nó canônico (ou do primeiro que tiver o
+#            atributo). Arestas repetidas somam os atributos numéricos,
+#            fazem "ou" dos booleanos e mantêm os demais da primeira.
+# ===================================================================
+def aplicar_aliases_grafo(grafo: nx.Graph, aliases: dict):
+    if not any(n in aliases for n in grafo):
+        return grafo
+
+    # Nós: a linha do id canônico primeiro, depois as demais na ordem
+    grupos = {}
+    for n in grafo:
+        grupos.setdefault(aliases.get(n, n), []).append(n)
+    resultado = grafo.__class__()
+    resultado.graph.update(grafo.graph)
+    for novo, membros in grupos.items():
+        membros = sorted(membros, key=lambda n: n != novo)
+        atributos = {}
+        for n in membros:
+            for chave, valor in grafo.nodes[n].items():
+                if chave not in atributos:
+                    atributos[chave] = valor
+                elif _numerico(valor) or isinstance(valor, (bool, np.bool_)):
+                    atributos[chave] = max(atributos[chave], valor)
+        if 'label' in atributos:
+            atributos['label'] = novo
+        resultado.add_node(novo, **atributos)
+
+    for u, v, dados in grafo.edges(data=True):
+        u, v = aliases.get(u, u), aliases.get(v, v)
+        if not resultado.has_edge(u, v):
+            resultado.add_edge(u, v, **dados)
+            continue
+        atual = resultado.edges[u, v]
+        for chave, valor in dados.items():
+            if chave not in atual:
+                atual[chave] = valor
+            elif isinstance(valor, (bool, np.bool_)):
+                atual[chave] = atual[chave] or valor
+            elif _numerico(valor):
+                atual[chave] = atual[chave] + valor
+    return resultado
+
+# ===================================================================
+# FUNÇÃO: carregar_snapshot
+# Descrição: Retorna o dicionário de arrays do snapshot (abertos com
+#            memory-map), gerando-o antes se necessário, com o mapa de
+#            aliases da pasta aplicado (com_aliases=False devolve os ids do
+#            arquivo). Retorna None se o arquivo não puder ser
+#            representado como snapshot.
+# ===================================================================
+def carregar_snapshot(arquivo: str, com_aliases=True):
+    pasta = _pasta_snapshot(arquivo)
+    if not _snapshot_valido(arquivo, pasta):
+        _, snapshot = gerar_snapshot(arquivo)
+    else:
+        snapshot = {}
+        for nome in os.listdir(pasta):
+            if nome.endswith(".npy"):
+                snapshot[nome[:-4]] = np.load(os.path.join(pasta, nome), mmap_mode='r')
+
+    aliases = aliases_do_arquivo(arquivo) if com_aliases else None
+    if snapshot is None or not aliases:
+        return snapshot
+    return aplicar_aliases(snapshot, aliases)
+
+# ===================================================================
+# FUNÇÃO: grafo_de_snapshot
+# Descrição: Reconstrói o nx.Graph (mesmos nós, arestas e atributos que o
+#            nx.read_gexf produziria) a partir do snapshot.
+# ===================================================================
+def grafo_de_snapshot(snapshot: dict):
+    ids = snapshot['ids'].tolist()
+
+    def _registros(prefixo, atributos, quantidade):
+        colunas = [(a, snapshot[f'{prefixo}_{a}'].tolist(), snapshot[f'{prefixo}_{a}_presente'])
+                   for a in atributos]
+        for i in range(quantidade):
+            yield {a: valores[i] for a, valores, presente in colunas if presente[i]}
+
+    grafo = nx.Graph(mode='static', edge_default={}, node_default={})
+    grafo.add_nodes_from(zip(ids, _registros('no', ATRIBUTOS_NO, len(ids))))
+    origem = snapshot['origem'].tolist()
+    destino = snapshot['destino'].tolist()
+    grafo.add_edges_from(
+        (ids[u], ids[v], dados)
+        for u, v, dados in zip(origem, destino, _registros('aresta', ATRIBUTOS_ARESTA, len(origem)))
+    )
+    return grafo
+
+# ===================================================================
+# FUNÇÃO: ler_gexf
+# Descrição: Substituto de nx.read_gexf que passa pelo cache de snapshots
+#            (e aplica o mapa de aliases da pasta, se houver).
+# ===================================================================
+def ler_gexf(arquivo: str):
+    pasta = _pasta_snapshot(arquivo)
+    aliases = aliases_do_arquivo(arquivo)
+    if not _snapshot_valido(arquivo, pasta):
+        # O grafo lido para gerar o snapshot é reaproveitado diretamente
+        grafo, snapshot = gerar_snapshot(arquivo)
+        if not aliases:
+            return grafo
+        if snapshot is None:
+            return aplicar_aliases_grafo(grafo, aliases)
+        return grafo_de_snapshot(aplicar_aliases(snapshot, aliases))
+    return grafo_de_snapshot(carregar_snapshot(arquivo))
+
+# ===================================================================
+# FUNÇÃO: preparar_snapshot
+# Descrição: Garante que o snapshot do arquivo existe e está válido,
+#            retornando apenas um resumo compacto. Usada nos workers do
+#            pool de processos: o grafo em si é depois aberto pelo processo
+#            principal a partir do snapshot em disco.
+# ===================================================================
+def preparar_snapshot(arquivo: str):
+    if _snapshot_valido(arquivo, _pasta_snapshot(arquivo)):
+        return {'snapshot': True}
+    _, snapshot = gerar_snapshot(arquivo)
+    return {'snapshot': snapshot is not None}
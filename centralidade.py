@@ -0,0 +1,376 @@
+import hashlib
+import heapq
+import os
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import grafo_compacto
+from layouts import hash_grafo
+from metricas_esparsas import adjacencia_de_grafo, sem_lacos
+from instrumentacao import etapa, instrumentar_pipeline
+from paralelo import mapear_blocos_fontes
+from rede_temporal import PERIODOS, construir_rede_temporal, grafo_janela, janelas_anos_periodos
+
+# ===================================================================
+# Motor de centralidades
+#   - grau: o mesmo de G.degree (laços contam 2);
+#   - pagerank e autovetor: iteração de potência sobre a CSR, com os
+#     mesmos critérios de parada do NetworkX;
+#   - intermediação (betweenness) e harmônica: BFS em lote. Um bloco de
+#     fontes é expandido nível a nível com produtos matriz esparsa x
+#     matriz densa (contagem de caminhos mínimos), e as dependências de
+#     Brandes são acumuladas de volta pelos níveis. Com amostragem de
+#     fontes (grafos grandes) a intermediação vem com um limite de erro
+#     (Hoeffding) e o erro padrão de cada vértice. Os blocos podem ser
+#     distribuídos em um pool de processos.
+# O grau é lido direto do grafo. As demais medidas são guardadas em
+# disco, indexadas pelo hash do grafo e dos parâmetros de cada medida
+# (mesmo esquema do cache de layouts); com `peso`, os valores do peso de
+# cada aresta também entram no hash.
+# ===================================================================
+
+PASTA_CENTRALIDADES = os.path.join(".", ".cache", "centralidades")
+MEDIDAS = ("grau", "pagerank", "autovetor", "intermediacao", "harmonica")
+
+# Até este número de nós, intermediação e harmônica são exatas (todas
+# as fontes); acima, são estimadas com o número de fontes que limita o
+# erro da intermediação normalizada a ERRO_PADRAO (amostras_para_erro)
+LIMITE_EXATO = 5000
+ERRO_PADRAO = 0.05
+
+# ===================================================================
+# FUNÇÃO: top_k
+# Descrição: Os k maiores valores por seleção parcial (heap), sem ordenar
+#            o vetor inteiro. Retorna [(nó, valor)] em ordem decrescente;
+#            empates ficam na ordem dos nós.
+# ===================================================================
+def top_k(nos: list, valores, k: int):
+    valores = np.asarray(valores).tolist()
+    melhores = heapq.nlargest(k, range(len(valores)), key=lambda i: (valores[i], -i))
+    return [(nos[i], valores[i]) for i in melhores]
+
+# ===================================================================
+# FUNÇÃO: pagerank
+# Descrição: PageRank por iteração de potência (equivalente a
+#            nx.pagerank): nós sem arestas distribuem o peso igualmente.
+# ===================================================================
+def pagerank(A, alfa=0.85, max_iter=100, tol=1.0e-6):
+    n = A.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    A = sp.csr_array(A, dtype=np.float64)
+    saida = np.asarray(A.sum(axis=1)).ravel()
+    pendurados = saida == 0
+    inverso = np.divide(1.0, saida, out=np.zeros(n), where=~pendurados)
+    W = sp.diags_array(inverso) @ A
+
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        anterior = x
+        x = alfa * (W.T @ anterior + anterior[pendurados].sum() / n) + (1 - alfa) / n
+        if np.abs(x - anterior).sum() < n * tol:
+            break
+    else:
+        print(f"Aviso: PageRank não convergiu em {max_iter} iterações.")
+    return x
+
+# ===================================================================
+# FUNÇÃO: autovetor
+# Descrição: Centralidade de autovetor por iteração de potência sobre
+#            A + I (equivalente a nx.eigenvector_centrality), norma L2.
+# ===================================================================
+def autovetor(A, max_iter=100, tol=1.0e-6):
+    n = A.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    A = sp.csr_array(A, dtype=np.float64)
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        anterior = x
+        x = anterior + A @ anterior
+        norma = np.linalg.norm(x)
+        x = x / norma if norma > 0 else x
+        if np.abs(x - anterior).sum() < n * tol:
+            break
+    else:
+        print(f"Aviso: centralidade de autovetor não convergiu em {max_iter} iterações.")
+    return x
+
+# ===================================================================
+# FUNÇÃO: _bfs_bloco
+# Descrição: BFS em lote a partir das `fontes`. Retorna a soma, sobre as
+#            fontes, das dependências de Brandes (intermediação), dos
+#            quadrados dessas dependências (para o erro padrão) e de
+#            1/distância (harmônica).
+# ===================================================================
+def _bfs_bloco(fontes: np.ndarray, A):
+    b, n = len(fontes), A.shape[0]
+    linhas = np.arange(b)
+    sigma = np.zeros((b, n))
+    sigma[linhas, fontes] = 1.0
+    distancia = np.full((b, n), -1, dtype=np.int32)
+    distancia[linhas, fontes] = 0
+
+    # Ida: contagem de caminhos mínimos, nível a nível
+    fronteira = sigma.copy()
+    nivel = 0
+    while True:
+        proxima = (A @ fronteira.T).T
+        novos = (distancia < 0) & (proxima > 0)
+        if not novos.any():
+            break
+        nivel += 1
+        distancia[novos] = nivel
+        sigma[novos] = proxima[novos]
+        fronteira = np.where(novos, sigma, 0.0)
+
+    # Volta: dependências acumuladas do nível mais distante para a fonte
+    delta = np.zeros((b, n))
+    for d in range(nivel, 0, -1):
+        coeficiente = np.where(distancia == d, (1.0 + delta) / np.where(sigma > 0, sigma, 1.0), 0.0)
+        contribuicao = (A @ coeficiente.T).T
+        anterior = distancia == d - 1
+        delta[anterior] += sigma[anterior] * contribuicao[anterior]
+    delta[linhas, fontes] = 0.0
+
+    harmonica = np.where(distancia > 0, 1.0 / np.maximum(distancia, 1), 0.0)
+    return delta.sum(axis=0), (delta ** 2).sum(axis=0), harmonica.sum(axis=0)
+
+# ===================================================================
+# FUNÇÃO: caminhos_minimos
+# Descrição: Executa _bfs_bloco sobre todas as fontes, em blocos, em série
+#            ou em um pool de processos (paralelo.mapear_blocos_fontes).
+#            Retorna as somas acumuladas.
+# ===================================================================
+def caminhos_minimos(A, fontes: np.ndarray, workers=None):
+    n = A.shape[0]
+
+    def somar(resultados):
+        soma, quadrados, harmonica = np.zeros(n), np.zeros(n), np.zeros(n)
+        for s, q, h in resultados:
+            soma += s
+            quadrados += q
+            harmonica += h
+        return soma, quadrados, harmonica
+
+    return mapear_blocos_fontes(_bfs_bloco, A, fontes, somar, workers)
+
+# ===================================================================
+# FUNÇÃO: amostras_para_erro
+# Descrição: Número de fontes amostradas para que a intermediação
+#            normalizada de todos os vértices tenha erro <= epsilon com
+#            probabilidade 1 - delta (Hoeffding + união sobre os nós).
+# ===================================================================
+def amostras_para_erro(n: int, epsilon=0.01, delta=0.1):
+    if n <= 2:
+        return n
+    return min(n, int(np.ceil(np.log(2 * n / delta) / (2 * (epsilon * (n - 1) / n) ** 2))))
+
+# ===================================================================
+# FUNÇÃO: intermediacao_harmonica
+# Descrição: Intermediação normalizada (como nx.betweenness_centrality) e
+#            centralidade harmônica (como nx.harmonic_centrality), exatas
+#            quando amostras >= n. Sem `amostras`, grafos acima de
+#            LIMITE_EXATO usam as fontes necessárias para erro <= `erro`
+#            (probabilidade 1 - delta). Com amostragem, os valores são
+#            reescalados por n/amostras e o retorno inclui o limite de
+#            erro uniforme (probabilidade 1 - delta) e o erro padrão de
+#            cada vértice.
+# ===================================================================
+def intermediacao_harmonica(A, amostras=None, erro=ERRO_PADRAO, delta=0.1, semente=42, workers=None):
+    n = A.shape[0]
+    if amostras is None:
+        amostras = n if n <= LIMITE_EXATO else amostras_para_erro(n, erro, delta)
+    amostras = min(amostras, n)
+    exata = amostras >= n
+    fontes = np.arange(n) if exata else np.sort(
+        np.random.default_rng(semente).choice(n, size=amostras, replace=False))
+
+    soma, quadrados, harmonica = caminhos_minimos(sem_lacos(A), fontes, workers)
+    escala_normalizacao = 1.0 / ((n - 1) * (n - 2)) if n > 2 else 1.0
+    intermediacao = soma * escala_normalizacao * (n / max(amostras, 1))
+    harmonica = harmonica * (n / max(amostras, 1))
+
+    info = {'amostras': int(amostras), 'exata': exata, 'erro_maximo': 0.0,
+            'erro_padrao': np.zeros(n)}
+    if not exata and n > 2 and amostras > 1:
+        # Cada fonte contribui com X_s = delta_s(v) / (n - 2) em [0, 1]
+        media = soma / (n - 2) / amostras
+        variancia = np.maximum(quadrados / (n - 2) ** 2 / amostras - media ** 2, 0) * amostras / (amostras - 1)
+        fator = n / (n - 1)
+        info['erro_padrao'] = fator * np.sqrt(variancia / amostras) * (1 - amostras / n) ** 0.5
+        info['erro_maximo'] = fator * np.sqrt(np.log(2 * n / delta) / (2 * amostras))
+    return intermediacao, harmonica, info
+
+# ===================================================================
+# FUNÇÃO: _matriz
+# Descrição: CSR do grafo; com `peso`, os valores vêm desse atributo das
+#            arestas (ex.: num_paper) para PageRank e autovetor.
+# ===================================================================
+def _matriz(G: nx.Graph, nos: list, peso=None):
+    if peso is None:
+        return adjacencia_de_grafo(G)[1]
+    if grafo_compacto.eh_compacto(G):
+        return grafo_compacto.matriz(G, peso)
+    return nx.to_scipy_sparse_array(G, nodelist=nos, weight=peso, dtype=np.float64, format='csr')
+
+# ===================================================================
+# FUNÇÃO: _hash_pesos
+# Descrição: Hash dos valores do atributo `peso` das arestas (ausentes
+#            valem 1), independente da ordem das arestas.
+# ===================================================================
+def _hash_pesos(G: nx.Graph, peso: str):
+    if grafo_compacto.eh_compacto(G):
+        nos = grafo_compacto.nos(G)
+        coluna = G[peso]
+        valores = np.where(coluna >= 0, coluna, 1).tolist()
+        arestas = [(nos[u], nos[v], w) for u, v, w in zip(G['origem'].tolist(), G['destino'].tolist(), valores)]
+    else:
+        arestas = G.edges(data=peso, default=1)
+    sha = hashlib.sha256()
+    for u, v, w in sorted((*sorted((str(u), str(v))), float(w)) for u, v, w in arestas):
+        sha.update(f"{u}-{v}:{w!r}\n".encode())
+    return sha.hexdigest()
+
+def _ler_cache(caminho: str):
+    try:
+        with np.load(caminho) as dados:
+            return {chave: dados[chave] for chave in dados.files}
+    except (OSError, KeyError, ValueError):
+        return None
+
+def _gravar_cache(caminho: str, valores: dict):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = caminho + ".tmp.npz"
+    np.savez(temporario, **valores)
+    os.replace(temporario, caminho)
+
+# ===================================================================
+# FUNÇÃO: centralidades
+# Descrição: Calcula (ou lê do cache) as medidas pedidas para o grafo; o
+#            grau é sempre calculado, sem cache. Retorna {'nos': lista, medida: array alinhado com 'nos'} e,
+#            se a intermediação foi amostrada, 'intermediacao_erro' (erro
+#            padrão de cada nó) e 'intermediacao_erro_maximo'.
+# ===================================================================
+def centralidades(G: nx.Graph, medidas=MEDIDAS, peso=None, amostras=None, erro=ERRO_PADRAO, semente=42,
+                  workers=None, pasta=PASTA_CENTRALIDADES):
+    nos = grafo_compacto.nos(G) if grafo_compacto.eh_compacto(G) else list(G)
+    resultado = {'nos': nos}
+    if not nos:
+        resultado.update({medida: np.zeros(0) for medida in medidas})
+        return resultado
+
+    if "grau" in medidas:
+        if grafo_compacto.eh_compacto(G):
+            resultado['grau'] = grafo_compacto.grau(G).astype(np.float64)
+        else:
+            resultado['grau'] = np.fromiter((d for _, d in G.degree()), dtype=np.float64, count=len(nos))
+    medidas = [medida for medida in medidas if medida != "grau"]
+    if not medidas:
+        return resultado
+
+    pesos = _hash_pesos(G, peso) if peso is not None else None
+    chaves = {
+        'pagerank': hash_grafo(G, medida="pagerank", peso=peso, pesos=pesos),
+        'autovetor': hash_grafo(G, medida="autovetor", peso=peso, pesos=pesos),
+        # Intermediação e harmônica saem da mesma BFS
+        'intermediacao': hash_grafo(G, medida="caminhos", amostras=amostras, erro=erro, semente=semente),
+        'harmonica': hash_grafo(G, medida="caminhos", amostras=amostras, erro=erro, semente=semente),
+    }
+    indice = {str(n): i for i, n in enumerate(nos)}
+
+    pendentes = []
+    for medida in medidas:
+        dados = _ler_cache(os.path.join(pasta, f"{chaves[medida]}.npz"))
+        if dados is None or medida not in dados:
+            pendentes.append(medida)
+            continue
+        # O cache guarda os nós como texto, na ordem em que foram calculados
+        ordem = np.array([indice[n] for n in dados['nos'].tolist()], dtype=np.int64)
+        for chave, coluna in dados.items():
+            if chave == 'nos':
+                continue
+            if coluna.ndim == 0:
+                resultado[chave] = coluna.item()
+            else:
+                resultado[chave] = np.empty(len(nos))
+                resultado[chave][ordem] = coluna
+
+    if not pendentes:
+        return resultado
+
+    A = _matriz(G, nos, peso)
+    nos_texto = np.array([str(n) for n in nos], dtype=str)
+    for medida in [m for m in pendentes if m not in ("intermediacao", "harmonica")]:
+        if medida == "pagerank":
+            valores = pagerank(A)
+        else:
+            valores = autovetor(A)
+        resultado[medida] = valores
+        _gravar_cache(os.path.join(pasta, f"{chaves[medida]}.npz"), {'nos': nos_texto, medida: valores})
+
+    if "intermediacao" in pendentes or "harmonica" in pendentes:
+        intermediacao, harmonica, info = intermediacao_harmonica(
+            A if peso is None else adjacencia_de_grafo(G)[1], amostras, erro=erro, semente=semente,
+            workers=workers)
+        caminhos = {'nos': nos_texto, 'intermediacao': intermediacao, 'harmonica': harmonica,
+                    'intermediacao_erro': info['erro_padrao'],
+                    'intermediacao_erro_maximo': np.float64(info['erro_maximo'])}
+        _gravar_cache(os.path.join(pasta, f"{chaves['intermediacao']}.npz"), caminhos)
+        resultado.update(intermediacao=intermediacao, harmonica=harmonica,
+                         intermediacao_erro=info['erro_padrao'],
+                         intermediacao_erro_maximo=info['erro_maximo'])
+    return resultado
+
+# ===================================================================
+# FUNÇÃO: mais_centrais
+# Descrição: Os k autores mais centrais do grafo pela medida escolhida.
+# ===================================================================
+def mais_centrais(G: nx.Graph, medida="grau", k=5, **parametros):
+    valores = centralidades(G, medidas=(medida,), **parametros)
+    return top_k(valores['nos'], valores[medida], k)
+
+# ===================================================================
+# FUNÇÃO: tabela_centralidades
+# Descrição: DataFrame (rotulo, autor, medidas...) com as centralidades
+#            de cada grafo de uma série (anos ou períodos).
+# ===================================================================
+def tabela_centralidades(grafos: list, rotulos: list, medidas=MEDIDAS, **parametros):
+    partes = []
+    for G, rotulo in zip(grafos, rotulos):
+        valores = centralidades(G, medidas=medidas, **parametros)
+        partes.append(pd.DataFrame({'rotulo': rotulo, 'autor': valores['nos'],
+                                    **{medida: valores[medida] for medida in medidas}}))
+    if not partes:
+        return pd.DataFrame(columns=['rotulo', 'autor', *medidas])
+    return pd.concat(partes, ignore_index=True)
+
+# ===================================================================
+# MAIN: Centralidades de cada ano e de cada período de avaliação
+# ===================================================================
+@instrumentar_pipeline("centralidade.main")
+def main(pasta="./basedados/anos", periodos=PERIODOS,
+         k=5, workers=None, pasta_saida=".", erro=ERRO_PADRAO):
+    with etapa("construir_rede_temporal"):
+        rede = construir_rede_temporal(pasta)
+    janelas = janelas_anos_periodos(rede, periodos)
+
+    grafos = []
+    for rotulo, inicio, fim in janelas:
+        with etapa("centralidades", rotulo=rotulo):
+            G = grafo_janela(rede, inicio, fim)
+            valores = centralidades(G, erro=erro, workers=workers)
+        grafos.append(G)
+        print(f"{rotulo}:")
+        for medida in MEDIDAS:
+            print(f"  {medida}: " + ", ".join(
+                f"{autor} ({valor:.4g})" for autor, valor in top_k(valores['nos'], valores[medida], k)))
+
+    tabela = tabela_centralidades(grafos, [rotulo for rotulo, _, _ in janelas], erro=erro, workers=workers)
+    os.makedirs(pasta_saida, exist_ok=True)
+    tabela.to_csv(os.path.join(pasta_saida, "centralidades.csv"), index=False)
+    print("Centralidades salvas em centralidades.csv")
+
+if __name__ == "__main__":
+    main()
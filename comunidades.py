@@ -0,0 +1,380 @@
+import os
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from instrumentacao import etapa, instrumentar_pipeline
+from paralelo import mapear_arquivos, numero_workers
+from rede_temporal import PERIODOS, agregar_arestas, construir_rede_temporal, fatiar_janela, limites_periodo
+
+# ===================================================================
+# Comunidades temporais (grupos de pesquisa)
+# Louvain ponderado por num_paper, implementado sobre a CSR para aceitar
+# uma partição inicial: a partição de cada ano parte da partição do ano
+# anterior (os autores que continuam mantêm a comunidade, os novos
+# começam sozinhos), e por isso converge em menos varreduras. Como as
+# comunidades herdadas não se dividem entre si, a partição aquecida é mais
+# estável ao longo dos anos, com modularidade um pouco menor que a de uma
+# partida do zero (aquecer=False).
+# As partições são guardadas no espaço de autores do armazenamento
+# temporal (rede_temporal): um array com a comunidade de cada autor, -1
+# para os ausentes, o que deixa o casamento entre anos vetorizado.
+# Convenção de laços igual à do NetworkX: o laço conta 2 no grau.
+# ===================================================================
+
+MAX_VARREDURAS = 100
+LIMIAR_CASAMENTO = 0.25
+TAMANHO_MINIMO = 3
+
+# ===================================================================
+# FUNÇÃO: adjacencia_ponderada
+# Descrição: Matriz CSR simétrica (float) com os pesos das arestas. Laços
+#            entram na diagonal com peso 2w.
+# ===================================================================
+def adjacencia_ponderada(origem: np.ndarray, destino: np.ndarray, pesos: np.ndarray, num_nos: int):
+    pesos = np.asarray(pesos, dtype=np.float64)
+    laco = origem == destino
+    linhas = np.concatenate([origem, destino[~laco]])
+    colunas = np.concatenate([destino, origem[~laco]])
+    valores = np.concatenate([np.where(laco, 2 * pesos, pesos), pesos[~laco]])
+    A = sp.csr_array((valores, (linhas, colunas)), shape=(num_nos, num_nos))
+    A.sum_duplicates()
+    return A
+
+# ===================================================================
+# FUNÇÃO: _separar_desconexas
+# Descrição: Refinamento da partição de partida (como no Leiden): cada
+#            comunidade herdada é dividida nas suas componentes conexas
+#            no grafo atual, já que autores do mesmo grupo no ano anterior
+#            podem não ter colaborado neste ano.
+# ===================================================================
+def _separar_desconexas(A, membro: np.ndarray):
+    coo = A.tocoo()
+    interna = membro[coo.row] == membro[coo.col]
+    B = sp.csr_array((np.ones(interna.sum()), (coo.row[interna], coo.col[interna])), shape=A.shape)
+    return connected_components(B, directed=False)[1]
+
+def _renumerar(membro: np.ndarray):
+    # Rótulos 0..k-1, na ordem da primeira ocorrência
+    _, primeira, inverso = np.unique(membro, return_index=True, return_inverse=True)
+    posicao = np.empty(len(primeira), dtype=np.int64)
+    posicao[np.argsort(primeira, kind='stable')] = np.arange(len(primeira))
+    return posicao[inverso.ravel()], len(primeira)
+
+# ===================================================================
+# FUNÇÃO: modularidade
+# Descrição: Modularidade da partição `membro` (igual a
+#            nx.community.modularity com o mesmo peso).
+# ===================================================================
+def modularidade(A, membro: np.ndarray, resolucao=1.0):
+    m2 = A.sum()
+    if m2 == 0:
+        return 0.0
+    coo = A.tocoo()
+    interna = coo.data[membro[coo.row] == membro[coo.col]].sum()
+    total = np.bincount(membro, weights=np.asarray(A.sum(axis=1)).ravel())
+    return float(interna / m2 - resolucao * np.sum((total / m2) ** 2))
+
+# ===================================================================
+# FUNÇÃO: _mover_nos
+# Descrição: Fase local do Louvain: cada nó vai para a comunidade vizinha
+#            de maior ganho de modularidade, até nenhum nó mudar. Retorna
+#            a partição, o número de varreduras e se algum nó mudou.
+# ===================================================================
+def _mover_nos(A, membro: np.ndarray, resolucao: float, rng):
+    n = A.shape[0]
+    indptr, indices, pesos = A.indptr.tolist(), A.indices.tolist(), A.data.tolist()
+    graus = np.asarray(A.sum(axis=1)).ravel()
+    m2 = graus.sum()
+    total = np.bincount(membro, weights=graus, minlength=n).tolist()
+    membro = membro.tolist()
+    graus = graus.tolist()
+
+    varreduras = 0
+    mudou = False
+    while varreduras < MAX_VARREDURAS:
+        varreduras += 1
+        movidos = 0
+        for i in rng.permutation(n).tolist():
+            ligacoes = {}
+            for j in range(indptr[i], indptr[i + 1]):
+                v = indices[j]
+                if v != i:
+                    c = membro[v]
+                    ligacoes[c] = ligacoes.get(c, 0.0) + pesos[j]
+
+            atual = membro[i]
+            k = graus[i]
+            total[atual] -= k
+            fator = resolucao * k / m2
+            melhor = atual
+            melhor_ganho = ligacoes.get(atual, 0.0) - fator * total[atual]
+            for c, ligacao in ligacoes.items():
+                ganho = ligacao - fator * total[c]
+                if ganho > melhor_ganho + 1e-12:
+                    melhor, melhor_ganho = c, ganho
+            total[melhor] += k
+            if melhor != atual:
+                membro[i] = melhor
+                movidos += 1
+        if movidos == 0:
+            break
+        mudou = True
+    return np.array(membro, dtype=np.int64), varreduras, mudou
+
+# ===================================================================
+# FUNÇÃO: louvain
+# Descrição: Louvain multinível sobre a CSR ponderada. `inicial`
+#            (opcional) é a partição de partida do primeiro nível.
+#            Retorna a comunidade de cada nó (0..k-1) e um dicionário com
+#            varreduras, níveis, modularidade e número de comunidades.
+# ===================================================================
+def louvain(A, inicial=None, resolucao=1.0, semente=42, max_niveis=None):
+    rng = np.random.default_rng(semente)
+    n = A.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), {'varreduras': 0, 'niveis': 0, 'modularidade': 0.0,
+                                             'num_comunidades': 0}
+
+    mapa = np.arange(n)
+    nivel_A = A
+    membro, _ = _renumerar(np.arange(n) if inicial is None else np.asarray(inicial))
+    varreduras_total = 0
+    niveis = 0
+    while max_niveis is None or niveis < max_niveis:
+        membro, varreduras, mudou = _mover_nos(nivel_A, membro, resolucao, rng)
+        varreduras_total += varreduras
+        niveis += 1
+        membro, num_comunidades = _renumerar(membro)
+        mapa = membro[mapa]
+        # Para quando o nível não mudou nada e não há o que contrair
+        if num_comunidades == nivel_A.shape[0] or (niveis > 1 and not mudou):
+            break
+        P = sp.csr_array((np.ones(len(membro)), (np.arange(len(membro)), membro)),
+                         shape=(len(membro), num_comunidades))
+        nivel_A = (P.T @ nivel_A @ P).tocsr()
+        membro = np.arange(num_comunidades)
+
+    # Comunidade 0 = a maior
+    tamanhos = np.bincount(mapa)
+    ordem = np.argsort(-tamanhos, kind='stable')
+    posicao = np.empty_like(ordem)
+    posicao[ordem] = np.arange(len(ordem))
+    mapa = posicao[mapa]
+    return mapa, {
+        'varreduras': varreduras_total,
+        'niveis': niveis,
+        'modularidade': modularidade(A, mapa, resolucao),
+        'num_comunidades': int(len(tamanhos)),
+    }
+
+# ===================================================================
+# FUNÇÃO: comunidades_janela
+# Descrição: Comunidades da janela [inicio, fim] do armazenamento
+#            temporal, com arestas ponderadas por num_paper. `inicial` é
+#            uma partição no espaço de autores (ex.: a do ano anterior).
+#            Retorna o array autor -> comunidade (-1 = ausente) e as
+#            informações do Louvain.
+# ===================================================================
+def comunidades_janela(rede: dict, inicio: int, fim: int, inicial=None, resolucao=1.0, semente=42):
+    janela = fatiar_janela(rede, inicio, fim)
+    arestas = agregar_arestas(janela)
+    presentes = np.unique(janela['no_autor'])
+    local = np.full(len(rede['ids']), -1, dtype=np.int64)
+    local[presentes] = np.arange(len(presentes))
+
+    A = adjacencia_ponderada(local[arestas['origem']], local[arestas['destino']],
+                             arestas['num_paper'], len(presentes))
+
+    partida = None
+    if inicial is not None:
+        # Autores que já tinham comunidade a mantêm; os novos ficam sozinhos
+        anterior = np.asarray(inicial)[presentes]
+        novos = anterior < 0
+        partida = anterior.copy()
+        partida[novos] = anterior.max(initial=-1) + 1 + np.arange(novos.sum())
+        partida = _separar_desconexas(A, partida)
+
+    membro, info = louvain(A, inicial=partida, resolucao=resolucao, semente=semente)
+    resultado = np.full(len(rede['ids']), -1, dtype=np.int64)
+    resultado[presentes] = membro
+    info.update(inicio=inicio, fim=fim, autores=len(presentes), arestas=len(arestas['origem']))
+    return resultado, info
+
+# ===================================================================
+# FUNÇÃO: comunidades_anos
+# Descrição: Comunidades de cada ano. Com aquecer=True cada ano parte da
+#            partição do ano anterior. Retorna a lista de (partição, info).
+# ===================================================================
+def comunidades_anos(rede: dict, aquecer=True, resolucao=1.0, semente=42):
+    resultados = []
+    anterior = None
+    for ano in rede['anos'].tolist():
+        with etapa("comunidades_ano", ano=ano) as info_etapa:
+            membro, info = comunidades_janela(rede, ano, ano, inicial=anterior if aquecer else None,
+                                              resolucao=resolucao, semente=semente)
+            info_etapa['varreduras'] = info['varreduras']
+        resultados.append((membro, info))
+        anterior = membro
+    return resultados
+
+# Armazenamento temporal já montado em cada processo, por pasta
+_redes = {}
+
+def _comunidades_periodo(tarefa: tuple):
+    pasta, periodo, resolucao, semente = tarefa
+    if pasta not in _redes:
+        _redes[pasta] = construir_rede_temporal(pasta)
+    inicio, fim = limites_periodo(periodo)
+    return comunidades_janela(_redes[pasta], inicio, fim, resolucao=resolucao, semente=semente)
+
+# ===================================================================
+# FUNÇÃO: comunidades_periodos
+# Descrição: Comunidades de cada período "inicio-fim". Com aquecer=True
+#            cada período parte da partição do anterior, e a cadeia é
+#            sempre calculada em série; com aquecer=False os períodos são
+#            independentes e, com workers > 1, processados em paralelo
+#            (cada worker devolve só o array da partição). O resultado não
+#            depende do número de workers.
+# ===================================================================
+def comunidades_periodos(pasta: str, periodos: list, workers=None, aquecer=True,
+                         resolucao=1.0, semente=42):
+    if not aquecer and numero_workers(workers) > 1:
+        tarefas = [(pasta, periodo, resolucao, semente) for periodo in periodos]
+        resultados = mapear_arquivos(_comunidades_periodo, tarefas, workers)
+        falhas = [periodo for periodo, r in zip(periodos, resultados) if r is None]
+        if falhas:
+            raise ValueError(f"Falha ao calcular as comunidades dos períodos {', '.join(falhas)}.")
+        return resultados
+
+    rede = construir_rede_temporal(pasta)
+    resultados = []
+    anterior = None
+    for periodo in periodos:
+        inicio, fim = limites_periodo(periodo)
+        membro, info = comunidades_janela(rede, inicio, fim, inicial=anterior if aquecer else None,
+                                          resolucao=resolucao, semente=semente)
+        resultados.append((membro, info))
+        anterior = membro
+    return resultados
+
+# ===================================================================
+# FUNÇÃO: casar_comunidades
+# Descrição: Liga as comunidades de duas partições consecutivas pela
+#            similaridade de Jaccard entre os conjuntos de autores
+#            (restritos aos autores presentes nas duas partições). Cada
+#            ligação com Jaccard >= limiar recebe o evento continuação,
+#            divisão (a origem liga a várias), fusão (o destino recebe de
+#            várias) ou divisão/fusão; comunidades sem ligação (com pelo
+#            menos `tamanho_minimo` autores) geram extinção/nascimento.
+# ===================================================================
+def casar_comunidades(anterior: np.ndarray, atual: np.ndarray, rotulo_anterior=None,
+                      rotulo_atual=None, limiar=LIMIAR_CASAMENTO, tamanho_minimo=TAMANHO_MINIMO):
+    tamanho_a = np.bincount(anterior[anterior >= 0])
+    tamanho_b = np.bincount(atual[atual >= 0])
+    comuns = (anterior >= 0) & (atual >= 0)
+    base = len(tamanho_b)
+    pares, contagem = np.unique(anterior[comuns] * base + atual[comuns], return_counts=True)
+    a, b = pares // base, pares % base
+    # Jaccard entre os autores presentes nas duas partições: autores que
+    # entram ou saem da rede não contam contra a continuidade do grupo
+    comum_a = np.bincount(anterior[comuns], minlength=len(tamanho_a))
+    comum_b = np.bincount(atual[comuns], minlength=len(tamanho_b))
+    jaccard = contagem / (comum_a[a] + comum_b[b] - contagem)
+
+    ligada = jaccard >= limiar
+    a, b, contagem, jaccard = a[ligada], b[ligada], contagem[ligada], jaccard[ligada]
+    saidas = np.bincount(a, minlength=len(tamanho_a))
+    entradas = np.bincount(b, minlength=len(tamanho_b))
+    divisao = saidas[a] > 1
+    fusao = entradas[b] > 1
+    evento = np.where(divisao & fusao, "divisão/fusão",
+                      np.where(divisao, "divisão", np.where(fusao, "fusão", "continuação")))
+
+    extintas = np.flatnonzero((saidas == 0) & (tamanho_a >= tamanho_minimo))
+    nascidas = np.flatnonzero((entradas == 0) & (tamanho_b >= tamanho_minimo))
+    return pd.DataFrame({
+        'origem': rotulo_anterior,
+        'comunidade_origem': pd.array(np.concatenate([a, extintas, np.full(len(nascidas), -1)]),
+                                      dtype="Int64"),
+        'destino': rotulo_atual,
+        'comunidade_destino': pd.array(np.concatenate([b, np.full(len(extintas), -1), nascidas]),
+                                       dtype="Int64"),
+        'tamanho_origem': pd.array(np.concatenate([tamanho_a[a], tamanho_a[extintas],
+                                                   np.zeros(len(nascidas), dtype=np.int64)]), dtype="Int64"),
+        'tamanho_destino': pd.array(np.concatenate([tamanho_b[b], np.zeros(len(extintas), dtype=np.int64),
+                                                    tamanho_b[nascidas]]), dtype="Int64"),
+        'autores_comuns': np.concatenate([contagem, np.zeros(len(extintas) + len(nascidas), dtype=np.int64)]),
+        'jaccard': np.concatenate([jaccard, np.zeros(len(extintas) + len(nascidas))]),
+        'evento': np.concatenate([evento, np.full(len(extintas), "extinção"),
+                                  np.full(len(nascidas), "nascimento")]).astype(object),
+    }).replace({'comunidade_origem': {-1: pd.NA}, 'comunidade_destino': {-1: pd.NA}})
+
+# ===================================================================
+# FUNÇÃO: trajetorias_comunidades
+# Descrição: Casa as partições consecutivas de uma série (anos ou
+#            períodos) e concatena as ligações em uma única tabela.
+# ===================================================================
+def trajetorias_comunidades(particoes: list, rotulos: list, limiar=LIMIAR_CASAMENTO,
+                            tamanho_minimo=TAMANHO_MINIMO):
+    tabelas = [casar_comunidades(anterior, atual, r0, r1, limiar, tamanho_minimo)
+               for anterior, atual, r0, r1 in zip(particoes, particoes[1:], rotulos, rotulos[1:])]
+    if not tabelas:
+        return pd.DataFrame()
+    return pd.concat(tabelas, ignore_index=True)
+
+# ===================================================================
+# FUNÇÃO: tabela_comunidades
+# Descrição: DataFrame (rotulo, autor, comunidade) com a comunidade de
+#            cada autor presente em cada partição.
+# ===================================================================
+def tabela_comunidades(rede: dict, particoes: list, rotulos: list):
+    partes = []
+    for membro, rotulo in zip(particoes, rotulos):
+        presentes = np.flatnonzero(membro >= 0)
+        partes.append(pd.DataFrame({'rotulo': rotulo,
+                                    'autor': rede['ids'][presentes],
+                                    'comunidade': membro[presentes]}))
+    return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(
+        columns=['rotulo', 'autor', 'comunidade'])
+
+# ===================================================================
+# MAIN: Comunidades por ano e por período de avaliação
+# ===================================================================
+@instrumentar_pipeline("comunidades.main")
+def main(pasta="./basedados/anos", periodos=PERIODOS,
+         workers=None, pasta_saida="."):
+    with etapa("construir_rede_temporal"):
+        rede = construir_rede_temporal(pasta)
+    anos = rede['anos'].tolist()
+
+    with etapa("comunidades_anos"):
+        resultados_anos = comunidades_anos(rede)
+    for ano, (_, info) in zip(anos, resultados_anos):
+        print(f"{ano}: {info['num_comunidades']} comunidades, modularidade {info['modularidade']:.4f}, "
+              f"{info['varreduras']} varreduras")
+
+    with etapa("comunidades_periodos"):
+        resultados_periodos = comunidades_periodos(pasta, list(periodos), workers)
+    for periodo, (_, info) in zip(periodos, resultados_periodos):
+        print(f"{periodo}: {info['num_comunidades']} comunidades, modularidade {info['modularidade']:.4f}")
+
+    particoes_anos = [membro for membro, _ in resultados_anos]
+    particoes_periodos = [membro for membro, _ in resultados_periodos]
+    rotulos_periodos = list(periodos)
+
+    with etapa("casar_comunidades"):
+        eventos = pd.concat([trajetorias_comunidades(particoes_anos, anos),
+                             trajetorias_comunidades(particoes_periodos, rotulos_periodos)],
+                            ignore_index=True)
+    tabela = pd.concat([tabela_comunidades(rede, particoes_anos, anos),
+                        tabela_comunidades(rede, particoes_periodos, rotulos_periodos)],
+                       ignore_index=True)
+    os.makedirs(pasta_saida, exist_ok=True)
+    tabela.to_csv(os.path.join(pasta_saida, "comunidades.csv"), index=False)
+    eventos.to_csv(os.path.join(pasta_saida, "eventos_comunidades.csv"), index=False)
+    print("Comunidades salvas em comunidades.csv e eventos em eventos_comunidades.csv")
+    print(eventos['evento'].value_counts().to_string())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import os
+import numpy as np
+import pandas as pd
+from instrumentacao import etapa, instrumentar_pipeline
+from metricas_esparsas import adjacencia_de_arestas
+from paralelo import mapear_blocos_fontes
+from rede_temporal import PERIODOS, construir_rede_temporal, janelas_anos_periodos, matriz_janela
+
+# ===================================================================
+# Conectividade e distâncias
+# Componentes conexas por union-find vetorizado sobre os arrays de
+# arestas: a cada rodada, a raiz de maior rótulo de cada aresta com
+# pontas em componentes diferentes é ligada à de menor rótulo
+# (np.minimum.at) e os caminhos são comprimidos por saltos de ponteiro,
+# até nenhuma aresta ligar componentes diferentes.
+#
+# Caminho médio e diâmetro efetivo são medidos na componente gigante
+# (entre componentes diferentes a distância é infinita), com BFS a
+# partir de uma amostra de fontes da componente. As fontes são
+# processadas em blocos, cada bloco uma BFS simultânea por produtos
+# matriz esparsa x matriz, em série ou em um pool de processos. Com
+# amostras >= tamanho da componente, o resultado é exato.
+#
+#   caminho_medio: média das distâncias entre pares da componente gigante
+#   diametro_efetivo: distância que cobre 90% desses pares, interpolada
+#                     entre distâncias inteiras (como no SNAP)
+#   diametro: maior distância encontrada (exato só sem amostragem)
+# ===================================================================
+
+VARIAVEL_AMOSTRAS = "REDES_AMOSTRAS"
+AMOSTRAS_PADRAO = 512
+QUANTIL_EFETIVO = 0.9
+
+# Chaves acrescentadas às métricas de cada ano (metricas_stream / R1)
+CHAVES_CONECTIVIDADE = ('componentes', 'maior_componente', 'fracao_gigante', 'caminho_medio',
+                        'diametro_efetivo', 'diametro', 'amostras_caminhos')
+
+# ===================================================================
+# FUNÇÃO: numero_amostras
+# Descrição: Número de fontes da BFS amostrada: o valor informado ou a
+#            variável REDES_AMOSTRAS (padrão AMOSTRAS_PADRAO).
+# ===================================================================
+def numero_amostras(amostras=None):
+    if amostras is None:
+        try:
+            amostras = int(os.environ.get(VARIAVEL_AMOSTRAS, AMOSTRAS_PADRAO))
+        except ValueError:
+            amostras = AMOSTRAS_PADRAO
+    return max(1, amostras)
+
+# ===================================================================
+# FUNÇÃO: rotular_componentes
+# Descrição: Rótulo da componente de cada nó (o menor índice da
+#            componente), a partir dos arrays de arestas (origem, destino).
+# ===================================================================
+def rotular_componentes(origem: np.ndarray, destino: np.ndarray, num_nos: int):
+    pai = np.arange(num_nos, dtype=np.int64)
+    origem = np.asarray(origem, dtype=np.int64)
+    destino = np.asarray(destino, dtype=np.int64)
+    while True:
+        ru, rv = pai[origem], pai[destino]
+        ligam = ru != rv
+        if not ligam.any():
+            return pai
+        np.minimum.at(pai, np.maximum(ru, rv)[ligam], np.minimum(ru, rv)[ligam])
+        # Saltos de ponteiro: cada nó passa a apontar para a sua raiz
+        while True:
+            avo = pai[pai]
+            if np.array_equal(avo, pai):
+                break
+            pai = avo
+
+# ===================================================================
+# FUNÇÃO: resumo_componentes
+# Descrição: Número de componentes, tamanho da maior e fração de nós
+#            nela, e a máscara dos nós da componente gigante.
+# ===================================================================
+def resumo_componentes(origem: np.ndarray, destino: np.ndarray, num_nos: int):
+    if num_nos == 0:
+        return {'componentes': 0, 'maior_componente': 0, 'fracao_gigante': 0.0}, np.zeros(0, dtype=bool)
+    rotulos = rotular_componentes(origem, destino, num_nos)
+    tamanhos = np.bincount(rotulos, minlength=num_nos)
+    gigante = int(np.argmax(tamanhos))
+    resumo = {
+        'componentes': int(np.count_nonzero(tamanhos)),
+        'maior_componente': int(tamanhos[gigante]),
+        'fracao_gigante': float(tamanhos[gigante] / num_nos),
+    }
+    return resumo, rotulos == gigante
+
+# ===================================================================
+# FUNÇÃO: _histograma_distancias
+# Descrição: BFS simultânea a partir das `fontes` (uma linha por fonte).
+#            Retorna o histograma das distâncias às demais alcançadas:
+#            histograma[d] = número de pares (fonte, alvo) à distância d.
+# ===================================================================
+def _histograma_distancias(fontes: np.ndarray, A):
+    b, n = len(fontes), A.shape[0]
+    visitados = np.zeros((b, n), dtype=bool)
+    visitados[np.arange(b), fontes] = True
+    fronteira = visitados.astype(np.float32)
+    histograma = [0]
+    while True:
+        alcancados = (A @ fronteira.T).T > 0
+        novos = alcancados & ~visitados
+        quantidade = int(np.count_nonzero(novos))
+        if quantidade == 0:
+            return np.array(histograma, dtype=np.int64)
+        histograma.append(quantidade)
+        visitados |= novos
+        fronteira = novos.astype(np.float32)
+
+def _somar_histogramas(histogramas):
+    total = np.zeros(1, dtype=np.int64)
+    for histograma in histogramas:
+        if len(histograma) > len(total):
+            total = np.pad(total, (0, len(histograma) - len(total)))
+        total[:len(histograma)] += histograma
+    return total
+
+# ===================================================================
+# FUNÇÃO: histograma_distancias
+# Descrição: Soma dos histogramas de distâncias de todas as fontes,
+#            processadas em blocos, em série ou em um pool de processos
+#            (paralelo.mapear_blocos_fontes, o mesmo executor da BFS de
+#            centralidade.py).
+# ===================================================================
+def histograma_distancias(A, fontes: np.ndarray, workers=None):
+    return mapear_blocos_fontes(_histograma_distancias, A, fontes, _somar_histogramas, workers)
+
+# ===================================================================
+# FUNÇÃO: diametro_efetivo
+# Descrição: Menor distância (interpolada linearmente entre inteiros) que
+#            cobre a fração `quantil` dos pares alcançáveis.
+# ===================================================================
+def diametro_efetivo(histograma: np.ndarray, quantil=QUANTIL_EFETIVO):
+    pares = histograma[1:].astype(np.float64)
+    if pares.sum() == 0:
+        return 0.0
+    acumulada = np.concatenate([[0.0], np.cumsum(pares) / pares.sum()])
+    d = int(np.searchsorted(acumulada, quantil))
+    if d == 0:
+        return 0.0
+    return float(d - 1 + (quantil - acumulada[d - 1]) / (acumulada[d] - acumulada[d - 1]))
+
+# ===================================================================
+# FUNÇÃO: metricas_conectividade
+# Descrição: Componentes (union-find) e estatísticas de distância da
+#            componente gigante (BFS amostrada) de um grafo dado pelos
+#            arrays de arestas. Com amostras >= tamanho da componente a
+#            BFS parte de todos os nós e os valores são exatos.
+# ===================================================================
+def metricas_conectividade(origem: np.ndarray, destino: np.ndarray, num_nos: int, amostras=None,
+                           semente=42, workers=None):
+    resumo, na_gigante = resumo_componentes(origem, destino, num_nos)
+    resumo.update(caminho_medio=0.0, diametro_efetivo=0.0, diametro=0, amostras_caminhos=0)
+    if resumo['maior_componente'] <= 1:
+        return resumo
+
+    # Matriz da componente gigante, em índices locais
+    gigante = np.flatnonzero(na_gigante)
+    local = np.full(num_nos, -1, dtype=np.int64)
+    local[gigante] = np.arange(len(gigante))
+    origem, destino = np.asarray(origem), np.asarray(destino)
+    dentro = na_gigante[origem]
+    A = adjacencia_de_arestas(local[origem[dentro]], local[destino[dentro]], len(gigante))
+    A = A.astype(np.float32)
+
+    amostras = min(numero_amostras(amostras), len(gigante))
+    fontes = np.arange(len(gigante)) if amostras >= len(gigante) else np.sort(
+        np.random.default_rng(semente).choice(len(gigante), size=amostras, replace=False))
+    histograma = histograma_distancias(A, fontes, workers)
+
+    distancias = np.arange(len(histograma))
+    resumo.update(
+        caminho_medio=float((distancias * histograma).sum() / max(histograma[1:].sum(), 1)),
+        diametro_efetivo=diametro_efetivo(histograma),
+        diametro=int(len(histograma) - 1),
+        amostras_caminhos=int(amostras),
+    )
+    return resumo
+
+# ===================================================================
+# FUNÇÃO: conectividade_janela
+# Descrição: metricas_conectividade dos autores presentes na janela
+#            [inicio, fim] do armazenamento temporal.
+# ===================================================================
+def conectividade_janela(rede: dict, inicio: int, fim: int, amostras=None, workers=None):
+    A = matriz_janela(rede, inicio, fim)
+    T = A.tocoo()
+    metade = T.row <= T.col
+    return metricas_conectividade(T.row[metade], T.col[metade], A.shape[0], amostras, workers=workers)
+
+@instrumentar_pipeline("conectividade.main")
+def main(pasta="./basedados/anos", periodos=PERIODOS, amostras=None, workers=None, pasta_saida="."):
+    with etapa("construir_rede_temporal"):
+        rede = construir_rede_temporal(pasta)
+    janelas = janelas_anos_periodos(rede, periodos)
+    primeiro, ultimo = int(rede['anos'][0]), int(rede['anos'][-1])
+    janelas.append((f"{primeiro}-{ultimo}", primeiro, ultimo))
+
+    linhas = []
+    for rotulo, inicio, fim in janelas:
+        with etapa("conectividade_janela", janela=rotulo) as info:
+            resumo = conectividade_janela(rede, inicio, fim, amostras, workers)
+            info.update(nos=resumo['maior_componente'], amostras=resumo['amostras_caminhos'])
+        linhas.append(dict(janela=rotulo, **resumo))
+        print(f"{rotulo}: {resumo['componentes']} componentes, gigante {resumo['fracao_gigante']:.1%}, "
+              f"caminho médio {resumo['caminho_medio']:.3f}, diâmetro efetivo {resumo['diametro_efetivo']:.2f}")
+
+    os.makedirs(pasta_saida, exist_ok=True)
+    pd.DataFrame(linhas).to_csv(os.path.join(pasta_saida, "conectividade.csv"), index=False)
+    print("Métricas salvas em conectividade.csv")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+import re
+import unicodedata
+import zlib
+from collections import Counter, defaultdict
+import numpy as np
+from aliases import COLUNAS, gravar_aliases
+from instrumentacao import etapa, instrumentar_pipeline
+from rede_temporal import construir_rede_temporal
+
+# ===================================================================
+# Deduplicação de autores
+# O Scopus às vezes dá mais de um id ao mesmo autor, com variações do
+# nome ("Orivaldo Vieira de Santana Júnior", "Orivaldo V. Santana-Júnior").
+# Comparar todos os pares de autores é quadrático; em vez
+# disso os candidatos vêm de um índice MinHash LSH sobre os trigramas do
+# sobrenome: autores cujos sobrenomes têm Jaccard alto caem no mesmo
+# balde de alguma faixa da assinatura (com a inicial do primeiro nome na
+# chave do balde), e só esses pares são comparados.
+#
+# Um par é compatível quando, nos nomes normalizados (sem acentos,
+# partículas e sufixos como Junior/Filho):
+#   - os sobrenomes são iguais, têm Jaccard de trigramas >= 0.6 ou um é
+#     prefixo (>= 5 letras) do outro (nomes truncados);
+#   - os primeiros nomes são iguais ou um é a inicial do outro;
+#   - os nomes do meio do nome mais curto aparecem, na ordem, no outro
+#     (iguais, prefixos ou iniciais);
+#   - além do sobrenome há alguma evidência: ao menos um nome do meio em
+#     comum ("J.P. Silva" não casa com "Jordao Silva") ou, se um dos nomes
+#     não tem nome do meio, o primeiro nome completo igual.
+# Quando o par se apoia só no primeiro nome e no sobrenome ("Daniel Dias"
+# e "Daniel H.N. Dias"), o nome não basta: com um sobrenome comum (de
+# SOBRENOME_COMUM autores ou mais na base, como Silva ou Dias) o par é
+# descartado, e com os demais sobrenomes os dois precisam ter algum
+# coautor em comum.
+# Os pares compatíveis são fundidos em ordem decrescente de semelhança
+# do nome completo, com um union-find. Duas restrições impedem fusões:
+# autores que já foram coautores (aresta em algum ano) são pessoas
+# diferentes, e todos os pares de um grupo fundido têm de ser
+# compatíveis (evita juntar "J. Silva" com "João Silva" e "José Silva").
+# Variantes que publicaram juntas ficam separadas de propósito, mesmo com
+# nomes quase iguais: "ADAILDO GOMES D'ASSUNCAO" e "Adaildo G.
+# D'Assunção Junior" são coautores em vários anos (provavelmente pai e
+# filho) e não são fundidos.
+#
+# O id canônico do grupo é o presente em mais anos. O resultado é o
+# arquivo aliases.csv na pasta dos GEXF (ver aliases.py), que pode ser
+# revisado antes de as análises seguintes o usarem.
+# ===================================================================
+
+PARTICULAS = {"de", "da", "do", "dos", "das", "e", "del", "della", "di", "du", "van", "von", "der", "la", "le"}
+SUFIXOS = {"junior", "jr", "filho", "neto", "sobrinho"}
+NUM_HASHES = 64
+LINHAS_FAIXA = 4
+SIMILARIDADE_SOBRENOME = 0.6
+PREFIXO_MINIMO = 5
+# Sobrenomes de pelo menos este número de autores não bastam, com o
+# primeiro nome, para fundir dois ids
+SOBRENOME_COMUM = 10
+_PRIMO = (1 << 61) - 1
+
+# ===================================================================
+# FUNÇÃO: normalizar_nome
+# Descrição: Lista de tokens do nome: sem acentos, em minúsculas, sem
+#            apóstrofos (D'Assunção -> dassuncao), com pontuação como
+#            separador e sem partículas e sufixos.
+# ===================================================================
+def normalizar_nome(nome: str):
+    nome = unicodedata.normalize("NFKD", nome)
+    nome = "".join(c for c in nome if not unicodedata.combining(c)).lower()
+    nome = re.sub(r"['’`´]", "", nome)
+    tokens = re.sub(r"[^a-z0-9]+", " ", nome).split()
+    return [t for t in tokens if t not in PARTICULAS and t not in SUFIXOS]
+
+def trigramas(texto: str):
+    texto = f"#{texto}#"
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+def jaccard(a: set, b: set):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+def _prefixo(a: str, b: str):
+    curto, longo = sorted((a, b), key=len)
+    return len(curto) >= PREFIXO_MINIMO and longo.startswith(curto)
+
+def _token_compativel(a: str, b: str):
+    if a == b or _prefixo(a, b):
+        return True
+    # Inicial: "g" x "gomes"
+    return (len(a) == 1 or len(b) == 1) and a[0] == b[0]
+
+def _meio_compativel(curto: list, longo: list):
+    # Os tokens de `curto` aparecem, na ordem, em `longo`
+    i = 0
+    for token in longo:
+        if i < len(curto) and _token_compativel(curto[i], token):
+            i += 1
+    return i == len(curto)
+
+# ===================================================================
+# FUNÇÃO: nomes_compativeis
+# Descrição: Verifica se dois nomes normalizados (listas de tokens com
+#            pelo menos primeiro nome e sobrenome) podem ser da mesma
+#            pessoa, pelas regras descritas no início do arquivo.
+# ===================================================================
+def nomes_compativeis(a: list, b: list):
+    sa, sb = a[-1], b[-1]
+    if not (sa == sb or _prefixo(sa, sb) or jaccard(trigramas(sa), trigramas(sb)) >= SIMILARIDADE_SOBRENOME):
+        return False
+    if not (a[0] == b[0] or ((len(a[0]) == 1 or len(b[0]) == 1) and a[0][0] == b[0][0])):
+        return False
+    meio_a, meio_b = sorted((a[1:-1], b[1:-1]), key=len)
+    if not meio_a and not (a[0] == b[0] and len(a[0]) > 1):
+        return False
+    return _meio_compativel(meio_a, meio_b)
+
+def so_primeiro_nome(a: list, b: list):
+    # O par compatível se apoia só no primeiro nome e no sobrenome
+    return not a[1:-1] or not b[1:-1]
+
+# ===================================================================
+# FUNÇÃO: assinaturas_minhash
+# Descrição: Assinatura MinHash (NUM_HASHES valores) do conjunto de
+#            trigramas de cada texto. Os trigramas são mapeados para
+#            inteiros com crc32 e cada função de hash é a*x + b mod p.
+# ===================================================================
+def assinaturas_minhash(textos: list, semente=42):
+    rng = np.random.default_rng(semente)
+    a = rng.integers(1, _PRIMO, size=NUM_HASHES, dtype=np.uint64).astype(object)
+    b = rng.integers(0, _PRIMO, size=NUM_HASHES, dtype=np.uint64).astype(object)
+    assinaturas = np.zeros((len(textos), NUM_HASHES), dtype=np.uint64)
+    for i, texto in enumerate(textos):
+        valores = np.array([zlib.crc32(g.encode()) for g in trigramas(texto)], dtype=object)
+        # Inteiros do Python: a*x + b não transborda antes do módulo
+        assinaturas[i] = ((np.outer(a, valores) + b[:, None]) % _PRIMO).min(axis=1).astype(np.uint64)
+    return assinaturas
+
+# ===================================================================
+# FUNÇÃO: pares_candidatos
+# Descrição: Pares (i, j), i < j, que dividem algum balde do LSH: a
+#            assinatura do sobrenome é cortada em faixas de LINHAS_FAIXA
+#            valores, e a chave do balde é (faixa, inicial, valores).
+# ===================================================================
+def pares_candidatos(nomes: list):
+    assinaturas = assinaturas_minhash([n[-1] for n in nomes])
+    baldes = defaultdict(list)
+    for i, nome in enumerate(nomes):
+        for faixa in range(0, NUM_HASHES, LINHAS_FAIXA):
+            chave = (faixa, nome[0][0], assinaturas[i, faixa:faixa + LINHAS_FAIXA].tobytes())
+            baldes[chave].append(i)
+
+    pares = set()
+    for membros in baldes.values():
+        for x in range(len(membros)):
+            for y in range(x + 1, len(membros)):
+                pares.add((membros[x], membros[y]))
+    return sorted(pares)
+
+def _nome_principal(nomes: list):
+    # O nome mais frequente do autor; empates ficam com o mais longo
+    contagem = Counter(n for n in nomes if n)
+    if not contagem:
+        return ""
+    return max(contagem, key=lambda n: (contagem[n], len(n)))
+
+# ===================================================================
+# FUNÇÃO: encontrar_duplicatas
+# Descrição: Agrupa os autores do armazenamento temporal (montado sem o
+#            mapa de aliases) que são a mesma pessoa. Retorna as linhas do
+#            mapa: alias, id canônico, os dois nomes e a semelhança.
+# ===================================================================
+def encontrar_duplicatas(rede: dict):
+    ids = rede['ids'].tolist()
+    num_autores = len(ids)
+
+    nomes_por_autor = defaultdict(list)
+    for autor, nome, presente in zip(rede['no_autor'].tolist(), rede['no_complete_name'].tolist(),
+                                     rede['no_complete_name_presente'].tolist()):
+        if presente:
+            nomes_por_autor[autor].append(nome)
+    anos_por_autor = np.bincount(np.unique(rede['no_autor'] * len(rede['anos']) +
+                                           np.searchsorted(rede['anos'], rede['no_ano'])) // len(rede['anos']),
+                                 minlength=num_autores)
+
+    # Autores com pelo menos primeiro nome e sobrenome
+    autores, nomes, originais = [], [], []
+    for autor in range(num_autores):
+        original = _nome_principal(nomes_por_autor[autor])
+        tokens = normalizar_nome(original)
+        if len(tokens) >= 2:
+            autores.append(autor)
+            nomes.append(tokens)
+            originais.append(original)
+
+    coautores = set((rede['aresta_origem'] * num_autores + rede['aresta_destino']).tolist())
+    def _coautores(x, y):
+        u, v = min(autores[x], autores[y]), max(autores[x], autores[y])
+        return u * num_autores + v in coautores
+
+    vizinhos = defaultdict(set)
+    for u, v in zip(rede['aresta_origem'].tolist(), rede['aresta_destino'].tolist()):
+        vizinhos[u].add(v)
+        vizinhos[v].add(u)
+    frequencia = Counter(n[-1] for n in nomes)
+    def _compativeis(x, y):
+        if not nomes_compativeis(nomes[x], nomes[y]) or _coautores(x, y):
+            return False
+        if not so_primeiro_nome(nomes[x], nomes[y]):
+            return True
+        if max(frequencia[nomes[x][-1]], frequencia[nomes[y][-1]]) >= SOBRENOME_COMUM:
+            return False
+        return bool(vizinhos[autores[x]] & vizinhos[autores[y]])
+
+    completos = [trigramas(" ".join(n)) for n in nomes]
+    pontuados = []
+    for x, y in pares_candidatos(nomes):
+        if _compativeis(x, y):
+            pontuados.append((jaccard(completos[x], completos[y]), x, y))
+    pontuados.sort(key=lambda p: (-p[0], p[1], p[2]))
+
+    # Union-find com a lista de membros de cada grupo
+    grupo = list(range(len(autores)))
+    membros = {x: [x] for x in range(len(autores))}
+    for _, x, y in pontuados:
+        gx, gy = grupo[x], grupo[y]
+        if gx == gy:
+            continue
+        if any(not _compativeis(p, q) for p in membros[gx] for q in membros[gy]):
+            continue
+        if len(membros[gx]) < len(membros[gy]):
+            gx, gy = gy, gx
+        for p in membros[gy]:
+            grupo[p] = gx
+        membros[gx].extend(membros.pop(gy))
+
+    linhas = []
+    for lista in membros.values():
+        if len(lista) < 2:
+            continue
+        canonico = max(lista, key=lambda p: (anos_por_autor[autores[p]], -int(ids[autores[p]])
+                                             if ids[autores[p]].isdigit() else 0))
+        for p in sorted(lista, key=lambda p: ids[autores[p]]):
+            if p == canonico:
+                continue
+            linhas.append({
+                'alias': ids[autores[p]],
+                'canonico': ids[autores[canonico]],
+                'nome_alias': originais[p],
+                'nome_canonico': originais[canonico],
+                'similaridade': round(jaccard(completos[p], completos[canonico]), 3),
+            })
+    return linhas
+
+@instrumentar_pipeline("deduplicacao.main")
+def main(pasta="./basedados/anos"):
+    with etapa("construir_rede_temporal"):
+        # Sempre a partir dos ids originais, ignorando um mapa anterior
+        rede = construir_rede_temporal(pasta, com_aliases=False)
+    with etapa("encontrar_duplicatas") as info:
+        linhas = encontrar_duplicatas(rede)
+        info['aliases'] = len(linhas)
+
+    for linha in linhas:
+        print(f"{linha['alias']} ({linha['nome_alias']}) -> {linha['canonico']} ({linha['nome_canonico']})")
+    caminho = gravar_aliases(pasta, [{c: linha[c] for c in COLUNAS} for linha in linhas])
+    print(f"{len(linhas)} aliases salvos em {caminho}")
+
+if __name__ == "__main__":
+    main()
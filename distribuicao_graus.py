@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+# ===================================================================
+# Distribuição de graus agregada
+# Em vez de uma linha por autor por ano, a distribuição é guardada como
+# histograma: (ano, grau, contagem), com tipos inteiros. As densidades
+# dos gráficos são estimadas a partir dessas contagens com um KDE
+# gaussiano "binned": as contagens são distribuídas em uma grade regular
+# e convoluídas com o núcleo via FFT. O custo depende da grade e do
+# número de graus distintos, não do número de autores.
+# ===================================================================
+
+COLUNAS = ['ano', 'grau', 'contagem']
+PONTOS_GRADE = 512
+
+# ===================================================================
+# FUNÇÃO: histogramas_graus
+# Descrição: Monta o DataFrame (ano, grau, contagem) a partir das
+#            distribuições de graus (Counter grau -> número de nós) de
+#            cada ano. Anos sem distribuição (None) são ignorados.
+# ===================================================================
+def histogramas_graus(distribuicoes: list, anos: list):
+    partes_ano, partes_grau, partes_contagem = [], [], []
+    for distribuicao, ano in zip(distribuicoes, anos):
+        if distribuicao is None:
+            continue
+        graus = np.fromiter(distribuicao.keys(), dtype=np.int64, count=len(distribuicao))
+        contagens = np.fromiter(distribuicao.values(), dtype=np.int64, count=len(distribuicao))
+        ordem = np.argsort(graus)
+        partes_ano.append(np.full(len(graus), ano, dtype=np.int32))
+        partes_grau.append(graus[ordem])
+        partes_contagem.append(contagens[ordem])
+
+    if not partes_ano:
+        return pd.DataFrame({c: pd.Series(dtype=np.int64) for c in COLUNAS})
+    return pd.DataFrame({
+        'ano': np.concatenate(partes_ano),
+        'grau': np.concatenate(partes_grau),
+        'contagem': np.concatenate(partes_contagem),
+    }, columns=COLUNAS)
+
+# ===================================================================
+# FUNÇÃO: largura_scott
+# Descrição: Largura de banda pela regra de Scott (a mesma do
+#            scipy.stats.gaussian_kde), com média e desvio ponderados
+#            pelas contagens.
+# ===================================================================
+def largura_scott(valores: np.ndarray, pesos: np.ndarray):
+    n = pesos.sum()
+    if n <= 1:
+        return 1.0
+    media = np.average(valores, weights=pesos)
+    # Desvio amostral (ddof=1), como no gaussian_kde
+    variancia = np.sum(pesos * (valores - media) ** 2) / (n - 1)
+    desvio = np.sqrt(variancia)
+    return desvio * n ** (-1 / 5) if desvio > 0 else 1.0
+
+# ===================================================================
+# FUNÇÃO: kde_binned
+# Descrição: Densidade gaussiana estimada das contagens, avaliada em uma
+#            grade regular `grade`. As contagens são distribuídas nos dois
+#            pontos vizinhos da grade (binning linear) e convoluídas com o
+#            núcleo via FFT. Como no gaussian_kde, a massa que cai fora da
+#            grade não é redistribuída.
+# ===================================================================
+def kde_binned(valores, pesos, grade: np.ndarray, largura=None):
+    valores = np.asarray(valores, dtype=np.float64)
+    pesos = np.asarray(pesos, dtype=np.float64)
+    if largura is None:
+        largura = largura_scott(valores, pesos)
+
+    passo = grade[1] - grade[0]
+    m = len(grade)
+    posicao = np.clip((valores - grade[0]) / passo, 0, m - 1)
+    esquerda = np.minimum(np.floor(posicao).astype(np.int64), m - 2)
+    fracao = posicao - esquerda
+    massa = (np.bincount(esquerda, weights=pesos * (1 - fracao), minlength=m)
+             + np.bincount(esquerda + 1, weights=pesos * fracao, minlength=m))
+
+    # Núcleo amostrado até 4 larguras de banda; preenchimento com zeros
+    # evita que a convolução circular da FFT "dê a volta" na grade
+    meio = min(int(np.ceil(4 * largura / passo)), m)
+    nucleo = np.exp(-0.5 * (np.arange(-meio, meio + 1) * passo / largura) ** 2)
+    tamanho = m + len(nucleo) - 1
+    convolucao = np.fft.irfft(np.fft.rfft(massa, tamanho) * np.fft.rfft(nucleo, tamanho), tamanho)
+    densidade = np.maximum(convolucao[meio:meio + m], 0)
+
+    total = pesos.sum()
+    if total <= 0:
+        return densidade
+    return densidade / (total * largura * np.sqrt(2 * np.pi))
+
+# ===================================================================
+# FUNÇÃO: densidades_por_ano
+# Descrição: Densidade de cada ano do histograma em uma grade comum.
+#            metodo: "kde" (KDE binned) ou "histograma" (proporção de nós
+#            em cada grau, interpolada na grade). Retorna a grade, a lista
+#            de anos e a matriz anos x grade.
+# ===================================================================
+def densidades_por_ano(df_hist: pd.DataFrame, metodo="kde", pontos=PONTOS_GRADE, largura=None):
+    anos = np.unique(df_hist['ano'].to_numpy())
+    graus = df_hist['grau'].to_numpy()
+    minimo, maximo = (graus.min(), graus.max()) if len(graus) else (0, 1)
+    if minimo == maximo:
+        minimo, maximo = minimo - 1, maximo + 1
+    grade = np.linspace(minimo, maximo, pontos)
+
+    densidades = np.zeros((len(anos), pontos))
+    for i, (ano, grupo) in enumerate(df_hist.groupby('ano', sort=True)):
+        g = grupo['grau'].to_numpy()
+        c = grupo['contagem'].to_numpy()
+        if metodo == "kde":
+            densidades[i] = kde_binned(g, c, grade, largura)
+        else:
+            densidades[i] = np.interp(grade, g, c / c.sum(), left=0, right=0)
+    return grade, anos, densidades
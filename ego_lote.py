@@ -0,0 +1,149 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import grafo_compacto
+from cache_gexf import carregar_snapshot
+from metricas_esparsas import adjacencia_de_grafo, adjacencia_de_snapshot
+
+# ===================================================================
+# Métricas de rede ego em lote
+# Em vez de montar um nx.ego_graph por vértice, as métricas de todos os
+# vértices (ou de uma lista deles) são calculadas de uma vez sobre a
+# mesma matriz de adjacência:
+#   - raio 1: tamanho = grau + 1 e arestas da ego = grau + triângulos,
+#     com os triângulos contados por (A @ A) .* A;
+#   - raio > 1: expansão de fronteira em bloco (F <- F @ A), guardando o
+#     conjunto visitado de cada vértice como uma linha esparsa.
+# O clustering local vem da mesma contagem de triângulos. Os valores
+# coincidem com nx.ego_graph / nx.density / nx.clustering.
+# ===================================================================
+
+COLUNAS = ['autor', 'grau', 'tamanho_ego', 'arestas_ego', 'densidade_ego', 'clustering']
+
+def _separar_lacos(A):
+    # Matriz sem a diagonal (laços), em int32 para que os produtos não
+    # transbordem, e o indicador de laço por vértice
+    lacos = (A.diagonal() != 0).astype(np.int64)
+    coo = A.tocoo()
+    fora = coo.row != coo.col
+    A0 = sp.csr_array((np.ones(fora.sum(), dtype=np.int32), (coo.row[fora], coo.col[fora])),
+                      shape=A.shape)
+    return A0, lacos
+
+def _triangulos(A0, selecionados: np.ndarray):
+    # Triângulos que passam por cada vértice selecionado
+    linhas = A0[selecionados]
+    return np.asarray((linhas @ A0).multiply(linhas).sum(axis=1)).ravel() // 2
+
+def _bolas(A0, selecionados: np.ndarray, raio: int, bloco: int):
+    # Conjuntos visitados (linhas esparsas) até a distância `raio`
+    n = A0.shape[0]
+    for i0 in range(0, len(selecionados), bloco):
+        fontes = selecionados[i0:i0 + bloco]
+        visitados = sp.csr_array((np.ones(len(fontes), dtype=np.int8),
+                                  (np.arange(len(fontes)), fontes)), shape=(len(fontes), n))
+        fronteira = visitados
+        for _ in range(raio):
+            alcancados = fronteira @ A0
+            alcancados.data[:] = 1
+            fronteira = alcancados - alcancados.multiply(visitados)
+            fronteira.eliminate_zeros()
+            if fronteira.nnz == 0:
+                break
+            visitados = visitados + fronteira
+        yield i0, visitados
+
+# ===================================================================
+# FUNÇÃO: metricas_ego_adjacencia
+# Descrição: Calcula as métricas ego dos vértices `selecionados` (índices;
+#            todos se None) a partir da matriz de adjacência.
+# ===================================================================
+def metricas_ego_adjacencia(ids: list, A, selecionados=None, raio=1, bloco=512):
+    n = A.shape[0]
+    selecionados = np.arange(n) if selecionados is None else np.asarray(selecionados, dtype=np.int64)
+    A0, lacos = _separar_lacos(A)
+
+    grau_sem_laco = np.diff(A0.indptr)[selecionados].astype(np.int64)
+    triangulos = _triangulos(A0, selecionados)
+
+    if raio == 1:
+        tamanho = grau_sem_laco + 1
+        # Arestas entre o vértice, seus vizinhos e os laços desses vértices
+        arestas = grau_sem_laco + triangulos + lacos[selecionados] + (A0 @ lacos)[selecionados]
+    else:
+        tamanho = np.zeros(len(selecionados), dtype=np.int64)
+        arestas = np.zeros(len(selecionados), dtype=np.int64)
+        for i0, visitados in _bolas(A0, selecionados, raio, bloco):
+            i1 = i0 + visitados.shape[0]
+            tamanho[i0:i1] = np.diff(visitados.indptr)
+            internas = np.asarray((visitados @ A0).multiply(visitados).sum(axis=1)).ravel()
+            arestas[i0:i1] = internas // 2 + visitados @ lacos
+
+    pares = tamanho * (tamanho - 1)
+    densidade = np.divide(2 * arestas, pares, out=np.zeros(len(selecionados)), where=pares > 0)
+    pares_vizinhos = grau_sem_laco * (grau_sem_laco - 1)
+    clustering = np.divide(2 * triangulos, pares_vizinhos, out=np.zeros(len(selecionados)),
+                           where=pares_vizinhos > 0)
+
+    return pd.DataFrame({
+        'autor': [ids[i] for i in selecionados],
+        'grau': grau_sem_laco + 2 * lacos[selecionados],
+        'tamanho_ego': tamanho,
+        'arestas_ego': arestas,
+        'densidade_ego': densidade,
+        'clustering': clustering,
+    }, columns=COLUNAS)
+
+# ===================================================================
+# FUNÇÃO: metricas_ego
+# Descrição: Métricas ego de todos os vértices de um nx.Graph (ou grafo
+#            compacto), ou só dos vértices em `nos`. Acrescenta nome e
+#            is_permanent do autor.
+# ===================================================================
+def metricas_ego(G: nx.Graph, nos=None, raio=1):
+    ids, A = adjacencia_de_grafo(G)
+    selecionados = None
+    if nos is not None:
+        indice = {n: i for i, n in enumerate(ids)}
+        selecionados = [indice[n] for n in nos if n in indice]
+
+    df = metricas_ego_adjacencia(ids, A, selecionados, raio)
+    if grafo_compacto.eh_compacto(G):
+        linhas = np.arange(len(ids)) if selecionados is None else np.asarray(selecionados, dtype=np.int64)
+        df.insert(1, 'complete_name', grafo_compacto.coluna_no(G, 'complete_name')[linhas].tolist())
+        df.insert(2, 'is_permanent', grafo_compacto.coluna_no(G, 'is_permanent')[linhas].tolist())
+        return df
+    df.insert(1, 'complete_name', [G.nodes[n].get('complete_name', '') for n in df['autor']])
+    df.insert(2, 'is_permanent', [bool(G.nodes[n].get('is_permanent', False)) for n in df['autor']])
+    return df
+
+# ===================================================================
+# FUNÇÃO: metricas_ego_anos
+# Descrição: Métricas ego por ano, direto dos snapshots (sem nx.Graph).
+#            Com apenas_permanentes=True, só os docentes permanentes.
+# ===================================================================
+def metricas_ego_anos(arquivos: list, anos: list, raio=1, apenas_permanentes=False):
+    tabelas = []
+    for arquivo, ano in zip(arquivos, anos):
+        try:
+            snapshot = carregar_snapshot(arquivo)
+            if snapshot is None:
+                raise ValueError("formato não suportado pelo cache de snapshots")
+        except Exception as e:
+            print(f"Erro ao processar {arquivo}: {e}")
+            continue
+
+        ids, A = adjacencia_de_snapshot(snapshot)
+        permanente = np.asarray(snapshot['no_is_permanent'])
+        selecionados = np.flatnonzero(permanente) if apenas_permanentes else np.arange(len(ids))
+
+        df = metricas_ego_adjacencia(ids, A, selecionados, raio)
+        df.insert(0, 'ano', ano)
+        df.insert(2, 'complete_name', np.asarray(snapshot['no_complete_name'])[selecionados].tolist())
+        df.insert(3, 'is_permanent', permanente[selecionados])
+        tabelas.append(df)
+
+    if not tabelas:
+        return pd.DataFrame(columns=['ano', 'autor', 'complete_name', 'is_permanent'] + COLUNAS[1:])
+    return pd.concat(tabelas, ignore_index=True)
@@ -0,0 +1,198 @@
+import hashlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from instrumentacao import etapa
+from paralelo import numero_workers
+
+# ===================================================================
+# Exportação das figuras
+# Cada figura é uma tarefa: o arquivo de saída, uma função de desenho
+# de nível de módulo que recebe só dados (arrays, listas, DataFrames) e
+# devolve a figura, os dados e as opções do savefig. O hash do conteúdo
+# da tarefa (dados, opções e código da função de desenho) é comparado
+# com o registrado no manifesto (figuras.json na pasta de saída): se o
+# arquivo existe e o hash é o mesmo, a figura não é desenhada de novo.
+# As figuras pendentes são independentes e são desenhadas em um pool de
+# processos com o backend Agg (REDES_WORKERS / --workers; com 1 worker,
+# no próprio processo). O manifesto guarda o hash de cada figura e o que
+# foi gerado, reaproveitado ou falhou na última exportação.
+#
+# O manifesto vale em qualquer modo. Só quando as figuras devem ser
+# abertas em janelas (`mostrar`; por padrão, fora do modo lote REDES_LOTE,
+# ver renderizacao.py) as pendentes são desenhadas no processo principal.
+# ===================================================================
+
+ARQUIVO_MANIFESTO = "figuras.json"
+# Mesma variável de renderizacao.py (lida aqui sem importar o matplotlib)
+VARIAVEL_LOTE = "REDES_LOTE"
+# Incrementar quando a aparência mudar fora das funções de desenho (ex.:
+# renderizacao.py), para invalidar as figuras já exportadas
+VERSAO_FIGURAS = 1
+
+def modo_lote():
+    return os.environ.get(VARIAVEL_LOTE, "").lower() in ("1", "true", "sim")
+
+# ===================================================================
+# FUNÇÃO: tarefa_figura
+# Descrição: Monta a tarefa de uma figura. `funcao(**dados)` deve
+#            devolver a figura; `opcoes` vai para o savefig.
+# ===================================================================
+def tarefa_figura(arquivo: str, funcao, opcoes=None, **dados):
+    return {'arquivo': arquivo, 'funcao': funcao, 'opcoes': dict(opcoes or {}), 'dados': dados}
+
+def _atualizar_hash(sha, valor):
+    if isinstance(valor, pd.DataFrame):
+        sha.update(b"D")
+        _atualizar_hash(sha, {str(c): valor[c].to_numpy() for c in valor.columns})
+    elif isinstance(valor, np.ndarray):
+        if valor.dtype == object:
+            _atualizar_hash(sha, valor.tolist())
+        else:
+            sha.update(f"A{valor.dtype.str}{valor.shape}".encode())
+            sha.update(np.ascontiguousarray(valor).tobytes())
+    elif isinstance(valor, dict):
+        sha.update(b"{")
+        for chave in sorted(valor, key=str):
+            sha.update(repr(str(chave)).encode())
+            _atualizar_hash(sha, valor[chave])
+        sha.update(b"}")
+    elif isinstance(valor, (list, tuple)):
+        sha.update(b"[")
+        for item in valor:
+            _atualizar_hash(sha, item)
+        sha.update(b"]")
+    else:
+        sha.update(repr(valor).encode())
+
+def _codigo(funcao):
+    try:
+        return inspect.getsource(funcao)
+    except (OSError, TypeError):
+        return ""
+
+# ===================================================================
+# FUNÇÃO: hash_tarefa
+# Descrição: Hash do conteúdo da figura: dados, opções do savefig, nome e
+#            código da função de desenho e VERSAO_FIGURAS.
+# ===================================================================
+def hash_tarefa(tarefa: dict):
+    sha = hashlib.sha256()
+    funcao = tarefa['funcao']
+    sha.update(f"{VERSAO_FIGURAS}:{funcao.__qualname__}\n".encode())
+    sha.update(_codigo(funcao).encode())
+    _atualizar_hash(sha, tarefa['opcoes'])
+    _atualizar_hash(sha, tarefa['dados'])
+    return sha.hexdigest()
+
+def ler_manifesto(pasta_saida: str):
+    try:
+        with open(os.path.join(pasta_saida, ARQUIVO_MANIFESTO), encoding='utf-8') as f:
+            manifesto = json.load(f)
+    except (OSError, ValueError):
+        return {'figuras': {}}
+    manifesto.setdefault('figuras', {})
+    return manifesto
+
+def _gravar_manifesto(pasta_saida: str, manifesto: dict):
+    caminho = os.path.join(pasta_saida, ARQUIVO_MANIFESTO)
+    temporario = caminho + ".tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+def _iniciar_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+
+# ===================================================================
+# FUNÇÃO: renderizar_tarefa
+# Descrição: Desenha a figura e a grava em `caminho` (por um arquivo
+#            temporário, para não deixar imagens parciais). Retorna o
+#            tempo gasto. Com `mostrar`, abre a figura em vez de fechá-la.
+# ===================================================================
+def renderizar_tarefa(tarefa: dict, caminho: str, mostrar=False):
+    import matplotlib.pyplot as plt
+    inicio = time.perf_counter()
+    fig = tarefa['funcao'](**tarefa['dados'])
+    opcoes = dict(tarefa['opcoes'])
+    opcoes.setdefault('format', os.path.splitext(caminho)[1].lstrip('.') or 'png')
+    temporario = caminho + ".tmp"
+    fig.savefig(temporario, **opcoes)
+    os.replace(temporario, caminho)
+    if mostrar:
+        plt.show()
+    plt.close(fig)
+    return time.perf_counter() - inicio
+
+# ===================================================================
+# FUNÇÃO: exportar_figuras
+# Descrição: Grava as figuras das tarefas em `pasta_saida`, pulando as que
+#            não mudaram, e atualiza o manifesto. Com `mostrar` as figuras
+#            desenhadas também são abertas (padrão: fora do modo lote).
+#            Retorna o dicionário da última exportação (geradas,
+#            reaproveitadas, erros).
+# ===================================================================
+def exportar_figuras(tarefas: list, pasta_saida=".", workers=None, mostrar=None):
+    os.makedirs(pasta_saida, exist_ok=True)
+    manifesto = ler_manifesto(pasta_saida)
+    if mostrar is None:
+        mostrar = not modo_lote()
+
+    pendentes, reaproveitadas, hashes = [], [], {}
+    for tarefa in tarefas:
+        arquivo = tarefa['arquivo']
+        hashes[arquivo] = hash_tarefa(tarefa)
+        anterior = manifesto['figuras'].get(arquivo, {})
+        if anterior.get('hash') == hashes[arquivo] and os.path.exists(os.path.join(pasta_saida, arquivo)):
+            reaproveitadas.append(arquivo)
+        else:
+            pendentes.append(tarefa)
+
+    caminhos = [os.path.join(pasta_saida, t['arquivo']) for t in pendentes]
+    workers = 1 if mostrar else min(numero_workers(workers), len(pendentes))
+    with etapa("exportar_figuras", figuras=len(tarefas), pendentes=len(pendentes), workers=workers):
+        if workers <= 1:
+            resultados = []
+            for tarefa, caminho in zip(pendentes, caminhos):
+                try:
+                    resultados.append(renderizar_tarefa(tarefa, caminho, mostrar=mostrar))
+                except Exception as e:
+                    resultados.append(e)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker) as executor:
+                futuros = [executor.submit(renderizar_tarefa, t, c) for t, c in zip(pendentes, caminhos)]
+                resultados = []
+                for futuro in futuros:
+                    try:
+                        resultados.append(futuro.result())
+                    except Exception as e:
+                        resultados.append(e)
+
+    geradas, erros = [], []
+    agora = time.strftime("%Y-%m-%dT%H:%M:%S")
+    for tarefa, resultado in zip(pendentes, resultados):
+        arquivo = tarefa['arquivo']
+        if isinstance(resultado, Exception):
+            print(f"Erro ao gerar {arquivo}: {resultado}")
+            manifesto['figuras'].pop(arquivo, None)
+            erros.append(arquivo)
+            continue
+        manifesto['figuras'][arquivo] = {
+            'hash': hashes[arquivo],
+            'funcao': tarefa['funcao'].__qualname__,
+            'gerada_em': agora,
+            'segundos': round(resultado, 3),
+        }
+        geradas.append(arquivo)
+
+    manifesto['ultima_exportacao'] = {'data': agora, 'geradas': geradas,
+                                      'reaproveitadas': reaproveitadas, 'erros': erros}
+    _gravar_manifesto(pasta_saida, manifesto)
+    if reaproveitadas:
+        print(f"Figuras sem mudanças (não redesenhadas): {', '.join(reaproveitadas)}")
+    return manifesto['ultima_exportacao']
@@ -0,0 +1,358 @@
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+from cache_gexf import construir_csr
+
+# ===================================================================
+# Grafo compacto de autores
+# O nx.Graph guarda cada id Scopus como texto e um dicionário por nó e
+# por aresta. Na rede geral (todos os anos) isso ocupa muito mais do que
+# os dados. O grafo compacto é um dicionário de arrays, no formato do
+# snapshot do cache_gexf e do armazenamento temporal:
+#   - ids: id Scopus de cada autor como int64 (o autor passa a ser o
+#     inteiro i) e ordem_ids, a permutação que ordena os ids (busca
+#     binária de um autor pelo id);
+#   - adjacência CSR (indptr/indices, int32) e, para cada posição da CSR,
+#     a aresta correspondente (aresta); lista de arestas origem/destino;
+#   - colunas tipadas dos nós: h_index int32 (-1 = ausente),
+#     is_permanent e sua presença como máscaras de bits (np.packbits) e
+#     complete_name ("" = ausente);
+#   - colunas das arestas: num_paper e citation_num int32 (-1 = ausente)
+#     e mascara_anos int64 (0 = ausente), quando vier do armazenamento
+#     temporal;
+#   - grafo: atributos do grafo (ex.: anos).
+# As funções abaixo cobrem o que os scripts usam (grau, densidade,
+# vizinhos, sub-grafo, rede ego, clustering). Para o resto há
+# para_networkx / de_networkx; matriz() devolve a CSR do SciPy sobre os
+# mesmos arrays, sem cópia. A conversão de/para nx.Graph copia os dados
+# (o NetworkX não tem como apontar para arrays externos). Na conversão,
+# o label dos nós é o próprio id e o atributo id das arestas do GEXF
+# (um contador por arquivo) não é guardado.
+# ===================================================================
+
+ATRIBUTOS_NO = ("complete_name", "h_index", "is_permanent")
+ATRIBUTOS_ARESTA = ("num_paper", "citation_num", "mascara_anos")
+AUSENTE = -1
+
+def eh_compacto(G):
+    return isinstance(G, dict) and 'indptr' in G
+
+def num_nos(g: dict):
+    return len(g['ids'])
+
+def num_arestas(g: dict):
+    return len(g['origem'])
+
+def _bits(mascara: np.ndarray, n: int):
+    return np.unpackbits(mascara, count=n).astype(bool)
+
+def coluna_no(g: dict, nome: str):
+    # Coluna de um atributo dos nós; as máscaras de bits voltam como bool
+    if nome in ("is_permanent", "is_permanent_presente"):
+        return _bits(g[nome], num_nos(g))
+    return g[nome]
+
+# ===================================================================
+# FUNÇÃO: internar_ids
+# Descrição: Converte ids de autores (texto ou inteiros) para int64.
+#            Levanta ValueError se algum id não for um inteiro escrito na
+#            forma canônica (ex.: "0123"), que não voltaria igual.
+# ===================================================================
+def internar_ids(nos):
+    nos = list(nos)
+    try:
+        ids = np.array([int(n) for n in nos], dtype=np.int64)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("Os ids dos autores não são inteiros; use o nx.Graph.")
+    if any(str(i) != str(n) for i, n in zip(ids.tolist(), nos)):
+        raise ValueError("Os ids dos autores não são inteiros na forma canônica; use o nx.Graph.")
+    if len(np.unique(ids)) != len(ids):
+        raise ValueError("Ids de autores repetidos.")
+    return ids
+
+# ===================================================================
+# FUNÇÃO: montar_grafo
+# Descrição: Monta o grafo compacto a partir dos ids (int64), das arestas
+#            (índices dos nós) e das colunas. Colunas omitidas ficam
+#            ausentes; is_permanent vem como array bool e, se houver,
+#            is_permanent_presente (por padrão, presente em todos).
+# ===================================================================
+def montar_grafo(ids: np.ndarray, origem: np.ndarray, destino: np.ndarray, colunas_nos=None,
+                 colunas_arestas=None, atributos=None):
+    ids = np.asarray(ids, dtype=np.int64)
+    n = len(ids)
+    origem = np.asarray(origem, dtype=np.int32)
+    destino = np.asarray(destino, dtype=np.int32)
+    colunas_nos = colunas_nos or {}
+    colunas_arestas = colunas_arestas or {}
+
+    indptr, indices, aresta = construir_csr(origem, destino, n)
+    g = {
+        'ids': ids,
+        'ordem_ids': np.argsort(ids, kind='stable').astype(np.int32),
+        'indptr': indptr.astype(np.int32),
+        'indices': indices,
+        'aresta': aresta.astype(np.int32),
+        'origem': origem,
+        'destino': destino,
+        'grafo': dict(atributos or {}),
+    }
+
+    nomes = colunas_nos.get('complete_name')
+    g['complete_name'] = np.asarray(nomes, dtype=str) if nomes is not None else np.full(n, "", dtype=str)
+    h_index = colunas_nos.get('h_index')
+    g['h_index'] = np.asarray(h_index, dtype=np.int32) if h_index is not None else np.full(n, AUSENTE, dtype=np.int32)
+    permanente = colunas_nos.get('is_permanent')
+    if permanente is None:
+        permanente = presente = np.zeros(n, dtype=bool)
+    else:
+        presente = colunas_nos.get('is_permanent_presente', np.ones(n, dtype=bool))
+    g['is_permanent'] = np.packbits(np.asarray(permanente, dtype=bool))
+    g['is_permanent_presente'] = np.packbits(np.asarray(presente, dtype=bool))
+
+    for chave in ("num_paper", "citation_num"):
+        coluna = colunas_arestas.get(chave)
+        g[chave] = (np.asarray(coluna, dtype=np.int32) if coluna is not None
+                    else np.full(len(origem), AUSENTE, dtype=np.int32))
+    if colunas_arestas.get('mascara_anos') is not None:
+        g['mascara_anos'] = np.asarray(colunas_arestas['mascara_anos'], dtype=np.int64)
+    return g
+
+# ===================================================================
+# FUNÇÃO: memoria
+# Descrição: Bytes ocupados pelos arrays do grafo compacto.
+# ===================================================================
+def memoria(g: dict):
+    return sum(v.nbytes for v in g.values() if isinstance(v, np.ndarray))
+
+def nos(g: dict):
+    # Ids como texto, no formato dos nós do nx.Graph
+    return [str(i) for i in g['ids'].tolist()]
+
+# ===================================================================
+# FUNÇÃO: indices_de
+# Descrição: Posições dos autores `autores` (ids em texto ou inteiros);
+#            -1 para os que não estão no grafo.
+# ===================================================================
+def indices_de(g: dict, autores):
+    procurados = []
+    for autor in autores:
+        try:
+            # "0123" não é o autor 123 (não seria o mesmo nó no nx.Graph)
+            procurados.append(int(autor) if str(int(autor)) == str(autor) else -1)
+        except (TypeError, ValueError, OverflowError):
+            procurados.append(-1)
+    procurados = np.asarray(procurados, dtype=np.int64)
+    ordenados = g['ids'][g['ordem_ids']]
+    if len(ordenados) == 0:
+        return np.full(len(procurados), -1, dtype=np.int64)
+    posicao = np.minimum(np.searchsorted(ordenados, procurados), len(ordenados) - 1)
+    achados = ordenados[posicao] == procurados
+    return np.where(achados, g['ordem_ids'][posicao], -1).astype(np.int64)
+
+def indice_de(g: dict, autor):
+    return int(indices_de(g, [autor])[0])
+
+def contem(g: dict, autor):
+    return indice_de(g, autor) >= 0
+
+def _indice_obrigatorio(g: dict, autor):
+    i = indice_de(g, autor)
+    if i < 0:
+        raise KeyError(f"Autor {autor} não está no grafo.")
+    return i
+
+# ===================================================================
+# FUNÇÃO: matriz
+# Descrição: Matriz de adjacência CSR (SciPy) sobre os arrays do grafo,
+#            sem cópia. Com `peso` (num_paper ou citation_num), os valores
+#            vêm da coluna da aresta; ausentes valem 1, como no NetworkX.
+# ===================================================================
+def matriz(g: dict, peso=None):
+    n = num_nos(g)
+    if peso is None:
+        dados = np.ones(len(g['indices']), dtype=np.int8)
+    else:
+        coluna = g[peso][g['aresta']]
+        dados = np.where(coluna >= 0, coluna, 1).astype(np.float64)
+    return sp.csr_array((dados, g['indices'], g['indptr']), shape=(n, n))
+
+# ===================================================================
+# FUNÇÃO: grau
+# Descrição: Grau de todos os autores (array) ou de um autor; os laços
+#            contam 2, como em G.degree.
+# ===================================================================
+def grau(g: dict, autor=None):
+    graus = np.diff(g['indptr']).astype(np.int64)
+    lacos = g['origem'][g['origem'] == g['destino']]
+    np.add.at(graus, lacos, 1)
+    if autor is None:
+        return graus
+    return int(graus[_indice_obrigatorio(g, autor)])
+
+# ===================================================================
+# FUNÇÃO: densidade
+# Descrição: Mesma fórmula de nx.density (laços contam como arestas).
+# ===================================================================
+def densidade(g: dict):
+    n = num_nos(g)
+    if n <= 1:
+        return 0
+    return 2 * num_arestas(g) / (n * (n - 1))
+
+# ===================================================================
+# FUNÇÃO: vizinhos
+# Descrição: Ids (int64) dos vizinhos do autor, na ordem da CSR.
+# ===================================================================
+def vizinhos(g: dict, autor):
+    i = _indice_obrigatorio(g, autor)
+    return g['ids'][g['indices'][g['indptr'][i]:g['indptr'][i + 1]]]
+
+# ===================================================================
+# FUNÇÃO: subgrafo
+# Descrição: Sub-grafo induzido pelos autores selecionados (máscara bool
+#            sobre os nós ou lista de ids), com nós e arestas na ordem do
+#            grafo original e as colunas filtradas.
+# ===================================================================
+def subgrafo(g: dict, selecionados):
+    n = num_nos(g)
+    selecionados = np.asarray(selecionados)
+    if selecionados.dtype == bool:
+        mascara = selecionados
+    else:
+        mascara = np.zeros(n, dtype=bool)
+        indices = indices_de(g, selecionados.tolist())
+        mascara[indices[indices >= 0]] = True
+    mantidos = np.flatnonzero(mascara)
+    local = np.full(n, -1, dtype=np.int64)
+    local[mantidos] = np.arange(len(mantidos))
+    arestas = np.flatnonzero(mascara[g['origem']] & mascara[g['destino']])
+
+    colunas_nos = {
+        'complete_name': g['complete_name'][mantidos],
+        'h_index': g['h_index'][mantidos],
+        'is_permanent': _bits(g['is_permanent'], n)[mantidos],
+        'is_permanent_presente': _bits(g['is_permanent_presente'], n)[mantidos],
+    }
+    colunas_arestas = {chave: g[chave][arestas] for chave in ATRIBUTOS_ARESTA if chave in g}
+    return montar_grafo(g['ids'][mantidos], local[g['origem'][arestas]], local[g['destino'][arestas]],
+                        colunas_nos, colunas_arestas, g['grafo'])
+
+# ===================================================================
+# FUNÇÃO: grafo_ego
+# Descrição: Rede ego do autor (BFS sobre a CSR até `raio` saltos), como
+#            nx.ego_graph, com os nós na ordem do grafo original.
+# ===================================================================
+def grafo_ego(g: dict, autor, raio=1):
+    indptr, indices = g['indptr'], g['indices']
+    alcancados = np.zeros(num_nos(g), dtype=bool)
+    fronteira = np.array([_indice_obrigatorio(g, autor)])
+    alcancados[fronteira] = True
+    for _ in range(raio):
+        if len(fronteira) == 0:
+            break
+        proximos = np.concatenate([indices[indptr[i]:indptr[i + 1]] for i in fronteira.tolist()])
+        proximos = np.unique(proximos[~alcancados[proximos]])
+        alcancados[proximos] = True
+        fronteira = proximos
+    return subgrafo(g, alcancados)
+
+# ===================================================================
+# FUNÇÃO: clustering
+# Descrição: Coeficiente de clustering de todos os autores (array) ou de
+#            um autor, como nx.clustering: laços são ignorados.
+# ===================================================================
+def clustering(g: dict, autor=None):
+    A = matriz(g).astype(np.int64)
+    A.setdiag(0)
+    A.eliminate_zeros()
+    graus = np.diff(A.indptr)
+    if autor is None:
+        triangulos = np.asarray((A @ A).multiply(A).sum(axis=1)).ravel() // 2
+        pares = graus * (graus - 1)
+        return np.divide(2 * triangulos, pares, out=np.zeros(len(graus)), where=pares > 0)
+    i = _indice_obrigatorio(g, autor)
+    linha = A[[i]]
+    pares = graus[i] * (graus[i] - 1)
+    if pares == 0:
+        return 0
+    triangulos = (linha @ A).multiply(linha).sum() // 2
+    return float(2 * triangulos / pares)
+
+# ===================================================================
+# FUNÇÃO: de_networkx
+# Descrição: Converte um nx.Graph de autores (ids numéricos) para o grafo
+#            compacto. Atributos fora de ATRIBUTOS_NO / ATRIBUTOS_ARESTA
+#            não são guardados.
+# ===================================================================
+def de_networkx(G: nx.Graph):
+    lista = list(G)
+    ids = internar_ids(lista)
+    indice = {n: i for i, n in enumerate(lista)}
+    atributos = [G.nodes[n] for n in lista]
+    colunas_nos = {
+        'complete_name': ["" if a.get('complete_name') is None else str(a['complete_name']) for a in atributos],
+        'h_index': [AUSENTE if a.get('h_index') is None else a['h_index'] for a in atributos],
+        'is_permanent': [bool(a.get('is_permanent', False)) for a in atributos],
+        'is_permanent_presente': ['is_permanent' in a for a in atributos],
+    }
+
+    origem, destino, dados = [], [], []
+    for u, v, d in G.edges(data=True):
+        origem.append(indice[u])
+        destino.append(indice[v])
+        dados.append(d)
+    colunas_arestas = {chave: [AUSENTE if d.get(chave) is None else d[chave] for d in dados]
+                       for chave in ("num_paper", "citation_num")}
+    if dados and all('mascara_anos' in d for d in dados):
+        colunas_arestas['mascara_anos'] = [d['mascara_anos'] for d in dados]
+    return montar_grafo(ids, origem, destino, colunas_nos, colunas_arestas, G.graph)
+
+# ===================================================================
+# FUNÇÃO: para_networkx
+# Descrição: nx.Graph equivalente ao grafo compacto (nós como texto, com
+#            label igual ao id, e só os atributos presentes).
+# ===================================================================
+def para_networkx(g: dict):
+    n = num_nos(g)
+    lista = nos(g)
+    nomes = g['complete_name'].tolist()
+    h_index = g['h_index'].tolist()
+    permanente = _bits(g['is_permanent'], n).tolist()
+    presente = _bits(g['is_permanent_presente'], n).tolist()
+
+    G = nx.Graph(**g['grafo'])
+    for i, no in enumerate(lista):
+        atributos = {'label': no}
+        if nomes[i]:
+            atributos['complete_name'] = nomes[i]
+        if h_index[i] != AUSENTE:
+            atributos['h_index'] = h_index[i]
+        if presente[i]:
+            atributos['is_permanent'] = permanente[i]
+        G.add_node(no, **atributos)
+
+    colunas = {chave: g[chave].tolist() for chave in ATRIBUTOS_ARESTA if chave in g}
+    arestas = []
+    for k, (u, v) in enumerate(zip(g['origem'].tolist(), g['destino'].tolist())):
+        atributos = {chave: coluna[k] for chave, coluna in colunas.items()
+                     if coluna[k] != AUSENTE and not (chave == 'mascara_anos' and coluna[k] == 0)}
+        arestas.append((lista[u], lista[v], atributos))
+    G.add_edges_from(arestas)
+    return G
+
+# ===================================================================
+# FUNÇÃO: de_snapshot
+# Descrição: Grafo compacto de um snapshot do cache_gexf (um arquivo).
+# ===================================================================
+def de_snapshot(snapshot: dict):
+    colunas_nos = {
+        'complete_name': np.where(snapshot['no_complete_name_presente'], snapshot['no_complete_name'], ""),
+        'h_index': np.where(snapshot['no_h_index_presente'], snapshot['no_h_index'], AUSENTE),
+        'is_permanent': np.asarray(snapshot['no_is_permanent']),
+        'is_permanent_presente': np.asarray(snapshot['no_is_permanent_presente']),
+    }
+    colunas_arestas = {chave: np.where(snapshot[f'aresta_{chave}_presente'], snapshot[f'aresta_{chave}'], AUSENTE)
+                       for chave in ("num_paper", "citation_num")}
+    return montar_grafo(internar_ids(snapshot['ids'].tolist()), snapshot['origem'], snapshot['destino'],
+                        colunas_nos, colunas_arestas, {'mode': 'static', 'edge_default': {}, 'node_default': {}})
@@ -0,0 +1,274 @@
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ===================================================================
+# Instrumentação das etapas dos pipelines
+# Desligada por padrão. Com a variável REDES_INSTRUMENTAR definida, cada
+# etapa envolvida por `etapa(...)` (e cada arquivo processado por
+# paralelo.mapear_arquivos) gera um registro com tempo de relógio, tempo
+# de CPU, RSS máximo do processo, tamanho do grafo (quando informado) e,
+# no modo "memoria", o pico de memória alocada (tracemalloc). Os
+# registros são gravados como linhas JSON em REDES_TRACE e resumidos em
+# uma tabela no final do pipeline.
+#
+#   REDES_INSTRUMENTAR=1        tempo, CPU e RSS
+#   REDES_INSTRUMENTAR=memoria  também o pico do tracemalloc (mais lento)
+#   REDES_TRACE=arquivo.jsonl   destino do trace (padrão instrumentacao.jsonl)
+#   REDES_PERFIL=nome_da_etapa  executa essa etapa sob cProfile (ou
+#                               pyinstrument, com REDES_PERFILADOR=pyinstrument);
+#                               funciona também sem REDES_INSTRUMENTAR
+# ===================================================================
+
+VARIAVEL_INSTRUMENTAR = "REDES_INSTRUMENTAR"
+VARIAVEL_TRACE = "REDES_TRACE"
+VARIAVEL_PERFIL = "REDES_PERFIL"
+VARIAVEL_PERFILADOR = "REDES_PERFILADOR"
+ARQUIVO_TRACE = "instrumentacao.jsonl"
+
+_config = {}
+_pilha = []        # Etapas abertas (a última é a atual)
+_registros = []    # Etapas concluídas nesta execução
+_execucao = f"{os.getpid()}-{int(time.time())}"
+
+# ===================================================================
+# FUNÇÃO: configurar
+# Descrição: Define a configuração pelo código (ex.: linha de comando),
+#            sobrepondo as variáveis de ambiente. None mantém o valor da
+#            variável correspondente.
+# ===================================================================
+def configurar(ativo=None, memoria=None, arquivo=None, perfil=None, perfilador=None):
+    valor = os.environ.get(VARIAVEL_INSTRUMENTAR, "").lower()
+    ligado = valor not in ("", "0", "false", "nao", "não")
+    _config['ativo'] = ligado if ativo is None else bool(ativo)
+    _config['memoria'] = (valor == "memoria") if memoria is None else bool(memoria)
+    _config['arquivo'] = arquivo or os.environ.get(VARIAVEL_TRACE, ARQUIVO_TRACE)
+    _config['perfil'] = perfil if perfil is not None else os.environ.get(VARIAVEL_PERFIL)
+    _config['perfilador'] = perfilador or os.environ.get(VARIAVEL_PERFILADOR, "cprofile")
+
+def ativa():
+    if not _config:
+        configurar()
+    return _config['ativo']
+
+def _rss_max_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KiB, macOS em bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+# ===================================================================
+# FUNÇÃO: tamanho_grafo
+# Descrição: Número de nós e arestas de um grafo NetworkX, de um grafo
+#            compacto (grafo_compacto.py) ou de um dicionário de métricas
+#            (num_nos / num_arestas).
+# ===================================================================
+def tamanho_grafo(objeto):
+    if hasattr(objeto, "number_of_nodes"):
+        return {'nos': objeto.number_of_nodes(), 'arestas': objeto.number_of_edges()}
+    if isinstance(objeto, dict) and 'indptr' in objeto:
+        return {'nos': len(objeto['ids']), 'arestas': len(objeto['origem'])}
+    if isinstance(objeto, dict) and 'num_nos' in objeto:
+        return {'nos': objeto['num_nos'], 'arestas': objeto.get('num_arestas')}
+    return {}
+
+def _gravar(registro: dict):
+    try:
+        with open(_config['arquivo'], "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+    except OSError as e:
+        print(f"Erro ao gravar o trace em {_config['arquivo']}: {e}")
+
+# ===================================================================
+# FUNÇÃO: registrar
+# Descrição: Acrescenta um registro pronto (ex.: medido em um worker) ao
+#            trace, como filho da etapa atual.
+# ===================================================================
+def registrar(registro: dict):
+    registro = dict(registro, execucao=_execucao, nivel=len(_pilha),
+                    pai=_pilha[-1]['etapa'] if _pilha else None)
+    _registros.append(registro)
+    _gravar(registro)
+
+@contextlib.contextmanager
+def _perfilar(nome: str):
+    if _config.get('perfil') != nome:
+        yield
+        return
+
+    if _config['perfilador'] == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("pyinstrument não instalado; usando cProfile.")
+        else:
+            perfilador = Profiler()
+            perfilador.start()
+            try:
+                yield
+            finally:
+                perfilador.stop()
+                with open(f"perfil_{nome}.html", "w", encoding="utf-8") as f:
+                    f.write(perfilador.output_html())
+                print(f"Perfil da etapa {nome} salvo em perfil_{nome}.html")
+            return
+
+    import cProfile
+    import pstats
+    perfilador = cProfile.Profile()
+    perfilador.enable()
+    try:
+        yield
+    finally:
+        perfilador.disable()
+        perfilador.dump_stats(f"perfil_{nome}.prof")
+        pstats.Stats(perfilador).sort_stats("cumulative").print_stats(15)
+        print(f"Perfil da etapa {nome} salvo em perfil_{nome}.prof")
+
+# ===================================================================
+# FUNÇÃO: etapa
+# Descrição: Context manager que mede o bloco. Retorna um dicionário em
+#            que o bloco pode acrescentar informações (ex.: tamanho do
+#            grafo). Com a instrumentação desligada não mede nada (mas a
+#            etapa de REDES_PERFIL ainda é perfilada).
+#
+#   with etapa("leitura", arquivo=arquivo) as info:
+#       G = ler_gexf(arquivo)
+#       info.update(tamanho_grafo(G))
+# ===================================================================
+@contextlib.contextmanager
+def etapa(nome: str, **info):
+    if not ativa():
+        with _perfilar(nome):
+            yield info
+        return
+
+    quadro = {'etapa': nome, 'pico': 0}
+    if _config['memoria']:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            quadro['iniciou_tracemalloc'] = True
+        elif _pilha:
+            _pilha[-1]['pico'] = max(_pilha[-1]['pico'], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+    _pilha.append(quadro)
+
+    erro = None
+    inicio = time.time()
+    inicio_relogio = time.perf_counter()
+    inicio_cpu = time.process_time()
+    try:
+        with _perfilar(nome):
+            yield info
+    except BaseException as e:
+        erro = repr(e)
+        raise
+    finally:
+        registro = {
+            'etapa': nome,
+            'inicio': inicio,
+            'tempo_s': time.perf_counter() - inicio_relogio,
+            'cpu_s': time.process_time() - inicio_cpu,
+            'rss_max_mb': _rss_max_mb(),
+            'pico_memoria_mb': None,
+            **info,
+        }
+        if erro:
+            registro['erro'] = erro
+
+        _pilha.pop()
+        if _config['memoria']:
+            pico = max(quadro['pico'], tracemalloc.get_traced_memory()[1])
+            registro['pico_memoria_mb'] = pico / (1024 * 1024)
+            if quadro.get('iniciou_tracemalloc'):
+                tracemalloc.stop()
+            else:
+                if _pilha:
+                    _pilha[-1]['pico'] = max(_pilha[-1]['pico'], pico)
+                tracemalloc.reset_peak()
+        registrar(registro)
+
+# ===================================================================
+# FUNÇÃO: medir_chamada
+# Descrição: Executa funcao(argumento) medindo tempo, CPU e RSS e retorna
+#            (resultado, registro). Usada nos workers de mapear_arquivos:
+#            o registro volta ao processo principal, que o registra.
+# ===================================================================
+def medir_chamada(nome: str, funcao, argumento):
+    inicio = time.time()
+    inicio_relogio = time.perf_counter()
+    inicio_cpu = time.process_time()
+    resultado = funcao(argumento)
+    registro = {
+        'etapa': nome,
+        'inicio': inicio,
+        'tempo_s': time.perf_counter() - inicio_relogio,
+        'cpu_s': time.process_time() - inicio_cpu,
+        'rss_max_mb': _rss_max_mb(),
+        'pico_memoria_mb': None,
+        'arquivo': argumento,
+        'processo': os.getpid(),
+        **tamanho_grafo(resultado),
+    }
+    return resultado, registro
+
+# ===================================================================
+# FUNÇÃO: resumo
+# Descrição: Tabela com as etapas registradas (por padrão, todas desta
+#            execução), agrupadas por nome: chamadas, tempo total e
+#            máximo, CPU, RSS, pico e erros.
+# ===================================================================
+def resumo(registros=None):
+    grupos = {}
+    for r in _registros if registros is None else registros:
+        g = grupos.setdefault(r['etapa'], {'chamadas': 0, 'tempo': 0.0, 'maximo': 0.0,
+                                           'cpu': 0.0, 'rss': 0.0, 'pico': None, 'erros': 0})
+        g['chamadas'] += 1
+        g['erros'] += 'erro' in r
+        g['tempo'] += r['tempo_s']
+        g['maximo'] = max(g['maximo'], r['tempo_s'])
+        g['cpu'] += r['cpu_s']
+        g['rss'] = max(g['rss'], r['rss_max_mb'] or 0.0)
+        if r['pico_memoria_mb'] is not None:
+            g['pico'] = max(g['pico'] or 0.0, r['pico_memoria_mb'])
+
+    linhas = [f"{'Etapa':<32} {'Chamadas':>8} {'Total (s)':>10} {'Máx (s)':>9} "
+              f"{'CPU (s)':>9} {'RSS (MB)':>9} {'Pico (MB)':>10} {'Erros':>6}"]
+    for nome, g in grupos.items():
+        pico = f"{g['pico']:10.1f}" if g['pico'] is not None else f"{'-':>10}"
+        linhas.append(f"{nome:<32} {g['chamadas']:>8} {g['tempo']:10.3f} {g['maximo']:9.3f} "
+                      f"{g['cpu']:9.3f} {g['rss']:9.1f} {pico} {g['erros']:>6}")
+    return "\n".join(linhas)
+
+# ===================================================================
+# FUNÇÃO: instrumentar_pipeline
+# Descrição: Decorador para os mains: mede a função inteira como uma
+#            etapa e, ao final, imprime o resumo e o destino do trace.
+# ===================================================================
+def instrumentar_pipeline(nome: str):
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            if not ativa():
+                return funcao(*args, **kwargs)
+            inicio = len(_registros)
+            try:
+                with etapa(nome):
+                    return funcao(*args, **kwargs)
+            finally:
+                if len(_registros) > inicio:
+                    print("\nInstrumentação das etapas:")
+                    print(resumo(_registros[inicio:]))
+                    print(f"Trace salvo em {_config['arquivo']}")
+        return envoltorio
+    return decorador
@@ -0,0 +1,284 @@
+import os
+import numpy as np
+import pandas as pd
+from instrumentacao import etapa, instrumentar_pipeline
+from rede_temporal import construir_rede_temporal
+
+# ===================================================================
+# Métricas de janelas deslizantes de anos
+# Uma janela de `largura` anos desliza sobre a série anual do
+# armazenamento temporal (rede_temporal.py): a cada passo entram as
+# arestas do ano seguinte e saem as do ano mais antigo, sem reconstruir
+# a rede da janela. O estado guarda, para cada par de autores, em
+# quantos anos da janela ele colaborou (multiplicidade); a aresta existe
+# na janela enquanto a multiplicidade for positiva. Só as arestas cuja
+# multiplicidade passa de 0 para 1 (ou de 1 para 0) alteram graus,
+# número de arestas e contagem de triângulos, de modo que o custo de um
+# passo é proporcional às arestas dos dois anos envolvidos. O grau máximo
+# também é mantido a cada passo, por um histograma de graus (quantos
+# autores têm cada grau), sem percorrer todos os autores.
+#
+# Componentes conexas não suportam remoção de arestas em um union-find
+# comum. Como a sequência de passos é conhecida, cada aresta fica ativa
+# em intervalos de passos; os intervalos são inseridos em uma árvore de
+# segmentos sobre os passos e percorridos com um union-find com
+# desfazer (união por tamanho, sem compressão de caminho). Cada
+# intervalo entra em O(log T) nós da árvore: custo total
+# O(E log T log n) para todos os T passos.
+#
+# Os resultados são os mesmos de grafo_janela + NetworkX (laço conta 2
+# no grau e 1 aresta; triângulos ignoram laços, como nx.triangles).
+# ===================================================================
+
+LARGURAS = (3, 4)
+
+# ===================================================================
+# FUNÇÃO: preparar_anos
+# Descrição: Numera os pares distintos de autores de toda a série e
+#            separa, para cada ano, os pares (sem repetição) e os autores
+#            presentes. Retorna (anos, pares_por_ano, autores_por_ano,
+#            origem_par, destino_par).
+# ===================================================================
+def preparar_anos(rede: dict):
+    num_autores = len(rede['ids'])
+    chaves = rede['aresta_origem'] * num_autores + rede['aresta_destino']
+    unicas, par = np.unique(chaves, return_inverse=True)
+    par = par.ravel()
+
+    pares_por_ano = []
+    autores_por_ano = []
+    for k in range(len(rede['anos'])):
+        a0, a1 = rede['inicio_arestas'][k], rede['inicio_arestas'][k + 1]
+        n0, n1 = rede['inicio_nos'][k], rede['inicio_nos'][k + 1]
+        pares_por_ano.append(np.unique(par[a0:a1]))
+        autores_por_ano.append(np.unique(rede['no_autor'][n0:n1]))
+    return rede['anos'], pares_por_ano, autores_por_ano, unicas // num_autores, unicas % num_autores
+
+# ===================================================================
+# FUNÇÃO: iniciar_estado
+# Descrição: Estado vazio da janela: multiplicidade de cada par, presença
+#            de cada autor (anos da janela em que aparece), graus e o
+#            histograma de graus, vizinhanças (para os triângulos) e os
+#            totais.
+# ===================================================================
+def iniciar_estado(num_autores: int, num_pares: int):
+    # Com laços (contam 2) o grau chega a num_autores + 1
+    histograma = np.zeros(num_autores + 2, dtype=np.int64)
+    histograma[0] = num_autores
+    return {
+        'multiplicidade': np.zeros(num_pares, dtype=np.int32),
+        'presenca': np.zeros(num_autores, dtype=np.int32),
+        'grau': np.zeros(num_autores, dtype=np.int64),
+        'histograma_graus': histograma,
+        'grau_maximo': 0,
+        'vizinhos': [set() for _ in range(num_autores)],
+        'num_nos': 0,
+        'num_arestas': 0,
+        'triangulos': 0,
+    }
+
+# ===================================================================
+# FUNÇÃO: atualizar_graus
+# Descrição: Aplica a variação de grau das pontas u e v (laço conta 2) e
+#            mantém o histograma de graus e o grau máximo. O máximo só
+#            desce nas remoções, e cada descida é paga por uma subida
+#            anterior.
+# ===================================================================
+def atualizar_graus(estado: dict, u: np.ndarray, v: np.ndarray, sinal: int):
+    tocados, vezes = np.unique(np.concatenate([u, v]), return_counts=True)
+    if not len(tocados):
+        return
+    grau, histograma = estado['grau'], estado['histograma_graus']
+    np.subtract.at(histograma, grau[tocados], 1)
+    grau[tocados] += sinal * vezes
+    np.add.at(histograma, grau[tocados], 1)
+    if sinal > 0:
+        estado['grau_maximo'] = max(estado['grau_maximo'], int(grau[tocados].max()))
+    else:
+        maximo = estado['grau_maximo']
+        while maximo > 0 and histograma[maximo] == 0:
+            maximo -= 1
+        estado['grau_maximo'] = maximo
+
+# ===================================================================
+# FUNÇÃO: aplicar_ano
+# Descrição: Soma (sinal=+1) ou retira (sinal=-1) um ano da janela.
+#            Atualiza multiplicidades e presenças de forma vetorizada e
+#            devolve os pares que entraram ou saíram da janela, os únicos
+#            que alteram graus, arestas e triângulos.
+# ===================================================================
+def aplicar_ano(estado: dict, pares: np.ndarray, autores: np.ndarray, origem: np.ndarray,
+                destino: np.ndarray, sinal: int):
+    estado['presenca'][autores] += sinal
+    limite = 0 if sinal > 0 else 1
+    estado['num_nos'] += sinal * int(np.count_nonzero(estado['presenca'][autores] == 1 - limite))
+
+    estado['multiplicidade'][pares] += sinal
+    mudaram = pares[estado['multiplicidade'][pares] == 1 - limite]
+    u, v = origem[mudaram], destino[mudaram]
+    atualizar_graus(estado, u, v, sinal)
+    estado['num_arestas'] += sinal * len(mudaram)
+
+    # Triângulos: uma aresta (u, v) fecha |N(u) ∩ N(v)| triângulos
+    vizinhos = estado['vizinhos']
+    variacao = 0
+    for a, b in zip(u.tolist(), v.tolist()):
+        if a == b:
+            continue
+        if sinal > 0:
+            variacao += len(vizinhos[a] & vizinhos[b])
+            vizinhos[a].add(b)
+            vizinhos[b].add(a)
+        else:
+            vizinhos[a].discard(b)
+            vizinhos[b].discard(a)
+            variacao -= len(vizinhos[a] & vizinhos[b])
+    estado['triangulos'] += variacao
+    return mudaram
+
+def resumo_estado(estado: dict):
+    n, m = estado['num_nos'], estado['num_arestas']
+    return {
+        'num_nos': n,
+        'num_arestas': m,
+        'densidade': 2 * m / (n * (n - 1)) if n > 1 else 0,
+        'grau_medio': 2 * m / n if n else 0.0,
+        'grau_maximo': estado['grau_maximo'],
+        'triangulos': estado['triangulos'],
+    }
+
+# ===================================================================
+# FUNÇÃO: componentes_por_passo
+# Descrição: Número de uniões bem-sucedidas e tamanho da maior componente
+#            em cada passo, a partir dos intervalos [inicio, fim] de passos
+#            em que cada par está ativo (árvore de segmentos + union-find
+#            com desfazer).
+# ===================================================================
+def componentes_por_passo(intervalos: list, num_passos: int, num_autores: int,
+                          origem: np.ndarray, destino: np.ndarray):
+    arvore = [[] for _ in range(4 * max(num_passos, 1))]
+
+    def inserir(no, esquerda, direita, inicio, fim, par):
+        if fim < esquerda or direita < inicio:
+            return
+        if inicio <= esquerda and direita <= fim:
+            arvore[no].append(par)
+            return
+        meio = (esquerda + direita) // 2
+        inserir(2 * no, esquerda, meio, inicio, fim, par)
+        inserir(2 * no + 1, meio + 1, direita, inicio, fim, par)
+
+    for par, inicio, fim in intervalos:
+        inserir(1, 0, num_passos - 1, inicio, fim, par)
+
+    origem, destino = origem.tolist(), destino.tolist()
+    pai = list(range(num_autores))
+    tamanho = [1] * num_autores
+    historico = []   # (raiz absorvida, raiz que absorveu, maior componente anterior)
+    maior = [1]
+    unioes = [0] * num_passos
+    maiores = [0] * num_passos
+
+    def raiz(x):
+        while pai[x] != x:
+            x = pai[x]
+        return x
+
+    def visitar(no, esquerda, direita):
+        marca = len(historico)
+        for par in arvore[no]:
+            a, b = raiz(origem[par]), raiz(destino[par])
+            if a == b:
+                continue
+            if tamanho[a] > tamanho[b]:
+                a, b = b, a
+            historico.append((a, b, maior[0]))
+            pai[a] = b
+            tamanho[b] += tamanho[a]
+            maior[0] = max(maior[0], tamanho[b])
+        if esquerda == direita:
+            unioes[esquerda] = len(historico)
+            maiores[esquerda] = maior[0]
+        else:
+            meio = (esquerda + direita) // 2
+            visitar(2 * no, esquerda, meio)
+            visitar(2 * no + 1, meio + 1, direita)
+        # Desfaz as uniões deste nó da árvore
+        while len(historico) > marca:
+            a, b, maior[0] = historico.pop()
+            pai[a] = a
+            tamanho[b] -= tamanho[a]
+
+    if num_passos:
+        visitar(1, 0, num_passos - 1)
+    return unioes, maiores
+
+# ===================================================================
+# FUNÇÃO: metricas_deslizantes
+# Descrição: Desliza uma janela de `largura` anos sobre a série e retorna
+#            um DataFrame com uma linha por janela: anos inicial e final,
+#            número de nós e arestas, densidade, grau médio e máximo,
+#            triângulos, número de componentes e tamanho da maior.
+# ===================================================================
+def metricas_deslizantes(rede: dict, largura: int, preparados=None):
+    anos, pares_por_ano, autores_por_ano, origem, destino = preparados or preparar_anos(rede)
+    num_passos = len(anos) - largura + 1
+    if largura < 1 or num_passos < 1:
+        raise ValueError(f"Largura {largura} inválida para {len(anos)} anos.")
+
+    estado = iniciar_estado(len(rede['ids']), len(origem))
+    inicio_ativo = np.full(len(origem), -1, dtype=np.int64)
+    intervalos = []
+    linhas = []
+
+    for passo in range(num_passos):
+        # Primeiro entra o ano novo, depois sai o antigo: um par presente
+        # nos dois anos não chega a sair da janela
+        entrada = [passo + largura - 1] if passo else list(range(largura))
+        for k in entrada:
+            entraram = aplicar_ano(estado, pares_por_ano[k], autores_por_ano[k], origem, destino, +1)
+            inicio_ativo[entraram] = passo
+        if passo:
+            k = passo - 1
+            sairam = aplicar_ano(estado, pares_por_ano[k], autores_por_ano[k], origem, destino, -1)
+            intervalos.extend(zip(sairam.tolist(), inicio_ativo[sairam].tolist(), [passo - 1] * len(sairam)))
+            inicio_ativo[sairam] = -1
+
+        linha = {'inicio': int(anos[passo]), 'fim': int(anos[passo + largura - 1])}
+        linha.update(resumo_estado(estado))
+        linhas.append(linha)
+
+    ativos = np.flatnonzero(inicio_ativo >= 0)
+    intervalos.extend(zip(ativos.tolist(), inicio_ativo[ativos].tolist(), [num_passos - 1] * len(ativos)))
+    unioes, maiores = componentes_por_passo(intervalos, num_passos, len(rede['ids']), origem, destino)
+
+    tabela = pd.DataFrame(linhas)
+    tabela['componentes'] = tabela['num_nos'] - np.array(unioes)
+    tabela['maior_componente'] = np.where(tabela['num_nos'] > 0, maiores, 0)
+    tabela.insert(0, 'largura', largura)
+    return tabela
+
+@instrumentar_pipeline("janelas_deslizantes.main")
+def main(pasta="./basedados/anos", larguras=LARGURAS, pasta_saida="."):
+    with etapa("construir_rede_temporal"):
+        rede = construir_rede_temporal(pasta)
+    with etapa("preparar_anos"):
+        preparados = preparar_anos(rede)
+
+    partes = []
+    for largura in larguras:
+        with etapa("metricas_deslizantes", largura=largura) as info:
+            tabela = metricas_deslizantes(rede, largura, preparados)
+            info['janelas'] = len(tabela)
+        partes.append(tabela)
+        for linha in tabela.itertuples():
+            print(f"{linha.inicio}-{linha.fim}: {linha.num_nos} nós, {linha.num_arestas} arestas, "
+                  f"densidade {linha.densidade:.4f}, {linha.componentes} componentes, "
+                  f"{linha.triangulos} triângulos")
+
+    os.makedirs(pasta_saida, exist_ok=True)
+    pd.concat(partes, ignore_index=True).to_csv(os.path.join(pasta_saida, "janelas_deslizantes.csv"), index=False)
+    print("Métricas salvas em janelas_deslizantes.csv")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import hashlib
+import os
+import networkx as nx
+import numpy as np
+import grafo_compacto
+from metricas_esparsas import adjacencia_de_arestas, adjacencia_de_grafo
+
+# ===================================================================
+# Serviço de layouts dos grafos
+#   - Cache: as posições calculadas são gravadas em disco, indexadas pelo
+#     hash do grafo (nós + arestas) e dos parâmetros do layout, então uma
+#     mesma figura nunca é recalculada.
+#   - Aquecimento: a última posição conhecida de cada autor também é
+#     guardada, em um arquivo por uso (`aquecimento`: períodos, rede
+#     geral...), para não misturar sistemas de coordenadas. Um grafo novo
+#     (ex.: o próximo período) parte dessas posições; só os autores novos
+#     precisam convergir, o que exige menos iterações e mantém as figuras
+#     comparáveis entre períodos. Quem só lê as posições de outro uso (a
+#     rede ego parte das posições da rede geral) não as sobrescreve.
+#   - Motor multinível: para a rede geral, o grafo é contraído
+#     sucessivamente (emparelhamento de vizinhos), o nível mais grosso é
+#     posicionado e as posições são refinadas nível a nível com um
+#     Fruchterman-Reingold vetorizado em NumPy.
+# ===================================================================
+
+PASTA_LAYOUTS = os.path.join(".", ".cache", "layouts")
+AQUECIMENTO_PADRAO = "autores"
+
+ITERACOES = 50             # Iterações de um layout a partir do zero
+ITERACOES_AQUECIDO = 15    # Iterações quando todos (ou quase) já têm posição
+TAMANHO_GROSSO = 100       # Tamanho máximo do nível mais grosso do multinível
+
+# ===================================================================
+# FUNÇÃO: hash_grafo
+# Descrição: Hash do conjunto de nós/arestas e dos parâmetros do layout.
+#            Não depende da ordem de inserção dos nós ou arestas; o grafo
+#            compacto dá o mesmo hash do nx.Graph equivalente.
+# ===================================================================
+def hash_grafo(G: nx.Graph, **parametros):
+    if grafo_compacto.eh_compacto(G):
+        nos = grafo_compacto.nos(G)
+        arestas = [(nos[u], nos[v]) for u, v in zip(G['origem'].tolist(), G['destino'].tolist())]
+    else:
+        nos, arestas = G.nodes(), G.edges()
+    sha = hashlib.sha256()
+    sha.update(repr(sorted(parametros.items())).encode())
+    for n in sorted(map(str, nos)):
+        sha.update(n.encode() + b"\n")
+    for u, v in sorted(tuple(sorted((str(u), str(v)))) for u, v in arestas):
+        sha.update(f"{u}-{v}\n".encode())
+    return sha.hexdigest()
+
+def _ler_posicoes(caminho: str):
+    try:
+        with np.load(caminho) as dados:
+            return dict(zip(dados['ids'].tolist(), dados['pos']))
+    except (OSError, KeyError, ValueError):
+        return None
+
+def _gravar_posicoes(caminho: str, pos: dict):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = caminho + ".tmp.npz"
+    np.savez(temporario,
+             ids=np.array([str(n) for n in pos], dtype=str),
+             pos=np.array([pos[n] for n in pos], dtype=np.float64).reshape(-1, 2))
+    os.replace(temporario, caminho)
+
+# ===================================================================
+# FUNÇÃO: posicoes_iniciais
+# Descrição: Monta as posições de partida a partir das posições conhecidas
+#            dos autores. Autores novos são colocados perto da média dos
+#            vizinhos já posicionados (ou em posição aleatória). Retorna
+#            as posições e a fração de nós que já tinham posição.
+# ===================================================================
+def posicoes_iniciais(G: nx.Graph, conhecidas: dict, semente=42):
+    rng = np.random.default_rng(semente)
+    pos = {n: np.asarray(conhecidas[str(n)], dtype=np.float64)
+           for n in G if str(n) in conhecidas}
+    fracao = len(pos) / G.number_of_nodes() if G.number_of_nodes() else 0.0
+    if not pos:
+        return None, 0.0
+
+    for n in G:
+        if n in pos:
+            continue
+        vizinhos = [pos[v] for v in G.neighbors(n) if v in pos]
+        centro = np.mean(vizinhos, axis=0) if vizinhos else rng.uniform(-1, 1, 2)
+        pos[n] = centro + rng.normal(scale=0.05, size=2)
+    return pos, fracao
+
+def _reescalar(coordenadas: np.ndarray, escala=1.0):
+    # Mesmo comportamento de nx.rescale_layout: centraliza e ajusta a escala
+    coordenadas = coordenadas - coordenadas.mean(axis=0)
+    limite = np.abs(coordenadas).max()
+    if limite > 0:
+        coordenadas = coordenadas * (escala / limite)
+    return coordenadas
+
+# ===================================================================
+# FUNÇÃO: fruchterman_reingold
+# Descrição: Versão vetorizada do Fruchterman-Reingold sobre a CSR. A
+#            repulsão entre todos os pares é calculada em blocos de linhas
+#            (memória limitada); a atração percorre só as arestas.
+# ===================================================================
+def fruchterman_reingold(A, coordenadas: np.ndarray, iteracoes=ITERACOES, k=None,
+                         temperatura=0.1, bloco=1024):
+    n = A.shape[0]
+    if n <= 1:
+        return coordenadas
+    if k is None:
+        k = np.sqrt(1.0 / n)
+
+    coo = A.tocoo()
+    linhas, colunas = coo.row, coo.col
+    coordenadas = coordenadas.astype(np.float64).copy()
+    x, y = coordenadas[:, 0], coordenadas[:, 1]
+    passo = temperatura / (iteracoes + 1)
+
+    for _ in range(iteracoes):
+        deslocamento = np.zeros_like(coordenadas)
+        # Repulsão k²/d entre todos os pares, bloco a bloco. Como
+        # sum_j f_ij (x_i - x_j) = x_i sum_j f_ij - (f @ x)_i, o somatório
+        # vira um produto matriz-vetor.
+        for i0 in range(0, n, bloco):
+            xb, yb = x[i0:i0 + bloco], y[i0:i0 + bloco]
+            f = np.subtract.outer(xb, x)
+            f *= f
+            dy = np.subtract.outer(yb, y)
+            f += dy * dy
+            np.maximum(f, 1e-8, out=f)
+            np.divide(k * k, f, out=f)
+            f[np.arange(len(xb)), np.arange(i0, i0 + len(xb))] = 0
+            soma = f.sum(axis=1)
+            deslocamento[i0:i0 + bloco, 0] += xb * soma - f @ x
+            deslocamento[i0:i0 + bloco, 1] += yb * soma - f @ y
+        # Atração d²/k ao longo das arestas
+        delta = coordenadas[linhas] - coordenadas[colunas]
+        dist = np.sqrt((delta ** 2).sum(axis=-1))
+        np.add.at(deslocamento, linhas, -delta * (dist / k)[:, None])
+
+        # Limita o deslocamento pela temperatura, que esfria a cada iteração
+        tamanho = np.maximum(np.sqrt((deslocamento ** 2).sum(axis=-1)), 1e-8)
+        coordenadas += deslocamento * (np.minimum(tamanho, temperatura) / tamanho)[:, None]
+        temperatura -= passo
+    return coordenadas
+
+# ===================================================================
+# FUNÇÃO: _contrair
+# Descrição: Um nível de contração: cada nó é emparelhado com um vizinho
+#            ainda livre (ordem aleatória). Retorna o mapa nó -> nó grosso,
+#            o número de nós grossos e a CSR do grafo contraído.
+# ===================================================================
+def _contrair(A, rng):
+    n = A.shape[0]
+    grupo = np.full(n, -1, dtype=np.int64)
+    proximo = 0
+    for u in rng.permutation(n):
+        if grupo[u] >= 0:
+            continue
+        grupo[u] = proximo
+        for v in A.indices[A.indptr[u]:A.indptr[u + 1]]:
+            if grupo[v] < 0:
+                grupo[v] = proximo
+                break
+        proximo += 1
+
+    # Arestas entre nós grossos distintos (as internas ao par somem)
+    coo = A.tocoo()
+    u, v = grupo[coo.row], grupo[coo.col]
+    externas = u < v
+    return grupo, proximo, adjacencia_de_arestas(u[externas], v[externas], proximo)
+
+# ===================================================================
+# FUNÇÃO: layout_multinivel
+# Descrição: Layout force-directed multinível. `coordenadas` opcionais
+#            (aquecimento) dispensam a contração: só o refinamento final é
+#            executado a partir delas.
+# ===================================================================
+def layout_multinivel(G: nx.Graph, semente=42, coordenadas=None, iteracoes=ITERACOES):
+    nos, A = adjacencia_de_grafo(G)
+    rng = np.random.default_rng(semente)
+    if not nos:
+        return {}
+
+    if coordenadas is None:
+        # Contrai até o nível grosso ficar pequeno ou parar de encolher
+        niveis = [A]
+        mapas = []
+        while niveis[-1].shape[0] > TAMANHO_GROSSO:
+            grupo, tamanho, B = _contrair(niveis[-1], rng)
+            if tamanho > 0.9 * niveis[-1].shape[0]:
+                break
+            mapas.append(grupo)
+            niveis.append(B)
+
+        atual = fruchterman_reingold(niveis[-1], rng.uniform(-1, 1, (niveis[-1].shape[0], 2)),
+                                     iteracoes=iteracoes)
+        # Propaga as posições para os níveis mais finos e refina cada um
+        for nivel in range(len(mapas) - 1, -1, -1):
+            atual = atual[mapas[nivel]] + rng.normal(scale=0.01, size=(len(mapas[nivel]), 2))
+            atual = fruchterman_reingold(niveis[nivel], _reescalar(atual),
+                                         iteracoes=max(iteracoes // 3, ITERACOES_AQUECIDO))
+    else:
+        atual = fruchterman_reingold(A, _reescalar(coordenadas), iteracoes=iteracoes, temperatura=0.05)
+
+    atual = _reescalar(atual)
+    return {n: atual[i] for i, n in enumerate(nos)}
+
+# ===================================================================
+# FUNÇÃO: calcular_layout
+# Descrição: Ponto de entrada do serviço. Retorna as posições do grafo,
+#            usando o cache quando possível, aquecendo a partir das
+#            posições conhecidas dos autores no arquivo `aquecimento` e,
+#            com atualizar_aquecimento=True, atualizando-as no final.
+#            metodo: "spring" (nx.spring_layout) ou "multinivel".
+# ===================================================================
+def calcular_layout(G: nx.Graph, metodo="spring", semente=42, k=None, pasta=PASTA_LAYOUTS,
+                    aquecimento=AQUECIMENTO_PADRAO, atualizar_aquecimento=True):
+    if G.number_of_nodes() == 0:
+        return {}
+
+    chave = hash_grafo(G, metodo=metodo, semente=semente, k=k)
+    caminho = os.path.join(pasta, f"{chave}.npz")
+    pos = _ler_posicoes(caminho)
+    if pos is not None and all(str(n) in pos for n in G):
+        return {n: pos[str(n)] for n in G}
+
+    caminho_autores = os.path.join(pasta, f"aquecimento_{aquecimento}.npz")
+    conhecidas = _ler_posicoes(caminho_autores) or {}
+    inicial, fracao = posicoes_iniciais(G, conhecidas, semente)
+
+    # Se a maior parte dos autores já tem posição, poucas iterações bastam
+    iteracoes = ITERACOES_AQUECIDO if fracao >= 0.5 else ITERACOES
+
+    if metodo == "multinivel":
+        coordenadas = None if inicial is None else np.array([inicial[n] for n in G])
+        pos = layout_multinivel(G, semente=semente, coordenadas=coordenadas, iteracoes=iteracoes)
+    else:
+        pos = nx.spring_layout(G, k=k, pos=inicial, iterations=iteracoes, seed=semente)
+
+    _gravar_posicoes(caminho, pos)
+    if atualizar_aquecimento:
+        conhecidas.update({str(n): p for n, p in pos.items()})
+        _gravar_posicoes(caminho_autores, conhecidas)
+    return pos
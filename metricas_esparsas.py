@@ -0,0 +1,78 @@
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+import grafo_compacto
+
+# ===================================================================
+# Métricas vetorizadas sobre a matriz de adjacência esparsa (CSR)
+# Cada grafo é representado pela lista de nós e por uma matriz CSR
+# binária e simétrica. Grau e percentil viram operações sobre arrays, com
+# os mesmos resultados do NetworkX (inclusive a contagem dupla de laços
+# no grau).
+# ===================================================================
+
+# ===================================================================
+# FUNÇÃO: adjacencia_de_grafo
+# Descrição: Converte um nx.Graph para (lista de nós, matriz CSR). Um
+#            grafo compacto (grafo_compacto.py) já tem a CSR, usada direto.
+# ===================================================================
+def adjacencia_de_grafo(grafo: nx.Graph):
+    if grafo_compacto.eh_compacto(grafo):
+        return grafo_compacto.nos(grafo), grafo_compacto.matriz(grafo)
+    nos = list(grafo)
+    A = nx.to_scipy_sparse_array(grafo, nodelist=nos, weight=None, dtype=np.int8, format='csr')
+    return nos, A
+
+# ===================================================================
+# FUNÇÃO: adjacencia_de_arestas
+# Descrição: Monta a matriz CSR a partir de arrays de arestas (u, v), como
+#            os do cache de snapshots e do armazenamento temporal.
+# ===================================================================
+def adjacencia_de_arestas(origem: np.ndarray, destino: np.ndarray, num_nos: int):
+    laco = origem == destino
+    linhas = np.concatenate([origem, destino[~laco]])
+    colunas = np.concatenate([destino, origem[~laco]])
+    A = sp.csr_array((np.ones(len(linhas), dtype=np.int8), (linhas, colunas)), shape=(num_nos, num_nos))
+    A.sum_duplicates()
+    A.data[:] = 1
+    return A
+
+# ===================================================================
+# FUNÇÃO: adjacencia_de_snapshot
+# Descrição: Usa diretamente a CSR gravada no snapshot do cache_gexf.
+# ===================================================================
+def adjacencia_de_snapshot(snapshot: dict):
+    num_nos = len(snapshot['ids'])
+    A = sp.csr_array((np.ones(len(snapshot['indices']), dtype=np.int8),
+                      np.asarray(snapshot['indices']), np.asarray(snapshot['indptr'])),
+                     shape=(num_nos, num_nos))
+    return snapshot['ids'].tolist(), A
+
+def _lacos(A):
+    return (A.diagonal() != 0).astype(np.int64)
+
+# ===================================================================
+# FUNÇÃO: sem_lacos
+# Descrição: Cópia binária (float64) da matriz sem os laços, para as
+#            medidas definidas em grafos simples.
+# ===================================================================
+def sem_lacos(A):
+    A = sp.csr_array(A, dtype=np.float64)
+    A.setdiag(0)
+    A.eliminate_zeros()
+    A.data[:] = 1.0
+    return A
+
+# ===================================================================
+# FUNÇÃO: calcular_graus
+# Descrição: Grau de cada nó (laços contam 2, como no NetworkX).
+# ===================================================================
+def calcular_graus(A):
+    return np.diff(A.indptr).astype(np.int64) + _lacos(A)
+
+# ===================================================================
+# FUNÇÃO: limite_percentil
+# Descrição: Percentil da distribuição de graus, arredondado para cima.
+# ===================================================================
+def limite_percentil(graus: np.ndarray, percentil=80):
+    return int(np.ceil(np.percentile(graus, percentil)))
@@ -0,0 +1,181 @@
+import os
+import xml.etree.ElementTree as ET
+from array import array
+from collections import Counter
+import numpy as np
+from aliases import aliases_do_arquivo, impressao_aliases
+from conectividade import metricas_conectividade
+from paralelo import mapear_arquivos
+
+# ===================================================================
+# Leitura incremental de GEXF para métricas
+# Percorre os elementos <node>/<edge> com iterparse, acumulando apenas o
+# índice dos nós, o vetor de graus e as pontas de cada aresta (arrays de
+# inteiros, para as métricas de conectividade). Nenhum nx.Graph é
+# construído e cada
+# elemento é descartado logo após ser processado, de modo que a memória
+# cresce com o número de nós e não com o tamanho da árvore XML.
+# Assume, como nos arquivos gerados pelo NetworkX, que não há arestas
+# repetidas no arquivo. Com um mapa de aliases na pasta (aliases.py), os
+# ids são trocados pelos canônicos na leitura e as arestas que passam a
+# se repetir são contadas uma vez.
+# ===================================================================
+
+def _tag(elemento):
+    # Remove o namespace: "{http://www.gexf.net/1.2draft}node" -> "node"
+    return elemento.tag.rsplit('}', 1)[-1]
+
+# ===================================================================
+# FUNÇÃO: percorrer_gexf
+# Descrição: Lê o arquivo em uma única passada e retorna os ids dos nós
+#            (na ordem do arquivo), o vetor de graus, os arrays de origem e
+#            destino das arestas e se o grafo é direcionado.
+# ===================================================================
+def percorrer_gexf(arquivo: str):
+    indice = {}
+    graus = []
+    origem = array('q')
+    destino = array('q')
+    direcionado = False
+    container = None
+    aliases = aliases_do_arquivo(arquivo)
+
+    def _indice_no(no_id):
+        # Arestas podem citar nós não declarados, como no nx.read_gexf
+        no_id = aliases.get(no_id, no_id)
+        i = indice.get(no_id)
+        if i is None:
+            i = indice[no_id] = len(graus)
+            graus.append(0)
+        return i
+
+    for evento, elemento in ET.iterparse(arquivo, events=('start', 'end')):
+        tag = _tag(elemento)
+        if evento == 'start':
+            if tag == 'graph':
+                direcionado = elemento.get('defaultedgetype', 'undirected') == 'directed'
+            elif tag in ('nodes', 'edges'):
+                container = elemento
+            continue
+
+        if tag == 'node':
+            _indice_no(elemento.get('id'))
+        elif tag == 'edge':
+            u = _indice_no(elemento.get('source'))
+            v = _indice_no(elemento.get('target'))
+            # Laços contam 2 no grau, igual ao NetworkX
+            graus[u] += 1
+            graus[v] += 1
+            origem.append(u)
+            destino.append(v)
+        else:
+            continue
+
+        # Descarta o elemento já processado
+        elemento.clear()
+        if container is not None:
+            container.clear()
+
+    graus = np.array(graus, dtype=np.int64)
+    origem = np.frombuffer(origem, dtype=np.int64)
+    destino = np.frombuffer(destino, dtype=np.int64)
+    if aliases and len(origem):
+        # Autores fundidos: pares repetidos viram uma aresta só
+        num_nos = len(graus)
+        if direcionado:
+            chaves = origem * num_nos + destino
+        else:
+            chaves = np.minimum(origem, destino) * num_nos + np.maximum(origem, destino)
+        _, primeira = np.unique(chaves, return_index=True)
+        primeira.sort()
+        origem, destino = origem[primeira], destino[primeira]
+        graus = np.bincount(origem, minlength=num_nos) + np.bincount(destino, minlength=num_nos)
+    return list(indice), graus, origem, destino, direcionado
+
+# ===================================================================
+# FUNÇÃO: calcular_metricas_gexf
+# Descrição: Calcula as métricas do R1 (densidade, número de nós e de
+#            arestas, grau médio, distribuição e lista de graus) em uma
+#            única passada pelo arquivo, mais as de conectividade
+#            (componentes, fração na gigante, caminho médio e diâmetro
+#            efetivo; ver conectividade.py). Os arquivos já são
+#            distribuídos entre processos por metricas_gexf_lote, então a
+#            BFS de cada arquivo roda em série.
+# ===================================================================
+def calcular_metricas_gexf(arquivo: str):
+    _, graus, origem, destino, direcionado = percorrer_gexf(arquivo)
+    num_nos = len(graus)
+    num_arestas = len(origem)
+
+    # Mesma definição de nx.density
+    if num_nos <= 1:
+        densidade = 0
+    else:
+        densidade = num_arestas / (num_nos * (num_nos - 1))
+        if not direcionado:
+            densidade *= 2
+
+    metricas = {
+        'densidade': densidade,
+        'num_nos': num_nos,
+        'num_arestas': num_arestas,
+        'grau_medio': int(graus.sum()) / num_nos,  # Média de conexões por nó
+        'distribuicao': Counter(graus.tolist()),
+        'graus': graus
+    }
+    metricas.update(metricas_conectividade(origem, destino, num_nos, workers=1))
+    return metricas
+
+# Resultados já calculados, indexados por (caminho, mtime, tamanho, mapa
+# de aliases), de forma que pedir métricas e graus do mesmo ano não relê
+# o XML
+_memoria = {}
+
+def _chave(arquivo: str):
+    try:
+        info = os.stat(arquivo)
+    except OSError:
+        return None
+    return os.path.abspath(arquivo), info.st_mtime_ns, info.st_size, impressao_aliases(arquivo)
+
+def _memorizar(chave, metricas: dict):
+    metricas['graus'].setflags(write=False)
+    _memoria[chave] = metricas
+
+def _copia(metricas: dict):
+    return dict(metricas, distribuicao=Counter(metricas['distribuicao']))
+
+# ===================================================================
+# FUNÇÃO: metricas_gexf
+# Descrição: Versão memorizada de calcular_metricas_gexf.
+# ===================================================================
+def metricas_gexf(arquivo: str):
+    chave = _chave(arquivo)
+    if chave not in _memoria:
+        metricas = calcular_metricas_gexf(arquivo)
+        if chave is None:
+            return metricas
+        _memorizar(chave, metricas)
+    return _copia(_memoria[chave])
+
+# ===================================================================
+# FUNÇÃO: metricas_gexf_lote
+# Descrição: Calcula as métricas de vários arquivos, opcionalmente em um
+#            pool de processos, preservando a ordem. Arquivos com erro
+#            resultam em None (o erro é exibido por mapear_arquivos).
+# ===================================================================
+def metricas_gexf_lote(arquivos: list, workers=None):
+    chaves = [_chave(arquivo) for arquivo in arquivos]
+    pendentes = [a for a, c in zip(arquivos, chaves) if c is None or c not in _memoria]
+    calculadas = dict(zip(pendentes, mapear_arquivos(calcular_metricas_gexf, pendentes, workers)))
+
+    resultados = []
+    for arquivo, chave in zip(arquivos, chaves):
+        if arquivo in calculadas:
+            metricas = calculadas[arquivo]
+            if metricas is not None and chave is not None:
+                _memorizar(chave, metricas)
+        else:
+            metricas = _memoria[chave]
+        resultados.append(None if metricas is None else _copia(metricas))
+    return resultados
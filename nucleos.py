@@ -0,0 +1,179 @@
+import os
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from instrumentacao import etapa, instrumentar_pipeline
+from metricas_esparsas import calcular_graus, sem_lacos
+from rede_temporal import PERIODOS, construir_rede_temporal, janelas_anos_periodos, matriz_janela
+
+# ===================================================================
+# Núcleos (k-core), curva "grau >= X" e rich-club em uma passada
+# Em vez de um corte único (percentil 80 do grau, como em R3), calcula o
+# tamanho e a densidade do subgrafo "grau >= X" para todo X. Uma aresta
+# está no subgrafo de limite X se e só se o menor grau das suas pontas é
+# >= X; contando as arestas pelo menor grau e acumulando do maior para o
+# menor limite, a curva inteira sai de dois bincount. O mesmo vale para
+# os k-cores, com o número de núcleo no lugar do grau. Os números de
+# núcleo vêm do algoritmo de baldes de Batagelj-Zaversnik, O(n + m).
+#
+# A curva "grau >= X" usa o grau do NetworkX (laço conta 2), como
+# gerar_subgrafo. Núcleos e rich-club são definidos para grafos simples:
+# os laços são ignorados, e os resultados são iguais aos de
+# nx.core_number e nx.rich_club_coefficient(normalized=False) no grafo
+# sem laços.
+# ===================================================================
+
+# ===================================================================
+# FUNÇÃO: curva_acumulada
+# Descrição: Para cada limite X = 0..max(valores), número de nós com
+#            valor >= X, número de arestas com as duas pontas >= X e a
+#            densidade do subgrafo induzido (0 com menos de 2 nós).
+#            `minimo_aresta` é o menor valor das pontas de cada aresta.
+# ===================================================================
+def curva_acumulada(valores: np.ndarray, minimo_aresta: np.ndarray):
+    tamanho = int(valores.max(initial=0)) + 1
+    # Soma acumulada do fim para o início: contagem de "valor >= X"
+    nos = np.cumsum(np.bincount(valores, minlength=tamanho)[::-1])[::-1]
+    arestas = np.cumsum(np.bincount(minimo_aresta, minlength=tamanho)[::-1])[::-1]
+    pares = nos * (nos - 1)
+    densidade = np.divide(2 * arestas, pares, out=np.zeros(tamanho), where=pares > 0)
+    return {'limite': np.arange(tamanho), 'num_nos': nos, 'num_arestas': arestas, 'densidade': densidade}
+
+def _minimo_pontas(A, valores: np.ndarray):
+    # Cada aresta uma vez (triângulo superior, com a diagonal)
+    T = sp.triu(A, format='coo')
+    return np.minimum(valores[T.row], valores[T.col])
+
+# ===================================================================
+# FUNÇÃO: numeros_nucleo
+# Descrição: Número de núcleo (core number) de cada nó: o maior k tal que
+#            o nó pertence ao k-core. Os nós ficam ordenados por grau em
+#            baldes; cada nó retirado decrementa o grau dos vizinhos de
+#            grau maior, que descem um balde (troca de posição em O(1)).
+# ===================================================================
+def numeros_nucleo(A):
+    A = sem_lacos(A)
+    indptr = A.indptr.tolist()
+    indices = A.indices.tolist()
+    grau_inicial = np.diff(A.indptr)
+    n = len(grau_inicial)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    # ordem: nós ordenados por grau; inicio[d]: primeira posição do balde d
+    ordem_array = np.argsort(grau_inicial, kind='stable')
+    inicio = np.searchsorted(grau_inicial[ordem_array], np.arange(grau_inicial.max() + 1)).tolist()
+    ordem = ordem_array.tolist()
+    posicao = [0] * n
+    for i, v in enumerate(ordem):
+        posicao[v] = i
+    grau = grau_inicial.tolist()
+
+    for i in range(n):
+        v = ordem[i]
+        gv = grau[v]
+        for j in range(indptr[v], indptr[v + 1]):
+            u = indices[j]
+            gu = grau[u]
+            if gu > gv:
+                # Troca u com o primeiro nó do seu balde e encolhe o balde
+                pu, pw = posicao[u], inicio[gu]
+                w = ordem[pw]
+                if u != w:
+                    ordem[pu], ordem[pw] = w, u
+                    posicao[u], posicao[w] = pw, pu
+                inicio[gu] += 1
+                grau[u] = gu - 1
+    return np.array(grau, dtype=np.int64)
+
+# ===================================================================
+# FUNÇÃO: rich_club
+# Descrição: Coeficiente de rich-club não normalizado: phi(k) é a
+#            densidade do subgrafo dos nós com grau > k, para cada k com
+#            pelo menos 2 desses nós. É a curva "grau >= k+1" do grafo
+#            sem laços.
+# ===================================================================
+def rich_club(A, curva_simples=None):
+    if curva_simples is None:
+        A = sem_lacos(A)
+        graus = calcular_graus(A)
+        curva_simples = curva_acumulada(graus, _minimo_pontas(A, graus))
+    validos = curva_simples['num_nos'][1:] > 1
+    if curva_simples['num_arestas'][0] == 0:
+        return np.zeros(0)
+    return curva_simples['densidade'][1:][validos]
+
+# Completa a curva até `tamanho` limites (os do grau, o maior deles)
+def _estender(valores: np.ndarray, tamanho: int, preenchimento=0):
+    saida = np.full(tamanho, preenchimento, dtype=np.result_type(valores, type(preenchimento)))
+    saida[:len(valores)] = valores
+    return saida
+
+# ===================================================================
+# FUNÇÃO: analisar_limiares
+# Descrição: Curva "grau >= X", decomposição em k-cores e rich-club de um
+#            grafo (matriz CSR) em uma chamada. Retorna um DataFrame com
+#            uma linha por limite X:
+#              num_nos / num_arestas / densidade: subgrafo grau >= X
+#              nucleo_nos / nucleo_arestas / nucleo_densidade: X-core
+#              rich_club: phi(X) (NaN onde não está definido)
+# ===================================================================
+def analisar_limiares(A):
+    graus = calcular_graus(A)
+    curva = curva_acumulada(graus, _minimo_pontas(A, graus))
+
+    simples = sem_lacos(A)
+    graus_simples = calcular_graus(simples)
+    curva_simples = curva_acumulada(graus_simples, _minimo_pontas(simples, graus_simples))
+    nucleo = numeros_nucleo(simples)
+    curva_nucleo = curva_acumulada(nucleo, _minimo_pontas(simples, nucleo))
+    phi = rich_club(simples, curva_simples)
+
+    tamanho = len(curva['limite'])
+    return pd.DataFrame({
+        'limite': curva['limite'],
+        'num_nos': curva['num_nos'],
+        'num_arestas': curva['num_arestas'],
+        'densidade': curva['densidade'],
+        'nucleo_nos': _estender(curva_nucleo['num_nos'], tamanho),
+        'nucleo_arestas': _estender(curva_nucleo['num_arestas'], tamanho),
+        'nucleo_densidade': _estender(curva_nucleo['densidade'], tamanho),
+        'rich_club': _estender(phi, tamanho, np.nan),
+    })
+
+# ===================================================================
+# FUNÇÃO: tabela_limiares
+# Descrição: analisar_limiares de cada ano e de cada período, empilhados
+#            em um DataFrame com a coluna `janela`.
+# ===================================================================
+def tabela_limiares(rede: dict, periodos=PERIODOS):
+    janelas = janelas_anos_periodos(rede, periodos)
+
+    partes = []
+    for rotulo, inicio, fim in janelas:
+        with etapa("analisar_limiares", janela=rotulo) as info:
+            tabela = analisar_limiares(matriz_janela(rede, inicio, fim))
+            info['limites'] = len(tabela)
+        tabela.insert(0, 'janela', rotulo)
+        partes.append(tabela)
+    return pd.concat(partes, ignore_index=True)
+
+@instrumentar_pipeline("nucleos.main")
+def main(pasta="./basedados/anos", periodos=PERIODOS, pasta_saida="."):
+    with etapa("construir_rede_temporal"):
+        rede = construir_rede_temporal(pasta)
+    tabela = tabela_limiares(rede, periodos)
+
+    for rotulo, grupo in tabela.groupby('janela', sort=False):
+        degeneracao = int(grupo.loc[grupo['nucleo_nos'] > 0, 'limite'].max())
+        nucleo = grupo[grupo['limite'] == degeneracao].iloc[0]
+        print(f"{rotulo}: grau máximo {int(grupo['limite'].max())}, "
+              f"núcleo máximo k={degeneracao} ({int(nucleo['nucleo_nos'])} nós, "
+              f"densidade {nucleo['nucleo_densidade']:.4f})")
+
+    os.makedirs(pasta_saida, exist_ok=True)
+    tabela.to_csv(os.path.join(pasta_saida, "limiares.csv"), index=False)
+    print("Curvas salvas em limiares.csv")
+
+if __name__ == "__main__":
+    main()
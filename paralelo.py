@@ -0,0 +1,105 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from instrumentacao import ativa, etapa, medir_chamada, registrar, tamanho_grafo
+
+# ===================================================================
+# Execução paralela por arquivo
+# Os arquivos de cada ano são independentes, então o processamento pode
+# ser distribuído em um pool de processos. As funções executadas nos
+# workers devem devolver resultados compactos (arrays, contadores), nunca
+# grafos inteiros, para não pagar o custo de serializá-los de volta.
+# ===================================================================
+
+# Variável de ambiente com o número padrão de workers
+VARIAVEL_WORKERS = "REDES_WORKERS"
+# Tamanho máximo (em elementos) dos blocos densos fontes x nós das BFS
+ELEMENTOS_BLOCO = 4_000_000
+
+# ===================================================================
+# FUNÇÃO: numero_workers
+# Descrição: Resolve o número de workers. None usa a variável de ambiente
+#            REDES_WORKERS (padrão 1, execução serial); valores <= 0 usam
+#            todos os núcleos disponíveis.
+# ===================================================================
+def numero_workers(workers=None):
+    if workers is None:
+        try:
+            workers = int(os.environ.get(VARIAVEL_WORKERS, "1"))
+        except ValueError:
+            workers = 1
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+# ===================================================================
+# FUNÇÃO: mapear_arquivos
+# Descrição: Aplica `funcao` a cada arquivo, em série ou em um pool de
+#            processos, preservando a ordem dos arquivos. Erros de um
+#            arquivo são exibidos no processo principal e o resultado
+#            correspondente fica como None. Com a instrumentação ligada,
+#            cada arquivo é registrado como uma etapa com o nome da função.
+# ===================================================================
+def mapear_arquivos(funcao, arquivos: list, workers=None):
+    workers = min(numero_workers(workers), len(arquivos))
+    resultados = []
+
+    if workers <= 1:
+        for arquivo in arquivos:
+            try:
+                with etapa(funcao.__name__, arquivo=arquivo) as info:
+                    resultado = funcao(arquivo)
+                    info.update(tamanho_grafo(resultado))
+                resultados.append(resultado)
+            except Exception as e:
+                print(f"Erro ao processar {arquivo}: {e}")
+                resultados.append(None)
+        return resultados
+
+    instrumentar = ativa()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        if instrumentar:
+            # O worker mede a chamada e devolve o registro junto do resultado
+            futuros = [executor.submit(medir_chamada, funcao.__name__, funcao, arquivo)
+                       for arquivo in arquivos]
+        else:
+            futuros = [executor.submit(funcao, arquivo) for arquivo in arquivos]
+        for arquivo, futuro in zip(arquivos, futuros):
+            try:
+                if instrumentar:
+                    resultado, registro = futuro.result()
+                    registrar(registro)
+                    resultados.append(resultado)
+                else:
+                    resultados.append(futuro.result())
+            except Exception as e:
+                print(f"Erro ao processar {arquivo}: {e}")
+                resultados.append(None)
+    return resultados
+
+# A matriz das BFS em blocos é enviada uma vez para cada worker
+_matriz_worker = {}
+
+def _iniciar_worker(A):
+    _matriz_worker['A'] = A
+
+def _bloco_no_worker(funcao, fontes):
+    return funcao(fontes, _matriz_worker['A'])
+
+# ===================================================================
+# FUNÇÃO: mapear_blocos_fontes
+# Descrição: Divide as `fontes` de uma BFS em lote em blocos (no máximo
+#            256 fontes e ELEMENTOS_BLOCO elementos fontes x nós), aplica
+#            `funcao(bloco, A)` a cada um, em série ou em um pool de
+#            processos, e devolve `combinar(resultados dos blocos)`.
+#            `funcao` deve ser de nível de módulo.
+# ===================================================================
+def mapear_blocos_fontes(funcao, A, fontes, combinar, workers=None):
+    n = A.shape[0]
+    tamanho = max(1, min(256, ELEMENTOS_BLOCO // max(n, 1)))
+    blocos = [fontes[i:i + tamanho] for i in range(0, len(fontes), tamanho)]
+    workers = min(numero_workers(workers), len(blocos))
+    if workers <= 1:
+        return combinar(funcao(bloco, A) for bloco in blocos)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker, initargs=(A,)) as executor:
+        return combinar(executor.map(partial(_bloco_no_worker, funcao), blocos))
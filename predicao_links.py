@@ -0,0 +1,270 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from instrumentacao import etapa, instrumentar_pipeline
+from metricas_esparsas import sem_lacos
+from paralelo import numero_workers
+from rede_temporal import agregar_arestas, construir_rede_temporal, fatiar_janela, matriz_janela
+
+# ===================================================================
+# Predição de links entre anos consecutivos
+# Os pares de autores do ano t são pontuados e comparados com as
+# colaborações novas do ano t+1. As quatro medidas locais vêm de
+# produtos esparsos A·W·A, em que W é diagonal com o peso de cada vizinho
+# comum w:
+#   vizinhos_comuns:  W = 1
+#   jaccard:          vizinhos_comuns / |N(u) ∪ N(v)|
+#   adamic_adar:      W = 1 / log(grau(w))
+#   alocacao_recursos: W = 1 / grau(w)
+# As entradas não nulas de A·W·A são exatamente os pares a dois passos,
+# então só a fronteira de 2 saltos é pontuada. As linhas são processadas
+# em blocos e de cada bloco ficam só os k melhores candidatos de cada
+# autor (pares que ainda não colaboraram em t), de modo que a memória é
+# limitada pelo bloco e por k * autores.
+#
+# Avaliação de cada ano (pares de anos processados em paralelo):
+#   precisao_k: média, entre os autores que ganham alguma colaboração
+#               nova em t+1, da fração dos seus k candidatos que acertou
+#   revocacao_k: fração das colaborações novas (entre autores presentes
+#                em t) que está em alguma lista de k candidatos
+#   auc: probabilidade de uma colaboração nova ter pontuação maior que um
+#        par sem colaboração em t+1 (empates valem 1/2), por amostragem
+# O grafo de cada ano é simples: laços são ignorados.
+# ===================================================================
+
+MEDIDAS = ("vizinhos_comuns", "jaccard", "adamic_adar", "alocacao_recursos")
+K_PADRAO = 10
+AMOSTRAS_AUC = 10000
+ELEMENTOS_BLOCO = 4_000_000
+
+# ===================================================================
+# FUNÇÃO: pesos_vizinhos
+# Descrição: Peso de cada nó como vizinho comum, para a medida dada
+#            (vizinhos_comuns e jaccard usam peso 1).
+# ===================================================================
+def pesos_vizinhos(graus: np.ndarray, medida: str):
+    graus = graus.astype(np.float64)
+    if medida == "adamic_adar":
+        # Um vizinho comum tem grau >= 2; grau 1 nunca é usado
+        return np.divide(1.0, np.log(graus), out=np.zeros_like(graus), where=graus > 1)
+    if medida == "alocacao_recursos":
+        return np.divide(1.0, graus, out=np.zeros_like(graus), where=graus > 0)
+    return np.ones_like(graus)
+
+def _pontuar_bloco(A, linhas: np.ndarray, graus: np.ndarray, medida: str):
+    # Pontuações das linhas do bloco contra todos os autores (CSR)
+    S = (A[linhas] @ sp.diags_array(pesos_vizinhos(graus, medida)) @ A).tocoo()
+    u, v, s = linhas[S.row], S.col, S.data
+    if medida == "jaccard":
+        s = s / (graus[u] + graus[v] - s)
+    return u, v, s
+
+# ===================================================================
+# FUNÇÃO: melhores_candidatos
+# Descrição: Os k pares de maior pontuação de cada autor entre os que
+#            ainda não são vizinhos, processando as linhas em blocos.
+#            Retorna (autor, candidato, pontuacao), ordenado por autor e
+#            pontuação decrescente.
+# ===================================================================
+def melhores_candidatos(A, medida: str, k=K_PADRAO):
+    A = sem_lacos(A)
+    n = A.shape[0]
+    graus = np.diff(A.indptr).astype(np.float64)
+    tamanho = max(1, ELEMENTOS_BLOCO // max(n, 1))
+
+    partes = []
+    for inicio in range(0, n, tamanho):
+        linhas = np.arange(inicio, min(n, inicio + tamanho))
+        u, v, s = _pontuar_bloco(A, linhas, graus, medida)
+        # Tira o próprio autor e quem já é vizinho
+        vizinho = np.asarray(A[u, v]).ravel() > 0
+        manter = (u != v) & ~vizinho & (s > 0)
+        u, v, s = u[manter], v[manter], s[manter]
+
+        # Posição de cada par na lista do autor (pontuação decrescente)
+        ordem = np.lexsort((v, -s, u))
+        u, v, s = u[ordem], v[ordem], s[ordem]
+        primeiro = np.searchsorted(u, u, side='left')
+        manter = np.arange(len(u)) - primeiro < k
+        partes.append((u[manter], v[manter], s[manter]))
+
+    if not partes:
+        vazio = np.zeros(0, dtype=np.int64)
+        return vazio, vazio, np.zeros(0)
+    return tuple(np.concatenate(coluna) for coluna in zip(*partes))
+
+# ===================================================================
+# FUNÇÃO: pontuar_pares
+# Descrição: Pontuação de pares arbitrários (u[i], v[i]) pela medida,
+#            sem calcular a matriz inteira (usada na AUC).
+# ===================================================================
+def pontuar_pares(A, u: np.ndarray, v: np.ndarray, medida: str):
+    A = sem_lacos(A)
+    graus = np.diff(A.indptr).astype(np.float64)
+    comuns = (A[u].multiply(A[v]) @ pesos_vizinhos(graus, medida)).ravel() if len(u) else np.zeros(0)
+    if medida == "jaccard":
+        uniao = graus[u] + graus[v] - comuns
+        return np.divide(comuns, uniao, out=np.zeros_like(comuns), where=uniao > 0)
+    return comuns
+
+# ===================================================================
+# FUNÇÃO: novas_colaboracoes
+# Descrição: Matriz do ano t (autores presentes em t) e as colaborações
+#            de t+1 entre esses autores que não existiam em t, em índices
+#            locais. Também retorna os ids globais dos autores de t e o
+#            total de colaborações novas de t+1 (inclusive com autores
+#            que não estavam em t).
+# ===================================================================
+def novas_colaboracoes(rede: dict, ano: int, seguinte: int):
+    A = matriz_janela(rede, ano, ano)
+    presentes = np.unique(fatiar_janela(rede, ano, ano)['no_autor'])
+    local = np.full(len(rede['ids']), -1, dtype=np.int64)
+    local[presentes] = np.arange(len(presentes))
+
+    arestas = agregar_arestas(fatiar_janela(rede, seguinte, seguinte))
+    u, v = local[arestas['origem']], local[arestas['destino']]
+    diferentes = arestas['origem'] != arestas['destino']
+    presentes_par = (u >= 0) & (v >= 0) & diferentes
+    existentes = np.zeros(len(u), dtype=bool)
+    existentes[presentes_par] = np.asarray(A[u[presentes_par], v[presentes_par]]).ravel() > 0
+
+    novas = presentes_par & ~existentes
+    todas_novas = int(np.count_nonzero(diferentes & ~existentes))
+    return A, presentes, u[novas], v[novas], todas_novas
+
+# ===================================================================
+# FUNÇÃO: calcular_auc
+# Descrição: AUC por amostragem: pares (positivo, negativo) sorteados, com
+#            positivos entre as colaborações novas e negativos entre os
+#            pares de autores de t que não colaboram nem em t nem em t+1.
+# ===================================================================
+def calcular_auc(A, pos_u: np.ndarray, pos_v: np.ndarray, medida: str, amostras=AMOSTRAS_AUC, semente=42):
+    n = A.shape[0]
+    if len(pos_u) == 0 or n < 2:
+        return float('nan')
+    rng = np.random.default_rng(semente)
+    escolhidos = rng.integers(0, len(pos_u), size=amostras)
+
+    futuros = np.minimum(pos_u, pos_v) * n + np.maximum(pos_u, pos_v)
+    neg_u, neg_v = [], []
+    faltam = amostras
+    while faltam > 0:
+        u = rng.integers(0, n, size=2 * faltam)
+        v = rng.integers(0, n, size=2 * faltam)
+        validos = u != v
+        validos[validos] = np.asarray(A[u[validos], v[validos]]).ravel() == 0
+        chaves = np.minimum(u, v) * n + np.maximum(u, v)
+        validos &= ~np.isin(chaves, futuros)
+        neg_u.append(u[validos][:faltam])
+        neg_v.append(v[validos][:faltam])
+        faltam -= len(neg_u[-1])
+        if len(neg_u) > 50 and faltam > 0:
+            # Grafo quase completo: usa os negativos encontrados
+            break
+
+    positivos = pontuar_pares(A, pos_u[escolhidos], pos_v[escolhidos], medida)
+    negativos = pontuar_pares(A, np.concatenate(neg_u), np.concatenate(neg_v), medida)
+    m = min(len(positivos), len(negativos))
+    if m == 0:
+        return float('nan')
+    positivos, negativos = positivos[:m], negativos[:m]
+    return float((np.count_nonzero(positivos > negativos) + 0.5 * np.count_nonzero(positivos == negativos)) / m)
+
+# ===================================================================
+# FUNÇÃO: avaliar_transicao
+# Descrição: Pontua o ano t com cada medida e avalia contra t+1. Recebe
+#            uma tupla (ano, seguinte, A, novas_u, novas_v, todas_novas,
+#            k, amostras) e retorna uma linha por medida.
+# ===================================================================
+def avaliar_transicao(tarefa: tuple):
+    ano, seguinte, A, novas_u, novas_v, todas_novas, k, amostras = tarefa
+    n = A.shape[0]
+    chaves_novas = np.minimum(novas_u, novas_v) * n + np.maximum(novas_u, novas_v)
+    ganham = np.unique(np.concatenate([novas_u, novas_v]))
+
+    linhas = []
+    for medida in MEDIDAS:
+        u, v, _ = melhores_candidatos(A, medida, k)
+        acerto = np.isin(np.minimum(u, v) * n + np.maximum(u, v), chaves_novas)
+        acertos_autor = np.bincount(u[acerto], minlength=n)
+        candidatos = np.unique(np.minimum(u, v) * n + np.maximum(u, v))
+        previstas = np.isin(chaves_novas, candidatos)
+        linhas.append({
+            'ano': ano,
+            'ano_seguinte': seguinte,
+            'medida': medida,
+            'k': k,
+            'autores': n,
+            'novas_colaboracoes': todas_novas,
+            'previsiveis': len(chaves_novas),
+            'candidatos': len(candidatos),
+            'acertos': int(np.count_nonzero(previstas)),
+            'precisao_k': float(acertos_autor[ganham].mean() / k) if len(ganham) else float('nan'),
+            'revocacao_k': float(previstas.mean()) if len(previstas) else float('nan'),
+            'auc': calcular_auc(A, novas_u, novas_v, medida, amostras, semente=ano),
+        })
+    return linhas
+
+# ===================================================================
+# FUNÇÃO: avaliar_predicao
+# Descrição: Avalia todas as transições t -> t+1 da série, em série ou em
+#            um pool de processos (uma tarefa por par de anos). Retorna um
+#            DataFrame com uma linha por ano e medida.
+# ===================================================================
+def avaliar_predicao(rede: dict, k=K_PADRAO, amostras=AMOSTRAS_AUC, workers=None):
+    anos = rede['anos'].tolist()
+    tarefas = []
+    for ano, seguinte in zip(anos, anos[1:]):
+        A, _, novas_u, novas_v, todas_novas = novas_colaboracoes(rede, ano, seguinte)
+        tarefas.append((ano, seguinte, A, novas_u, novas_v, todas_novas, k, amostras))
+
+    workers = min(numero_workers(workers), len(tarefas))
+    if workers <= 1:
+        resultados = []
+        for tarefa in tarefas:
+            with etapa("avaliar_transicao", ano=tarefa[0]):
+                resultados.append(avaliar_transicao(tarefa))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            resultados = list(executor.map(avaliar_transicao, tarefas))
+    return pd.DataFrame([linha for linhas in resultados for linha in linhas])
+
+# ===================================================================
+# FUNÇÃO: prever_proximo_ano
+# Descrição: Os k candidatos de cada autor no último ano da série, com os
+#            ids Scopus, para cada medida: a previsão das colaborações do
+#            ano seguinte aos dados.
+# ===================================================================
+def prever_proximo_ano(rede: dict, k=K_PADRAO):
+    ano = int(rede['anos'][-1])
+    A = matriz_janela(rede, ano, ano)
+    ids = rede['ids'][np.unique(fatiar_janela(rede, ano, ano)['no_autor'])]
+    partes = []
+    for medida in MEDIDAS:
+        u, v, s = melhores_candidatos(A, medida, k)
+        partes.append(pd.DataFrame({'ano': ano, 'medida': medida, 'autor': ids[u],
+                                    'candidato': ids[v], 'pontuacao': s}))
+    return pd.concat(partes, ignore_index=True)
+
+@instrumentar_pipeline("predicao_links.main")
+def main(pasta="./basedados/anos", k=K_PADRAO, amostras=AMOSTRAS_AUC, workers=None, pasta_saida="."):
+    with etapa("construir_rede_temporal"):
+        rede = construir_rede_temporal(pasta)
+    tabela = avaliar_predicao(rede, k, amostras, workers)
+
+    for linha in tabela.itertuples():
+        print(f"{linha.ano}->{linha.ano_seguinte} {linha.medida}: precisão@{k} {linha.precisao_k:.3f}, "
+              f"revocação {linha.revocacao_k:.3f}, AUC {linha.auc:.3f}")
+    media = tabela.groupby('medida', sort=False)[['precisao_k', 'revocacao_k', 'auc']].mean()
+    print(media.round(3).to_string())
+
+    os.makedirs(pasta_saida, exist_ok=True)
+    tabela.to_csv(os.path.join(pasta_saida, "predicao_links.csv"), index=False)
+    with etapa("prever_proximo_ano"):
+        prever_proximo_ano(rede, k).to_csv(os.path.join(pasta_saida, "previsoes_links.csv"), index=False)
+    print("Resultados salvos em predicao_links.csv e previsoes_links.csv")
+
+if __name__ == "__main__":
+    main()
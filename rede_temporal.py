@@ -0,0 +1,246 @@
+import glob
+import os
+import networkx as nx
+import numpy as np
+from cache_gexf import carregar_snapshot
+from grafo_compacto import AUSENTE, internar_ids, montar_grafo
+from metricas_esparsas import adjacencia_de_arestas
+
+# ===================================================================
+# Armazenamento temporal da rede de coautoria
+# Em vez de um arquivo GEXF por período de avaliação, todos os anos de
+# basedados/anos são reunidos em uma única estrutura de arrays:
+#   - ids: id Scopus de cada autor; o autor passa a ser o inteiro i;
+#   - colunas de arestas (origem, destino, ano, num_paper, citation_num)
+#     ordenadas por ano, com origem < destino;
+#   - colunas de ocorrências de autores por ano (autor, ano, atributos);
+#   - índice por ano: inicio_arestas[k]:inicio_arestas[k+1] são as
+#     arestas do ano anos[k] (idem para inicio_nos).
+# Qualquer janela de anos (ex.: 2015-2019) é então uma fatia contígua
+# dos arrays, obtida sem reler ou reprocessar arquivos.
+# ===================================================================
+
+# Períodos de avaliação, no formato "inicio-fim"
+PERIODOS = ("2010-2012", "2013-2016", "2017-2020", "2021-2024")
+
+def _ano_do_arquivo(caminho: str):
+    try:
+        return int(os.path.basename(caminho)[:4])
+    except ValueError:
+        return None
+
+# ===================================================================
+# FUNÇÃO: construir_rede_temporal
+# Descrição: Monta o armazenamento temporal a partir dos arquivos anuais
+#            da pasta (lidos pelos snapshots do cache_gexf, com o mapa de
+#            aliases de autores aplicado, a não ser com com_aliases=False).
+# ===================================================================
+def construir_rede_temporal(pasta: str, com_aliases=True):
+    arquivos = sorted(glob.glob(f"{pasta}/*.gexf"), key=lambda a: (_ano_do_arquivo(a) or 0, a))
+    arquivos = [a for a in arquivos if _ano_do_arquivo(a) is not None]
+    if not arquivos:
+        raise ValueError(f"Nenhum arquivo anual encontrado em {pasta}.")
+
+    ids = {}
+    anos = []
+    blocos_arestas = []
+    blocos_nos = []
+
+    for arquivo in arquivos:
+        ano = _ano_do_arquivo(arquivo)
+        snapshot = carregar_snapshot(arquivo, com_aliases)
+        if snapshot is None:
+            raise ValueError(f"Formato não suportado pelo cache de snapshots: {arquivo}")
+
+        # Interna os ids do arquivo no índice global de autores
+        locais = np.array([ids.setdefault(n, len(ids)) for n in snapshot['ids'].tolist()], dtype=np.int64)
+
+        u = locais[snapshot['origem']]
+        v = locais[snapshot['destino']]
+        blocos_arestas.append({
+            'origem': np.minimum(u, v),
+            'destino': np.maximum(u, v),
+            'num_paper': np.asarray(snapshot['aresta_num_paper']),
+            'citation_num': np.asarray(snapshot['aresta_citation_num']),
+        })
+        blocos_nos.append({
+            'autor': locais,
+            'complete_name': np.asarray(snapshot['no_complete_name']),
+            'complete_name_presente': np.asarray(snapshot['no_complete_name_presente']),
+            'h_index': np.asarray(snapshot['no_h_index']),
+            'h_index_presente': np.asarray(snapshot['no_h_index_presente']),
+            'is_permanent': np.asarray(snapshot['no_is_permanent']),
+            'is_permanent_presente': np.asarray(snapshot['no_is_permanent_presente']),
+        })
+        anos.append(ano)
+
+    rede = {
+        'ids': np.array(list(ids), dtype=str),
+        'anos': np.array(anos, dtype=np.int64),
+        'inicio_arestas': np.cumsum([0] + [len(b['origem']) for b in blocos_arestas]),
+        'inicio_nos': np.cumsum([0] + [len(b['autor']) for b in blocos_nos]),
+    }
+    for chave in blocos_arestas[0]:
+        rede[f'aresta_{chave}'] = np.concatenate([b[chave] for b in blocos_arestas])
+    rede['aresta_ano'] = np.repeat(rede['anos'], np.diff(rede['inicio_arestas']))
+    for chave in blocos_nos[0]:
+        rede[f'no_{chave}'] = np.concatenate([b[chave] for b in blocos_nos])
+    rede['no_ano'] = np.repeat(rede['anos'], np.diff(rede['inicio_nos']))
+    return rede
+
+# ===================================================================
+# FUNÇÃO: limites_periodo
+# Descrição: Anos inicial e final de um período "inicio-fim".
+# ===================================================================
+def limites_periodo(periodo: str):
+    inicio, fim = (int(ano) for ano in periodo.split("-"))
+    return inicio, fim
+
+# ===================================================================
+# FUNÇÃO: janelas_anos_periodos
+# Descrição: Lista [(rótulo, inicio, fim)] com uma janela por ano da rede
+#            seguida de uma janela por período.
+# ===================================================================
+def janelas_anos_periodos(rede: dict, periodos=PERIODOS):
+    janelas = [(str(ano), ano, ano) for ano in rede['anos'].tolist()]
+    janelas += [(periodo, *limites_periodo(periodo)) for periodo in periodos]
+    return janelas
+
+# ===================================================================
+# FUNÇÃO: fatiar_janela
+# Descrição: Retorna a visão (fatias, sem cópia) das colunas de arestas e
+#            de ocorrências de autores entre os anos inicio e fim
+#            (inclusive).
+# ===================================================================
+def fatiar_janela(rede: dict, inicio: int, fim: int):
+    k0 = np.searchsorted(rede['anos'], inicio, side='left')
+    k1 = np.searchsorted(rede['anos'], fim, side='right')
+    a0, a1 = rede['inicio_arestas'][k0], rede['inicio_arestas'][k1]
+    n0, n1 = rede['inicio_nos'][k0], rede['inicio_nos'][k1]
+
+    janela = {'ids': rede['ids'], 'anos': rede['anos'][k0:k1]}
+    for chave, coluna in rede.items():
+        if chave.startswith('aresta_'):
+            janela[chave] = coluna[a0:a1]
+        elif chave.startswith('no_'):
+            janela[chave] = coluna[n0:n1]
+    return janela
+
+# ===================================================================
+# FUNÇÃO: agregar_arestas
+# Descrição: Agrupa as arestas repetidas de uma janela: soma num_paper e
+#            citation_num e monta a máscara dos anos em que cada par
+#            aparece (bit i = i-ésimo ano da janela). Retorna os pares na
+#            ordem da primeira ocorrência.
+# ===================================================================
+def agregar_arestas(janela: dict):
+    num_autores = len(janela['ids'])
+    chaves = janela['aresta_origem'] * num_autores + janela['aresta_destino']
+    unicas, primeira, inverso = np.unique(chaves, return_index=True, return_inverse=True)
+    ordem = np.argsort(primeira, kind='stable')
+    posicao = np.empty_like(ordem)
+    posicao[ordem] = np.arange(len(ordem))
+    inverso = posicao[inverso.ravel()]
+
+    bits = np.left_shift(1, np.searchsorted(janela['anos'], janela['aresta_ano'])).astype(np.int64)
+    mascara = np.zeros(len(unicas), dtype=np.int64)
+    np.bitwise_or.at(mascara, inverso, bits)
+    return {
+        'origem': unicas[ordem] // num_autores,
+        'destino': unicas[ordem] % num_autores,
+        'num_paper': np.bincount(inverso, weights=janela['aresta_num_paper'], minlength=len(unicas)).astype(np.int64),
+        'citation_num': np.bincount(inverso, weights=janela['aresta_citation_num'], minlength=len(unicas)).astype(np.int64),
+        'mascara_anos': mascara,
+    }
+
+# ===================================================================
+# FUNÇÃO: agregar_autores
+# Descrição: Consolida os atributos dos autores presentes na janela com os
+#            mesmos redutores padrão de uniao.py: nome mais recente,
+#            maior h_index e is_permanent verdadeiro se for em algum ano.
+# ===================================================================
+def agregar_autores(janela: dict):
+    autores, primeira = np.unique(janela['no_autor'], return_index=True)
+    autores = autores[np.argsort(primeira, kind='stable')]
+    atributos = {int(a): {} for a in autores}
+
+    # Percorre em ordem cronológica; o último nome presente prevalece
+    for autor, nome, presente in zip(janela['no_autor'].tolist(),
+                                     janela['no_complete_name'].tolist(),
+                                     janela['no_complete_name_presente'].tolist()):
+        if presente:
+            atributos[autor]['complete_name'] = nome
+
+    # Agrupa as ocorrências por autor e reduz cada grupo de uma vez
+    for chave, redutor in (('h_index', np.maximum), ('is_permanent', np.logical_or)):
+        presente = janela[f'no_{chave}_presente']
+        donos = janela['no_autor'][presente]
+        ordem = np.argsort(donos, kind='stable')
+        donos_unicos, inicios = np.unique(donos[ordem], return_index=True)
+        if len(donos_unicos) == 0:
+            continue
+        reduzidos = redutor.reduceat(janela[f'no_{chave}'][presente][ordem], inicios)
+        for autor, valor in zip(donos_unicos.tolist(), reduzidos.tolist()):
+            atributos[autor][chave] = valor
+    return autores, atributos
+
+# ===================================================================
+# FUNÇÃO: grafo_janela
+# Descrição: Materializa a janela [inicio, fim] como um nx.Graph, no mesmo
+#            formato dos arquivos de basedados/avaliacao_geral.
+# ===================================================================
+def grafo_janela(rede: dict, inicio: int, fim: int):
+    janela = fatiar_janela(rede, inicio, fim)
+    ids = rede['ids'].tolist()
+    autores, atributos = agregar_autores(janela)
+    arestas = agregar_arestas(janela)
+
+    G = nx.Graph(mode='static', edge_default={}, node_default={}, anos=janela['anos'].tolist())
+    G.add_nodes_from((ids[a], dict(atributos[a], label=ids[a])) for a in autores.tolist())
+    G.add_edges_from(
+        (ids[u], ids[v], {'num_paper': p, 'citation_num': c, 'mascara_anos': m})
+        for u, v, p, c, m in zip(arestas['origem'].tolist(), arestas['destino'].tolist(),
+                                 arestas['num_paper'].tolist(), arestas['citation_num'].tolist(),
+                                 arestas['mascara_anos'].tolist())
+    )
+    return G
+
+# ===================================================================
+# FUNÇÃO: compacto_janela
+# Descrição: A janela [inicio, fim] como grafo compacto (grafo_compacto.py):
+#            mesmos autores, arestas e atributos de grafo_janela, na mesma
+#            ordem, sem passar pelo nx.Graph.
+# ===================================================================
+def compacto_janela(rede: dict, inicio: int, fim: int):
+    janela = fatiar_janela(rede, inicio, fim)
+    autores, atributos = agregar_autores(janela)
+    arestas = agregar_arestas(janela)
+    local = np.full(len(rede['ids']), -1, dtype=np.int64)
+    local[autores] = np.arange(len(autores))
+
+    registros = [atributos[a] for a in autores.tolist()]
+    colunas_nos = {
+        'complete_name': [r.get('complete_name', "") for r in registros],
+        'h_index': [r.get('h_index', AUSENTE) for r in registros],
+        'is_permanent': [r.get('is_permanent', False) for r in registros],
+        'is_permanent_presente': ['is_permanent' in r for r in registros],
+    }
+    colunas_arestas = {chave: arestas[chave] for chave in ('num_paper', 'citation_num', 'mascara_anos')}
+    return montar_grafo(internar_ids(rede['ids'][autores].tolist()),
+                        local[arestas['origem']], local[arestas['destino']], colunas_nos, colunas_arestas,
+                        {'mode': 'static', 'edge_default': {}, 'node_default': {},
+                         'anos': janela['anos'].tolist()})
+
+# ===================================================================
+# FUNÇÃO: matriz_janela
+# Descrição: Matriz CSR dos autores presentes na janela [inicio, fim] do
+#            armazenamento temporal (mesma rede de grafo_janela, sem
+#            montar o nx.Graph).
+# ===================================================================
+def matriz_janela(rede: dict, inicio: int, fim: int):
+    janela = fatiar_janela(rede, inicio, fim)
+    arestas = agregar_arestas(janela)
+    presentes = np.unique(janela['no_autor'])
+    local = np.full(len(rede['ids']), -1, dtype=np.int64)
+    local[presentes] = np.arange(len(presentes))
+    return adjacencia_de_arestas(local[arestas['origem']], local[arestas['destino']], len(presentes))
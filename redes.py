@@ -0,0 +1,193 @@
+import argparse
+import os
+import sys
+
+# ===================================================================
+# Linha de comando unificada das análises
+#
+#   python redes.py metricas       métricas anuais (R1)
+#   python redes.py periodos       redes dos períodos de avaliação (R2)
+#   python redes.py uniao          rede geral x sub-grafo de grau >= X (R3)
+#   python redes.py ego            rede ego e métricas ego (R3); --por-ano e
+#                                  --permanentes para as métricas de cada ano
+#                                  só dos docentes permanentes
+#   python redes.py comunidades    comunidades e eventos (comunidades.py)
+#   python redes.py centralidades  centralidades por ano/período (centralidade.py)
+#   python redes.py nucleos        curvas "grau >= X", k-cores e rich-club (nucleos.py)
+#   python redes.py janelas        métricas de janelas deslizantes de anos (janelas_deslizantes.py)
+#   python redes.py conectividade  componentes, caminho médio e diâmetro efetivo (conectividade.py)
+#   python redes.py links          predição de colaborações do ano seguinte (predicao_links.py)
+#   python redes.py deduplicar     mapa de ids Scopus duplicados de autores (deduplicacao.py)
+#
+# Os módulos das análises só são importados pelo subcomando escolhido, e
+# as bibliotecas de gráficos só quando uma figura é pedida: com
+# --sem-graficos (ou --no-plots) os resultados são gravados em JSON/CSV e
+# o matplotlib nunca é carregado. As figuras são gravadas sem abrir
+# janelas (modo lote), a não ser com --mostrar.
+# ===================================================================
+
+PASTA_DADOS = "./basedados/anos"
+PERIODOS = ["2010-2012", "2013-2016", "2017-2020", "2021-2024"]
+MEDIDAS = ["grau", "pagerank", "autovetor", "intermediacao", "harmonica"]
+
+def comando_metricas(args):
+    import R1
+    R1.main(pasta_arquivos=args.dados, graficos=args.graficos, pasta_saida=args.saida, mostrar=args.mostrar)
+
+def comando_periodos(args):
+    import R2
+    R2.main(periodos=args.periodos, centralidade=args.centralidade, pasta_arquivos=args.dados,
+            graficos=args.graficos, pasta_saida=args.saida)
+
+def comando_uniao(args):
+    import R3
+    R3.main_expanded(janela=args.janela, centralidade=args.centralidade, pasta_arquivos=args.dados,
+                     graficos=args.graficos, pasta_saida=args.saida, etapas=("uniao",))
+
+def comando_ego(args):
+    import R3
+    R3.main_expanded(janela=args.janela, vertice_escolhido=args.vertice,
+                     centralidade=args.centralidade, pasta_arquivos=args.dados,
+                     graficos=args.graficos, pasta_saida=args.saida, etapas=("ego",),
+                     por_ano=args.por_ano, apenas_permanentes=args.permanentes)
+
+def comando_comunidades(args):
+    import comunidades
+    comunidades.main(pasta=args.dados, periodos=args.periodos, workers=args.workers,
+                     pasta_saida=args.saida)
+
+def comando_centralidades(args):
+    import centralidade
+    centralidade.main(pasta=args.dados, periodos=args.periodos, k=args.k, workers=args.workers,
+                      pasta_saida=args.saida,
+                      erro=centralidade.ERRO_PADRAO if args.erro is None else args.erro)
+
+def comando_nucleos(args):
+    import nucleos
+    nucleos.main(pasta=args.dados, periodos=args.periodos, pasta_saida=args.saida)
+
+def comando_janelas(args):
+    import janelas_deslizantes
+    janelas_deslizantes.main(pasta=args.dados, larguras=args.larguras, pasta_saida=args.saida)
+
+def comando_conectividade(args):
+    import conectividade
+    conectividade.main(pasta=args.dados, periodos=args.periodos, amostras=args.amostras,
+                       workers=args.workers, pasta_saida=args.saida)
+
+def comando_links(args):
+    import predicao_links
+    predicao_links.main(pasta=args.dados, k=args.k, workers=args.workers, pasta_saida=args.saida)
+
+def comando_deduplicar(args):
+    import deduplicacao
+    deduplicacao.main(pasta=args.dados)
+
+# ===================================================================
+# FUNÇÃO: criar_parser
+# Descrição: Monta o parser com um subcomando por análise. As opções
+#            comuns (pastas, gráficos, workers, instrumentação) valem para
+#            todos os subcomandos.
+# ===================================================================
+def criar_parser():
+    comum = argparse.ArgumentParser(add_help=False)
+    comum.add_argument("--dados", default=PASTA_DADOS,
+                       help=f"Pasta com os arquivos GEXF anuais (padrão: {PASTA_DADOS})")
+    comum.add_argument("--saida", default=".",
+                       help="Pasta onde figuras, JSON e CSV são gravados (padrão: .)")
+    comum.add_argument("--sem-graficos", "--no-plots", dest="graficos", action="store_false",
+                       help="Não desenha figuras; grava os resultados em JSON/CSV")
+    comum.add_argument("--mostrar", action="store_true",
+                       help="Abre as figuras em janelas em vez de só gravá-las")
+    comum.add_argument("--workers", type=int, default=None,
+                       help="Processos paralelos (padrão: REDES_WORKERS; 0 = todos os núcleos)")
+    comum.add_argument("--amostras", type=int, default=None,
+                       help="Fontes da BFS amostrada de caminho médio/diâmetro (padrão: REDES_AMOSTRAS ou 512)")
+    comum.add_argument("--instrumentar", nargs="?", const="1", choices=["1", "memoria"],
+                       help="Mede as etapas (ver instrumentacao.py)")
+
+    parser = argparse.ArgumentParser(description="Análises das redes temporais de coautoria.")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    p = subparsers.add_parser("metricas", parents=[comum],
+                              help="Densidade, nós, arestas, grau médio e distribuição dos graus por ano")
+    p.set_defaults(funcao=comando_metricas)
+
+    p = subparsers.add_parser("periodos", parents=[comum], help="Redes dos períodos de avaliação")
+    p.add_argument("--periodos", nargs="+", default=PERIODOS, help="Janelas no formato inicio-fim")
+    p.add_argument("--centralidade", choices=MEDIDAS, default="grau",
+                   help="Centralidade usada para destacar os autores")
+    p.set_defaults(funcao=comando_periodos)
+
+    for nome, funcao, ajuda in (("uniao", comando_uniao, "Rede geral e sub-grafo dos autores de grau >= X"),
+                                ("ego", comando_ego, "Rede ego de um autor e métricas ego de todos")):
+        p = subparsers.add_parser(nome, parents=[comum], help=ajuda)
+        p.add_argument("--janela", type=int, nargs=2, metavar=("INICIO", "FIM"),
+                       help="Usa só os anos da janela em vez da união de todos os arquivos")
+        p.add_argument("--centralidade", choices=MEDIDAS, default=None,
+                       help="Centralidade usada para destacar/escolher autores")
+        if nome == "ego":
+            p.add_argument("--vertice", default="57214422700", help="Autor central da rede ego")
+            p.add_argument("--por-ano", action="store_true",
+                           help="Grava também as métricas ego de cada ano (metricas_ego_anos.csv)")
+            p.add_argument("--permanentes", action="store_true",
+                           help="Métricas ego só dos docentes permanentes")
+        p.set_defaults(funcao=funcao)
+
+    p = subparsers.add_parser("comunidades", parents=[comum], help="Comunidades por ano e período")
+    p.add_argument("--periodos", nargs="+", default=PERIODOS)
+    p.set_defaults(funcao=comando_comunidades)
+
+    p = subparsers.add_parser("centralidades", parents=[comum], help="Centralidades por ano e período")
+    p.add_argument("--periodos", nargs="+", default=PERIODOS)
+    p.add_argument("-k", type=int, default=5, help="Autores por medida")
+    p.add_argument("--erro", type=float, default=None,
+                   help="Erro máximo da intermediação amostrada em redes grandes (padrão 0.05)")
+    p.set_defaults(funcao=comando_centralidades)
+
+    p = subparsers.add_parser("nucleos", parents=[comum],
+                              help="Subgrafo grau >= X para todo X, k-cores e rich-club por ano e período")
+    p.add_argument("--periodos", nargs="+", default=PERIODOS)
+    p.set_defaults(funcao=comando_nucleos)
+
+    p = subparsers.add_parser("janelas", parents=[comum],
+                              help="Métricas de janelas deslizantes de anos (colaborações de 3 e 4 anos)")
+    p.add_argument("--larguras", type=int, nargs="+", default=[3, 4], help="Larguras das janelas, em anos")
+    p.set_defaults(funcao=comando_janelas)
+
+    p = subparsers.add_parser("conectividade", parents=[comum],
+                              help="Componentes, caminho médio e diâmetro efetivo por ano, período e rede geral")
+    p.add_argument("--periodos", nargs="+", default=PERIODOS)
+    p.set_defaults(funcao=comando_conectividade)
+
+    p = subparsers.add_parser("links", parents=[comum],
+                              help="Predição de links: pontua pares do ano t e avalia contra t+1")
+    p.add_argument("-k", type=int, default=10, help="Candidatos por autor")
+    p.set_defaults(funcao=comando_links)
+
+    p = subparsers.add_parser("deduplicar", parents=[comum],
+                              help="Encontra autores com mais de um id e grava aliases.csv na pasta dos dados")
+    p.set_defaults(funcao=comando_deduplicar)
+    return parser
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+
+    # Variáveis lidas pelos módulos (e pelos workers) no primeiro uso
+    if not args.mostrar:
+        os.environ.setdefault("REDES_LOTE", "1")
+    if args.workers is not None:
+        os.environ["REDES_WORKERS"] = str(args.workers)
+    if args.amostras is not None:
+        os.environ["REDES_AMOSTRAS"] = str(args.amostras)
+    if args.instrumentar:
+        os.environ["REDES_INSTRUMENTAR"] = args.instrumentar
+
+    if not os.path.isdir(args.dados):
+        print(f"Pasta de dados não encontrada: {args.dados}")
+        return 1
+    args.funcao(args)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import os
+import matplotlib
+
+# Modo lote: sem janela, renderização direta em arquivo (backend Agg).
+# Precisa ser definido antes do primeiro uso do pyplot.
+VARIAVEL_LOTE = "REDES_LOTE"
+if os.environ.get(VARIAVEL_LOTE, "").lower() in ("1", "true", "sim"):
+    matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import networkx as nx
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba, to_rgba_array
+
+# ===================================================================
+# Camada de renderização das redes (R2/R3)
+# Nós e arestas são desenhados cada um como uma única coleção do
+# matplotlib (scatter / LineCollection), montada a partir de arrays:
+# posições, tamanhos, cores e larguras são calculados de forma vetorizada
+# em vez de nó a nó. Em grafos grandes a camada de arestas é rasterizada,
+# o que deixa o arquivo final leve e a gravação rápida.
+# ===================================================================
+
+# A partir deste número de arestas a camada de arestas é rasterizada
+LIMITE_RASTERIZACAO = 5000
+
+# ===================================================================
+# FUNÇÃO: arrays_da_rede
+# Descrição: Extrai, em uma passada, os arrays usados na renderização: a
+#            ordem dos nós, as coordenadas, os índices das pontas de cada
+#            aresta e os atributos is_permanent (nós) e citation_num
+#            (arestas).
+# ===================================================================
+def arrays_da_rede(G: nx.Graph, pos: dict):
+    nos = list(G)
+    indice = {n: i for i, n in enumerate(nos)}
+    xy = np.array([pos[n] for n in nos], dtype=np.float64).reshape(-1, 2)
+    permanente = np.array([bool(G.nodes[n].get("is_permanent", False)) for n in nos], dtype=bool)
+
+    arestas = list(G.edges(data="citation_num", default=1))
+    origem = np.array([indice[u] for u, _, _ in arestas], dtype=np.int64)
+    destino = np.array([indice[v] for _, v, _ in arestas], dtype=np.int64)
+    citacoes = np.array([float(c) for _, _, c in arestas], dtype=np.float64)
+    return {
+        'nos': nos,
+        'indice': indice,
+        'xy': xy,
+        'permanente': permanente,
+        'origem': origem,
+        'destino': destino,
+        'citation_num': citacoes,
+    }
+
+# ===================================================================
+# FUNÇÃO: cores_arestas_permanentes
+# Descrição: Cor de cada aresta: `cor_permanente` quando as duas pontas
+#            são membros permanentes, `cor_padrao` nas demais.
+# ===================================================================
+def cores_arestas_permanentes(dados: dict, cor_permanente="red", cor_padrao="black"):
+    ambos = dados['permanente'][dados['origem']] & dados['permanente'][dados['destino']]
+    cores = np.tile(to_rgba(cor_padrao), (len(ambos), 1))
+    cores[ambos] = to_rgba(cor_permanente)
+    return cores
+
+# ===================================================================
+# FUNÇÃO: desenhar_arestas
+# Descrição: Desenha todas as arestas como uma única LineCollection.
+# ===================================================================
+def desenhar_arestas(ax, xy: np.ndarray, origem: np.ndarray, destino: np.ndarray,
+                     cores="black", larguras=1.0, alpha=1.0, rasterizar=None):
+    if rasterizar is None:
+        rasterizar = len(origem) >= LIMITE_RASTERIZACAO
+
+    segmentos = np.stack([xy[origem], xy[destino]], axis=1)
+    cores = to_rgba_array(cores, alpha=alpha)
+    colecao = LineCollection(segmentos, colors=cores, linewidths=larguras,
+                             antialiaseds=(1,), zorder=1)
+    colecao.set_rasterized(rasterizar)
+    ax.add_collection(colecao, autolim=True)
+    ax.autoscale_view()
+    return colecao
+
+# ===================================================================
+# FUNÇÃO: desenhar_nos
+# Descrição: Desenha os nós selecionados por `mascara` (todos, se None)
+#            em uma única chamada de scatter.
+# ===================================================================
+def desenhar_nos(ax, xy: np.ndarray, tamanhos, cor, mascara=None, cor_borda=None,
+                 largura_borda=1.0, alpha=1.0):
+    tamanhos = np.broadcast_to(np.asarray(tamanhos, dtype=np.float64), (len(xy),))
+    if mascara is not None:
+        xy = xy[mascara]
+        tamanhos = tamanhos[mascara]
+        if not isinstance(cor, str) and len(cor) == len(mascara):
+            cor = np.asarray(cor, dtype=object)[mascara].tolist()
+    return ax.scatter(xy[:, 0], xy[:, 1], s=tamanhos, c=cor, marker="o",
+                      edgecolors=cor_borda, linewidths=largura_borda, alpha=alpha, zorder=2)
+
+# ===================================================================
+# FUNÇÃO: desenhar_rotulos
+# Descrição: Escreve os rótulos dos nós indicados (poucos, ex.: top 5).
+# ===================================================================
+def desenhar_rotulos(ax, xy: np.ndarray, indices, rotulos, **estilo):
+    for i, rotulo in zip(indices, rotulos):
+        ax.text(xy[i, 0], xy[i, 1], rotulo, horizontalalignment="center",
+                verticalalignment="center", clip_on=True, zorder=3, **estilo)
+
+# ===================================================================
+# FUNÇÃO: exibir_figura
+# Descrição: Substitui o plt.show() bloqueante. Em modo lote (backend não
+#            interativo) a figura é apenas fechada, liberando memória.
+# ===================================================================
+def exibir_figura(fig=None):
+    fig = fig or plt.gcf()
+    if matplotlib.get_backend().lower() in ("agg", "cairo", "pdf", "pgf", "ps", "svg", "template"):
+        plt.close(fig)
+    else:
+        plt.show()
@@ -0,0 +1,67 @@
+import numpy as np
+from deduplicacao import SOBRENOME_COMUM, encontrar_duplicatas, nomes_compativeis, normalizar_nome
+
+# ===================================================================
+# Casos de regressão das regras de deduplicação (ver o início de
+# deduplicacao.py). As redes são montadas à mão, no formato do
+# armazenamento temporal, com um único ano.
+# ===================================================================
+
+def _rede(nomes: list, arestas=()):
+    num_autores = len(nomes)
+    origem = np.array([min(u, v) for u, v in arestas], dtype=np.int64)
+    destino = np.array([max(u, v) for u, v in arestas], dtype=np.int64)
+    return {
+        'ids': np.array([str(1000 + i) for i in range(num_autores)], dtype=str),
+        'anos': np.array([2020], dtype=np.int64),
+        'no_autor': np.arange(num_autores, dtype=np.int64),
+        'no_ano': np.full(num_autores, 2020, dtype=np.int64),
+        'no_complete_name': np.array(nomes, dtype=str),
+        'no_complete_name_presente': np.ones(num_autores, dtype=bool),
+        'aresta_origem': origem,
+        'aresta_destino': destino,
+    }
+
+def _pares(linhas: list):
+    return {frozenset((linha['alias'], linha['canonico'])) for linha in linhas}
+
+def test_normalizar_nome():
+    assert normalizar_nome("Adaildo G. D'Assunção Junior") == ["adaildo", "g", "dassuncao"]
+    assert normalizar_nome("Orivaldo V. Santana-Júnior") == ["orivaldo", "v", "santana"]
+
+def test_nomes_compativeis():
+    n = normalizar_nome
+    assert nomes_compativeis(n("Orivaldo Vieira de Santana"), n("Orivaldo V. Santana-Júnior"))
+    assert nomes_compativeis(n("Julia Silva"), n("Júlia da L. A. Silva"))
+    # Só as iniciais e o sobrenome não bastam
+    assert not nomes_compativeis(n("J.P. Silva"), n("Jordao Silva"))
+    # Nomes do meio diferentes
+    assert not nomes_compativeis(n("Ricardo A. Silva"), n("Ricardo Q. Silva"))
+    # Primeiros nomes diferentes
+    assert not nomes_compativeis(n("João Silva"), n("José Silva"))
+
+def test_nome_do_meio_em_comum_funde():
+    rede = _rede(["Orivaldo Vieira de Santana", "Orivaldo V. Santana-Júnior"])
+    assert _pares(encontrar_duplicatas(rede)) == {frozenset(("1000", "1001"))}
+
+def test_coautores_nao_sao_fundidos():
+    rede = _rede(["ADAILDO GOMES D'ASSUNCAO", "Adaildo G. D'Assunção Junior"], arestas=[(0, 1)])
+    assert encontrar_duplicatas(rede) == []
+
+def test_sobrenome_comum_sem_nome_do_meio_nao_funde():
+    outros = [f"Autor{chr(65 + i)} Silva" for i in range(SOBRENOME_COMUM)]
+    nomes = ["Ricardo Silva", "Ricardo Q. de F. H. Silva", "Coautor Comum"] + outros
+    # Mesmo com um coautor em comum
+    rede = _rede(nomes, arestas=[(0, 2), (1, 2)])
+    assert encontrar_duplicatas(rede) == []
+
+def test_sobrenome_raro_sem_nome_do_meio_exige_coautor_em_comum():
+    nomes = ["Karen Pondofe", "Karen de Medeiros Pondofe", "Coautor Comum"]
+    assert encontrar_duplicatas(_rede(nomes, arestas=[(0, 2)])) == []
+    rede = _rede(nomes, arestas=[(0, 2), (1, 2)])
+    assert _pares(encontrar_duplicatas(rede)) == {frozenset(("1000", "1001"))}
+
+def test_grupo_exige_todos_os_pares_compativeis():
+    rede = _rede(["J. Silvestre", "João Silvestre", "José Silvestre"])
+    pares = _pares(encontrar_duplicatas(rede))
+    assert frozenset(("1001", "1002")) not in pares
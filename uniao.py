@@ -0,0 +1,72 @@
+import networkx as nx
+
+# ===================================================================
+# União de vários grafos em uma única passada
+# Diferente de chamar nx.compose em laço (que copia o grafo acumulado a
+# cada chamada), os nós e arestas de cada entrada são inseridos uma
+# única vez em um grafo de saída. Quando um nó ou aresta se repete, os
+# atributos são combinados por um redutor ("sum", "max", "last" ou uma
+# função de dois argumentos). Cada aresta recebe ainda o atributo
+# `mascara_anos`: o bit i indica que a aresta aparece no grafo i.
+# ===================================================================
+
+REDUTORES = {
+    'sum': lambda atual, novo: atual + novo,
+    'max': max,
+    'last': lambda atual, novo: novo,
+}
+
+# Redutores padrão. Atributos não listados usam "last", o mesmo
+# comportamento do nx.compose.
+REDUTORES_NO = {
+    'complete_name': 'last',
+    'h_index': 'max',
+    'is_permanent': 'max',
+}
+REDUTORES_ARESTA = {
+    'num_paper': 'sum',
+    'citation_num': 'sum',
+}
+
+def _resolver(redutores: dict):
+    return {chave: REDUTORES[r] if isinstance(r, str) else r for chave, r in redutores.items()}
+
+def _reduzir(atual: dict, novo: dict, redutores: dict):
+    for chave, valor in novo.items():
+        if chave in atual:
+            atual[chave] = redutores.get(chave, REDUTORES['last'])(atual[chave], valor)
+        else:
+            atual[chave] = valor
+
+# ===================================================================
+# FUNÇÃO: unir_grafos
+# Descrição: Retorna a união dos grafos. `rotulos` (por exemplo os anos)
+#            é guardado em rede.graph['anos'] e dá significado aos bits de
+#            `mascara_anos`. Os redutores informados completam os padrões.
+# ===================================================================
+def unir_grafos(grafos: list, rotulos=None, redutores_no=None, redutores_aresta=None):
+    redutores_no = _resolver({**REDUTORES_NO, **(redutores_no or {})})
+    redutores_aresta = _resolver({**REDUTORES_ARESTA, **(redutores_aresta or {})})
+
+    rede = nx.Graph()
+    for i, g in enumerate(grafos):
+        bit = 1 << i
+        rede.graph.update(g.graph)
+
+        for n, dados in g.nodes(data=True):
+            if n in rede:
+                _reduzir(rede.nodes[n], dados, redutores_no)
+            else:
+                rede.add_node(n, **dados)
+
+        for u, v, dados in g.edges(data=True):
+            atual = rede.get_edge_data(u, v)
+            if atual is None:
+                rede.add_edge(u, v, **dados)
+                rede[u][v]['mascara_anos'] = bit
+            else:
+                _reduzir(atual, dados, redutores_aresta)
+                atual['mascara_anos'] |= bit
+
+    rede.graph['anos'] = list(rotulos) if rotulos is not None else list(range(len(grafos)))
+    return rede